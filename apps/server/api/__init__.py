@@ -1,4 +1,19 @@
-# API routers package
-from . import health, auth, transfer, agent
+# API routers package. Routers are imported by the app factory for the active role only,
+# so a webhook-only process never loads the SDKs behind the other routers.
+# Keep in step with core.roles.ROUTERS, which decides what is mounted.
 
-__all__ = ["health", "auth", "transfer", "agent"]
+__all__ = [
+    "health",
+    "metrics",
+    "auth",
+    "transfer",
+    "warm_transfer",
+    "agent",
+    "agent_directory",
+    "summary",
+    "transcripts",
+    "twilio_api",
+    "twilio_tokens",
+    "twilio_webhooks",
+    "livekit_webhooks",
+]
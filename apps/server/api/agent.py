@@ -1,46 +1,135 @@
-from fastapi import APIRouter, HTTPException
-from schemas.requests import MoveParticipantRequest, HoldCallerRequest
-from services.livekit_service import move_participant_between_rooms, hold_caller_service
+from fastapi import APIRouter, Depends, HTTPException
+from livekit import api
+from core.config import TRANSFER_DEADLINE_SECONDS
+from schemas.requests import MoveParticipantRequest, HoldCallerRequest, BatchParticipantRequest, BulkHoldRequest
+from services.livekit_service import (
+    get_livekit_api,
+    move_participant_between_rooms,
+    batch_participant_operations,
+    hold_caller_service,
+    hold_rooms,
+    participant_cache,
+)
+from services.agent_directory import agent_directory
+from services.room_index import room_index
+from services.session_store import session_store
+from utils.deadlines import DeadlineExceeded, route_deadline
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/complete-transfer")
-async def complete_transfer(request: MoveParticipantRequest):
+async def _find_session(session_id, room):
+    if session_id:
+        return await session_store.get(session_id)
+    return await session_store.find_by_room(room)
+
+@router.post("/complete-transfer", dependencies=[Depends(route_deadline(TRANSFER_DEADLINE_SECONDS))])
+async def complete_transfer(request: MoveParticipantRequest, lkapi: api.LiveKitAPI = Depends(get_livekit_api)):
     """Complete warm transfer - Step 3: Move Agent B to main call"""
+    # Only a room_finished webhook this worker received is proof; anything else is left to LiveKit
+    if room_index.is_finished(request.destination_room):
+        raise HTTPException(status_code=409, detail=f"Room {request.destination_room} has already ended")
     try:
         result = await move_participant_between_rooms(
             request.consultation_room,
             request.agent_b_identity, 
-            request.destination_room
+            request.destination_room,
+            lkapi=lkapi
         )
         
-        return {
+        response = {
             "status": "transfer_complete",
             "message": f"Agent B moved to {request.destination_room}",
             "details": result
         }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
-        print(f"Move participant error: {e}")
-        return {
+        logger.warning("Move participant failed, falling back to manual join", extra={"error": str(e)})
+        response = {
             "status": "transfer_complete_manual",
             "message": "Agent B should manually join main room",
             "fallback": True
         }
 
+    session = await _find_session(request.session_id, request.consultation_room)
+    if session is not None:
+        if session.reservation_id:
+            # The transfer is over; Agent B's slot in the directory frees up
+            agent_directory.release(session.reservation_id)
+        await session_store.update(
+            session.session_id,
+            status=response["status"],
+            agent_b_identity=request.agent_b_identity,
+            add_participants=[request.agent_b_identity]
+        )
+        response["session_id"] = session.session_id
+    return response
+
+@router.post("/participants/batch")
+async def batch_participants(request: BatchParticipantRequest, lkapi: api.LiveKitAPI = Depends(get_livekit_api)):
+    """Move or remove several participants across rooms concurrently"""
+    results = await batch_participant_operations(
+        request.operations,
+        lkapi=lkapi,
+        max_concurrency=request.max_concurrency
+    )
+    failed = sum(1 for result in results if result["status"] != "success")
+    return {
+        "status": "completed" if not failed else "completed_with_errors",
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results
+    }
+
 @router.post("/hold-caller")
-async def hold_caller(request: HoldCallerRequest):
+async def hold_caller(request: HoldCallerRequest, lkapi: api.LiveKitAPI = Depends(get_livekit_api)):
     """Put caller on hold or resume them"""
     try:
-        result = await hold_caller_service(request)
+        result = await hold_caller_service(request, lkapi=lkapi)
+        session = await session_store.find_by_room(request.room)
+        if session is not None:
+            await session_store.update(session.session_id, caller_on_hold=request.hold)
         return result
+    except (DeadlineExceeded, HTTPException):
+        raise
     except Exception as e:
-        print(f"Hold caller error: {e}")
+        logger.exception("Hold caller failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/hold-caller/bulk")
+async def hold_callers(request: BulkHoldRequest, lkapi: api.LiveKitAPI = Depends(get_livekit_api)):
+    """Hold or resume every participant except agents in several rooms concurrently"""
+    results = await hold_rooms(request.rooms, request.hold, lkapi=lkapi, max_concurrency=request.max_concurrency)
+    for room in {result["room"] for result in results if result["status"] == "success"}:
+        session = await session_store.find_by_room(room)
+        if session is not None:
+            await session_store.update(session.session_id, caller_on_hold=request.hold)
+    failed = sum(1 for result in results if result["status"] != "success")
+    return {
+        "status": "completed" if not failed else "completed_with_errors",
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": results
+    }
+
+@router.get("/participants/cache")
+async def participant_cache_stats():
+    """Cached room listings used by hold/resume, with hit and miss counts"""
+    return participant_cache.stats()
+
 @router.post("/disconnect-agent")
 async def disconnect_agent(agent_identity: str, room: str):
     """Signal agent to disconnect and close tabs"""
     try:
+        session = await session_store.find_by_room(room)
+        if session is not None:
+            await session_store.update(
+                session.session_id,
+                participants=[p for p in session.participants if p != agent_identity]
+            )
         return {
             "status": "disconnect_requested",
             "message": f"Agent {agent_identity} should disconnect from {room}",
@@ -0,0 +1,75 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from schemas.requests import AgentProfileRequest, AgentStatusRequest, RouteAgentRequest
+from services.agent_directory import agent_directory, reserve_agent
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/agents")
+async def list_agents(skill: Optional[str] = None):
+    """Registered agents, optionally only those with `skill`, and routing counters"""
+    return {
+        "agents": [agent.snapshot() for agent in agent_directory.agents(skill)],
+        "stats": agent_directory.stats(),
+    }
+
+@router.post("/agents/route")
+async def route_agent(request: RouteAgentRequest):
+    """Pick the best available agent for a skill and reserve them until released"""
+    agent, reservation = reserve_agent(request.skill, request.channel, exclude=request.exclude)
+    logger.info("Agent routed", extra={"agent_id": agent.agent_id, "skill": request.skill,
+                                       "reservation_id": reservation.reservation_id})
+    return {"agent": agent.snapshot(), "reservation": reservation.snapshot()}
+
+@router.get("/agents/reservations/{reservation_id}")
+async def get_reservation(reservation_id: str):
+    reservation = agent_directory.reservation(reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Reservation not found or already ended")
+    return reservation.snapshot()
+
+@router.delete("/agents/reservations/{reservation_id}")
+async def release_reservation(reservation_id: str):
+    """Free the agent's slot once the transfer is over"""
+    if not agent_directory.release(reservation_id):
+        raise HTTPException(status_code=404, detail="Reservation not found or already ended")
+    return {"status": "released", "reservation_id": reservation_id}
+
+@router.put("/agents/{agent_id}")
+async def upsert_agent(agent_id: str, request: AgentProfileRequest):
+    """Register an agent or replace their identity, phone number, skills, capacity and presence"""
+    if not request.identity and not request.phone_number:
+        raise HTTPException(status_code=422, detail="An agent needs an identity or a phone number")
+    agent = agent_directory.upsert(
+        agent_id,
+        identity=request.identity,
+        phone_number=request.phone_number,
+        skills=request.skills,
+        capacity=request.capacity,
+        status=request.status
+    )
+    return agent.snapshot()
+
+@router.post("/agents/{agent_id}/status")
+async def set_agent_status(agent_id: str, request: AgentStatusRequest):
+    """Presence update from the agent's client"""
+    agent = agent_directory.set_status(agent_id, request.status)
+    if agent is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return agent.snapshot()
+
+@router.get("/agents/{agent_id}")
+async def get_agent(agent_id: str):
+    agent = agent_directory.get(agent_id)
+    if agent is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return agent.snapshot()
+
+@router.delete("/agents/{agent_id}")
+async def remove_agent(agent_id: str):
+    if not agent_directory.remove(agent_id):
+        raise HTTPException(status_code=404, detail="Agent not found")
+    return {"status": "removed", "agent_id": agent_id}
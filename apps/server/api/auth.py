@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from livekit import api
-from core.config import LIVEKIT_API_KEY, LIVEKIT_API_SECRET, LIVEKIT_URL
+from core.config import LIVEKIT_URL
+from services.token_service import token_minter
 
 router = APIRouter()
 
@@ -8,34 +8,21 @@ router = APIRouter()
 async def get_token(room: str, identity: str, role: str = "participant"):
     """Generate LiveKit access token for room connection"""
     try:
-        permissions = {
-            "roomJoin": True,
-            "roomCreate": False,
-            "canPublish": True,
-            "canSubscribe": True,
-            "canPublishData": True,
-        }
-        
-        if role == "agent":
-            permissions["canPublishData"] = True
-            permissions["canUpdateOwnMetadata"] = True
-            
-        token = api.AccessToken(LIVEKIT_API_KEY, LIVEKIT_API_SECRET) \
-            .with_identity(identity) \
-            .with_name(f"{role.title()} {identity}") \
-            .with_grants(api.VideoGrants(
-                room_join=permissions["roomJoin"],
-                room=room,
-                can_publish=permissions["canPublish"],
-                can_subscribe=permissions["canSubscribe"],
-                can_publish_data=permissions["canPublishData"]
-            ))
+        # Role permissions are applied via the cached grant for (room, role);
+        # reconnects within the reuse window get the same signed token back
+        token, expires_at = token_minter.livekit_token(room, identity, role)
             
         return {
-            "token": token.to_jwt(),
+            "token": token,
             "url": LIVEKIT_URL,
             "room": room,
-            "identity": identity
+            "identity": identity,
+            "expires_at": int(expires_at)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/health/token-cache")
+async def token_cache_stats():
+    """Reuse counters for the access-token cache"""
+    return token_minter.cache.stats()
@@ -1,8 +1,20 @@
-from fastapi import APIRouter
-from core.config import LIVEKIT_API_KEY
+from fastapi import APIRouter, Request
+from core.admission import admission
+from core.config import ADMISSION_ENABLED, LIVEKIT_API_KEY
 
 router = APIRouter()
 
 @router.get("/health")
-async def health():
-    return {"status": "ok", "livekit_configured": bool(LIVEKIT_API_KEY)}
+async def health(request: Request):
+    return {
+        "status": "ok",
+        "role": getattr(request.app.state, "role", None),
+        "livekit_configured": bool(LIVEKIT_API_KEY)
+    }
+
+@router.get("/health/admission")
+async def admission_stats():
+    """Per route class: limit, in flight, queued, admitted and shed counts"""
+    if not ADMISSION_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **admission.stats()}
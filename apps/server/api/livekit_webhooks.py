@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Request
+from livekit import api
+from core.config import LIVEKIT_API_KEY, LIVEKIT_API_SECRET
+from services.livekit_service import participant_cache
+from services.room_index import PARTICIPANT_EVENTS, TRACK_EVENTS, room_index
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+_receiver = api.WebhookReceiver(api.TokenVerifier(LIVEKIT_API_KEY, LIVEKIT_API_SECRET))
+
+@router.post("/webhook")
+async def livekit_webhook(request: Request):
+    """Verify a LiveKit webhook (signed JWT carrying the body's sha256) and apply it to the room index"""
+    body = (await request.body()).decode()
+    try:
+        event = _receiver.receive(body, request.headers.get("Authorization", ""))
+    except Exception as e:
+        logger.warning("Rejected LiveKit webhook", extra={"error": str(e)})
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    state = room_index.apply(event)
+    if state is not None and (event.event in PARTICIPANT_EVENTS or event.event in TRACK_EVENTS
+                              or event.event == "room_finished"):
+        # Hold/resume re-lists this room next time instead of using a stale listing
+        participant_cache.invalidate(state.name)
+    return {"status": "received"}
+
+
+@router.get("/rooms")
+async def list_rooms(include_finished: bool = False):
+    """Rooms currently known from webhooks, without calling the LiveKit API"""
+    return {
+        "rooms": [state.snapshot() for state in room_index.rooms(not include_finished)],
+        "events": room_index.stats(),
+    }
+
+
+@router.get("/rooms/{room}")
+async def get_room(room: str):
+    """Participants, tracks and metadata of one room, from webhooks"""
+    state = room_index.get(room)
+    if state is None:
+        raise HTTPException(status_code=404, detail="No webhooks seen for this room")
+    return state.snapshot()
+
+
+@router.get("/rooms/{room}/participants/{identity}")
+async def get_participant(room: str, identity: str):
+    """One participant and their published tracks, from webhooks"""
+    state = room_index.get(room)
+    participant = state.participants.get(identity) if state is not None else None
+    if participant is None:
+        raise HTTPException(status_code=404, detail=f"{identity} is not in room {room}")
+    return {**participant, "tracks": list(participant["tracks"].values())}
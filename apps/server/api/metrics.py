@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Response
+from utils.metrics import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
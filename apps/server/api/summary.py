@@ -0,0 +1,95 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from core.config import GROQ_TIMEOUT_SECONDS
+from services.ai_service import summary_cache, summary_streams
+from services.llm_router import llm_router
+from services.session_store import session_store
+
+router = APIRouter()
+
+# How often to re-read the session store for a summary produced by another worker
+SESSION_SUMMARY_POLL_SECONDS = 0.5
+
+
+def _session_snapshot(summary_id: str, session) -> dict:
+    return {
+        "summary_id": summary_id,
+        "status": "complete" if session.summary is not None else "streaming",
+        "summary": session.summary or "",
+        "error": None,
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/summaries/{summary_id}")
+async def get_summary(summary_id: str):
+    """Current text and status of a streamed summary"""
+    stream = summary_streams.get(summary_id)
+    if stream is not None:
+        return stream.snapshot()
+
+    # Started on another worker: serve what the shared session store has
+    session = await session_store.find_by_summary(summary_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    return _session_snapshot(summary_id, session)
+
+
+@router.get("/summaries/{summary_id}/stream")
+async def stream_summary(summary_id: str):
+    """Server-Sent Events: replay tokens produced so far, then follow live until done"""
+    stream = summary_streams.get(summary_id)
+    if stream is None:
+        session = await session_store.find_by_summary(summary_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        return StreamingResponse(
+            _session_summary_events(summary_id, session.session_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    async def events():
+        async for token in stream.subscribe():
+            yield _sse("token", {"text": token})
+        yield _sse("done", stream.snapshot())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _session_summary_events(summary_id: str, session_id: str):
+    """Whole-summary fallback for streams owned by another worker"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + 2 * GROQ_TIMEOUT_SECONDS
+    while True:
+        session = await session_store.get(session_id)
+        if session is None or session.summary is not None or loop.time() >= deadline:
+            break
+        await asyncio.sleep(SESSION_SUMMARY_POLL_SECONDS)
+
+    if session is not None and session.summary is not None:
+        yield _sse("token", {"text": session.summary})
+        yield _sse("done", _session_snapshot(summary_id, session))
+    else:
+        yield _sse("done", {"summary_id": summary_id, "status": "failed", "summary": "", "error": "summary unavailable"})
+
+
+@router.get("/health/summary-cache")
+async def summary_cache_stats():
+    """Hit, miss and coalesced counters for sizing the summary cache"""
+    return summary_cache.stats()
+
+
+@router.get("/health/llm-backends")
+async def llm_backend_stats():
+    """Per-backend latency percentiles, error rate, hedges and cooldown state"""
+    return llm_router.stats()
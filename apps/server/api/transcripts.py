@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException
+from schemas.requests import TranscriptAppendRequest
+from services.transcript_service import transcripts
+
+router = APIRouter()
+
+@router.post("/transcripts/{room}")
+async def append_transcript(room: str, request: TranscriptAppendRequest):
+    """Append utterances from a live call; the room's rolling summary refreshes in the background"""
+    for utterance in request.utterances:
+        transcript = transcripts.append(room, utterance.speaker, utterance.text)
+    return {
+        "room": room,
+        "utterances": transcript.utterances,
+        "pending_tokens": transcript.pending_tokens,
+        "refreshes": transcript.refreshes,
+    }
+
+@router.get("/transcripts/{room}")
+async def get_transcript(room: str):
+    """Rolling summary, pending delta size and recent utterances for a room"""
+    transcript = transcripts.get(room)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="No transcript for this room")
+    return transcript.snapshot()
+
+@router.delete("/transcripts/{room}")
+async def delete_transcript(room: str):
+    """Drop a room's transcript once its call has ended"""
+    if not transcripts.discard(room):
+        raise HTTPException(status_code=404, detail="No transcript for this room")
+    return {"room": room, "deleted": True}
+
+@router.get("/health/transcripts")
+async def transcript_stats():
+    return transcripts.stats()
@@ -1,28 +1,88 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from core.config import TRANSFER_DEADLINE_SECONDS
 from schemas.requests import TransferRequest
-from services.ai_service import generate_call_summary
+from services.agent_directory import agent_directory, reserve_agent
+from services.ai_service import summary_streams
+from services.transcript_service import summary_for_room
+from services.session_store import session_store, attach_summary_when_ready
+from models.transfer_session import TransferSession
+from utils.deadlines import DeadlineExceeded, route_deadline
 import uuid
 
 router = APIRouter()
 
-@router.post("/transfer")
+@router.post("/transfer", dependencies=[Depends(route_deadline(TRANSFER_DEADLINE_SECONDS))])
 async def initiate_transfer(request: TransferRequest):
     """Initiate warm transfer - Step 1: Create consultation room"""
+    summary_stream = session = reservation = None
     try:
         # Create consultation room
         consultation_room = f"consult-{uuid.uuid4().hex[:8]}"
+
+        agent_b_identity = None
+        if request.agent_b_skill:
+            # Reserved before the summary starts, so a transfer nobody can take fails fast
+            agent_b, reservation = reserve_agent(request.agent_b_skill, "livekit", exclude=(request.agent_a_identity,))
+            agent_b_identity = agent_b.identity
         
-        # Generate AI summary
-        ai_summary = await generate_call_summary(request.context or "")
+        # Precomputed transcript summary plus its delta, or a summary of `context`; clients follow it by summary_id
+        summary_stream = await summary_for_room(request.caller_room, request.context)
+        summary_id = summary_stream.summary_id
+
+        session = await session_store.save(TransferSession(
+            kind="livekit",
+            status="consultation_created",
+            caller_room=request.caller_room,
+            caller_identity=request.caller_identity,
+            agent_a_identity=request.agent_a_identity,
+            agent_b_identity=agent_b_identity,
+            reservation_id=reservation.reservation_id if reservation else None,
+            consultation_room=consultation_room,
+            participants=[request.caller_identity, request.agent_a_identity],
+            summary_id=summary_id,
+            summary=summary_stream.text if summary_stream.done else None
+        ))
+        if not summary_stream.done:
+            attach_summary_when_ready(session.session_id, summary_stream)
         
         return {
+            "session_id": session.session_id,
             "consultation_room": consultation_room,
-            "summary": ai_summary,
+            "summary": summary_stream.text,
+            "summary_id": summary_id,
+            "summary_status": summary_stream.status,
+            "summary_stream_url": f"/summaries/{summary_id}/stream",
             "original_room": request.caller_room,
             "caller_identity": request.caller_identity,
             "agent_a_identity": request.agent_a_identity,
-            "consultation_url": f"http://localhost:3000/agent-consultation?room={consultation_room}&summary={ai_summary}",
+            "agent_b_identity": agent_b_identity,
+            "reservation_id": session.reservation_id,
+            "consultation_url": f"http://localhost:3000/agent-consultation?room={consultation_room}&summary_id={summary_id}",
             "status": "consultation_created"
         }
+    except (DeadlineExceeded, HTTPException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Timed out, failed or the client left before the session existed: nobody will read the summary
+        if session is None and summary_stream is not None:
+            summary_streams.abandon(summary_stream)
+        if session is None and reservation is not None:
+            agent_directory.release(reservation.reservation_id)
+
+@router.get("/transfer-sessions/{session_id}")
+async def get_transfer_session(session_id: str):
+    """Current state of a transfer, readable from any worker"""
+    session = await session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Transfer session not found")
+    return session
+
+@router.get("/transfer-sessions/by-room/{room}")
+async def get_transfer_session_by_room(room: str):
+    """Latest transfer using this caller room, consultation room or conference name"""
+    session = await session_store.find_by_room(room)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Transfer session not found")
+    return session
@@ -1,19 +1,34 @@
-from fastapi import APIRouter, HTTPException, Request, Response
-from schemas.requests import PhoneCallRequest, ConferenceCallRequest, PhoneTransferRequest
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from core.config import TRANSFER_DEADLINE_SECONDS
+from schemas.requests import PhoneCallRequest, BulkCallRequest, ConferenceCallRequest, PhoneTransferRequest
+from services.agent_directory import agent_directory, reserve_agent
+from services.ai_service import summary_streams
+from services.conference_events import conference_events
 from services.twilio_service import twilio_service
-from services.ai_service import generate_call_summary
+from services.dialer_service import bulk_dialer
+from services.idempotency import idempotency
+from services.transcript_service import summary_for_room
+from services.signal_broker import caller_signals
+from services.session_store import session_store, attach_summary_when_ready
+from models.transfer_session import TransferSession
+from utils.deadlines import DeadlineExceeded, route_deadline
+import json
+import logging
 import uuid
-from core.config import TWILIO_ACCOUNT_SID, TWILIO_API_SECRET, TWILIO_API_KEY, TWILIO_APP_SID
-from twilio.twiml.voice_response import VoiceResponse
 from datetime import datetime
-from twilio.jwt.access_token import AccessToken
-from twilio.jwt.access_token.grants import VoiceGrant
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/call")
-async def make_phone_call(request: PhoneCallRequest):
-    """Make a direct phone call"""
+async def make_phone_call(request: PhoneCallRequest, idempotency_key: Optional[str] = Header(None)):
+    """Make a direct phone call; retries with the same Idempotency-Key get the first response back"""
+    return await idempotency.run(idempotency_key, "twilio_call", request, lambda: _make_phone_call(request))
+
+async def _make_phone_call(request: PhoneCallRequest):
     try:
         result = await twilio_service.make_call(
             to_number=request.phone_number,
@@ -24,12 +39,46 @@ async def make_phone_call(request: PhoneCallRequest):
             "message": f"Call initiated to {request.phone_number}",
             "call_details": result
         }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk-call")
+async def start_bulk_call(request: BulkCallRequest):
+    """Dial a list of numbers in the background, paced to the account's calls-per-second"""
+    job = await bulk_dialer.submit(request.phone_numbers, request.message)
+    return {
+        "status": "queued",
+        "job_id": job.job_id,
+        "total": len(job.entries),
+        "status_url": f"/twilio/bulk-call/{job.job_id}"
+    }
+
+@router.get("/bulk-call/{job_id}")
+async def get_bulk_call(job_id: str):
+    """Per-number progress of a bulk dial job"""
+    job = bulk_dialer.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk call job not found")
+    return job.snapshot()
+
+@router.post("/bulk-call/{job_id}/cancel")
+async def cancel_bulk_call(job_id: str):
+    """Stop dialing numbers that are still queued"""
+    job = bulk_dialer.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk call job not found")
+    job.cancel()
+    return {"job_id": job_id, "status": "cancelling" if not job.done else job.status}
+
 @router.post("/conference")
-async def create_conference_call(request: ConferenceCallRequest):
-    """Create a conference call with a phone number"""
+async def create_conference_call(request: ConferenceCallRequest, idempotency_key: Optional[str] = Header(None)):
+    """Create a conference call with a phone number; idempotent per Idempotency-Key"""
+    return await idempotency.run(idempotency_key, "twilio_conference", request,
+                                 lambda: _create_conference_call(request))
+
+async def _create_conference_call(request: ConferenceCallRequest):
     try:
         result = await twilio_service.create_conference_call(
             to_number=request.phone_number,
@@ -40,84 +89,105 @@ async def create_conference_call(request: ConferenceCallRequest):
             "message": f"Conference call created: {request.conference_name}",
             "call_details": result
         }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/transfer-to-phone")
-async def transfer_to_phone(request: PhoneTransferRequest):
-    """Transfer call to a real phone number via Twilio"""
+@router.post("/transfer-to-phone", dependencies=[Depends(route_deadline(TRANSFER_DEADLINE_SECONDS))])
+async def transfer_to_phone(request: PhoneTransferRequest, idempotency_key: Optional[str] = Header(None)):
+    """Transfer call to a real phone number via Twilio; a retried Idempotency-Key does not dial or summarize again"""
+    return await idempotency.run(idempotency_key, "twilio_transfer_to_phone", request,
+                                 lambda: _transfer_to_phone(request))
+
+async def _transfer_to_phone(request: PhoneTransferRequest):
+    if not request.phone_number and not request.agent_b_skill:
+        raise HTTPException(status_code=422, detail="Either phone_number or agent_b_skill is required")
+    summary_stream = session = reservation = None
     try:
-        # Generate AI summary
-        ai_summary = await generate_call_summary(request.context or "")
+        phone_number = request.phone_number
+        if not phone_number:
+            # Reserved before dialing, so a transfer nobody can take fails fast
+            agent_b, reservation = reserve_agent(request.agent_b_skill, "phone", exclude=(request.agent_a_identity,))
+            phone_number = agent_b.phone_number
+
+        # Precomputed transcript summary plus its delta, or a summary of `context`; clients follow it by summary_id
+        summary_stream = await summary_for_room(request.caller_room, request.context)
         
         # Create unique conference name
         conference_name = f"transfer-{uuid.uuid4().hex[:8]}"
         
         # Call the phone number and connect to conference
         phone_call = await twilio_service.create_conference_call(
-            to_number=request.phone_number,
+            to_number=phone_number,
             conference_name=conference_name
         )
+
+        session = await session_store.save(TransferSession(
+            kind="phone",
+            status="phone_transfer_initiated",
+            caller_room=request.caller_room,
+            caller_identity=request.caller_identity,
+            agent_a_identity=request.agent_a_identity,
+            phone_number=phone_number,
+            reservation_id=reservation.reservation_id if reservation else None,
+            conference_name=conference_name,
+            participants=[request.caller_identity, request.agent_a_identity],
+            summary_id=summary_stream.summary_id,
+            summary=summary_stream.text if summary_stream.done else None,
+            call_sids=[phone_call["call_sid"]]
+        ))
+        if not summary_stream.done:
+            attach_summary_when_ready(session.session_id, summary_stream)
         
         return {
+            "session_id": session.session_id,
             "status": "phone_transfer_initiated",
-            "message": f"Calling {request.phone_number} for warm transfer",
+            "message": f"Calling {phone_number} for warm transfer",
+            "reservation_id": session.reservation_id,
             "conference_name": conference_name,
-            "summary": ai_summary,
+            "summary": summary_stream.text,
+            "summary_id": summary_stream.summary_id,
+            "summary_status": summary_stream.status,
+            "summary_stream_url": f"/summaries/{summary_stream.summary_id}/stream",
             "phone_call_details": phone_call,
-            "instructions": f"Agent at {request.phone_number} will join conference '{conference_name}'"
+            "instructions": f"Agent at {phone_number} will join conference '{conference_name}'"
         }
         
+    except (DeadlineExceeded, HTTPException):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Dial timed out or failed, or the client left: nobody will read the summary
+        if session is None and summary_stream is not None:
+            summary_streams.abandon(summary_stream)
+        if session is None and reservation is not None:
+            agent_directory.release(reservation.reservation_id)
 
-@router.post("/web-join-conference")
-async def web_join_conference(request: dict):
-    try:
-        agent_identity = request["agent_identity"]
-        conference_name = request.get("conference_name", "")
-        
-        # Ensure unique identity with role prefix
-        if agent_identity.startswith('caller-'):
-            # For callers, add 'voice-' prefix to distinguish from LiveKit identity
-            twilio_identity = f"voice-{agent_identity}"
-        elif agent_identity.startswith('agent-'):
-            # For agents, add 'voice-' prefix
-            twilio_identity = f"voice-{agent_identity}"
-        else:
-            # Fallback
-            twilio_identity = f"voice-{agent_identity}"
-            
-        print(f"🎯 Creating token for identity: {twilio_identity}")
-        
-        # Create token with unique identity
-        token = AccessToken(
-            TWILIO_ACCOUNT_SID,
-            TWILIO_API_KEY,
-            TWILIO_API_SECRET,
-            identity=twilio_identity,  # Use unique identity
-            ttl=14400  # 4 hours
-        )
-        
-        voice_grant = VoiceGrant(
-            outgoing_application_sid=TWILIO_APP_SID,
-            incoming_allow=True
-        )
-        token.add_grant(voice_grant)
-        
-        return {
-            "access_token": token.to_jwt(),
-            "identity": twilio_identity
-        }
-        
-    except Exception as e:
-        print(f"❌ Token creation error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def _release_agent_b(state, event: dict):
+    """A phone transfer ends with its conference, or when Agent B's call leaves it: free Agent B's reservation"""
+    kind = event.get("StatusCallbackEvent")
+    if kind not in ("conference-end", "participant-leave"):
+        return
+    session = await session_store.find_by_room(state.name)
+    if session is None or not session.reservation_id:
+        return
+    # The first call placed for a phone transfer is the one to Agent B
+    if kind == "participant-leave" and event.get("CallSid") not in session.call_sids[:1]:
+        return
+    if agent_directory.release(session.reservation_id):
+        logger.info("Agent B reservation released", extra={"session_id": session.session_id, "event": kind})
 
+conference_events.subscribe(_release_agent_b)
 
-@router.post("/bridge-to-conference") 
-async def bridge_to_conference(request: dict):
-    """Add caller to existing conference"""
+@router.post("/bridge-to-conference")
+async def bridge_to_conference(request: dict, idempotency_key: Optional[str] = Header(None)):
+    """Add caller to existing conference; idempotent per Idempotency-Key"""
+    return await idempotency.run(idempotency_key, "twilio_bridge_to_conference", request,
+                                 lambda: _bridge_to_conference(request))
+
+async def _bridge_to_conference(request: dict):
     try:
         # This will add the LiveKit caller's phone to the conference
         # You'll need the caller's phone number for this
@@ -125,80 +195,26 @@ async def bridge_to_conference(request: dict):
             to_number=request["caller_phone"],  # Get from UI or user data
             conference_name=request["conference_name"]
         )
+
+        session = await session_store.find_by_room(request["conference_name"])
+        if session is not None:
+            await session_store.update(
+                session.session_id,
+                status="caller_bridged",
+                call_sids=session.call_sids + [caller_call["call_sid"]]
+            )
         
         return {
             "status": "caller_added_to_conference",
             "caller_call": caller_call
         }
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/conference-status")
-async def conference_status_webhook(request: Request):
-    """Handle Twilio conference status callbacks"""
-    form_data = await request.form()
-    
-    event = form_data.get('StatusCallbackEvent')
-    conference_name = form_data.get('ConferenceFriendlyName')
-    participant_label = form_data.get('ParticipantLabel')
-    
-    # Log the event
-    print(f"Conference Event: {event} in {conference_name} for {participant_label}")
-
-    
-    return {"status": "received"}
-
-@router.post("/voice-webhook")
-async def voice_webhook(request: Request):
-    """Handle TwiML requests from web clients"""
-    try:
-        form_data = await request.form()
-        to = form_data.get('To', '')
-        from_param = form_data.get('From', '')
-        
-        print(f"🎯 Webhook called: To={to}, From={from_param}")
-        
-        response = VoiceResponse() 
-        
-        # Handle web client connecting to conference
-        if to and to.startswith('transfer-'):
-            print(f"✅ Connecting web client to conference: {to}")
-            response.say("Connecting you to the conference.", voice="alice")
-            
-            dial = response.dial()
-            dial.conference(to, 
-                           start_conference_on_enter=True,
-                           end_conference_on_exit=False,
-                           beep=False,
-                           wait_url="",  # No hold music for web client
-                           max_participants=10)
-        else:
-            # Default response
-            response.say("Welcome to the voice application.", voice="alice")
-        
-        twiml_str = str(response)
-        print(f"📤 Returning TwiML: {twiml_str}")
-        
-        return Response(content=twiml_str, media_type="application/xml")
-        
-    except Exception as e:
-        print(f"❌ Webhook error: {e}")
-        import traceback
-        traceback.print_exc()  # Print full error for debugging
-        
-        # Always return valid TwiML even on error
-        error_response = VoiceResponse()
-        error_response.say("There was an error connecting to the conference. Please try again.", voice="alice")
-        return Response(content=str(error_response), media_type="application/xml")
-
-@router.get("/webhook-health")
-async def webhook_health():
-    """Health check for webhook connectivity"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
-
-
 @router.post("/signal-caller-join")
 async def signal_caller_join(request: dict):
     """Signal the caller to join Twilio conference"""
@@ -207,18 +223,16 @@ async def signal_caller_join(request: dict):
         conference_name = request.get("conference_name") 
         message = request.get("message")
         
-        # Here we could use WebSocket, Server-Sent Events, or polling
-        # For simplicity, we'll store the signal in a simple in-memory dict
-        # In production, use Redis or a proper message queue
-        
-        if not hasattr(signal_caller_join, 'signals'):
-            signal_caller_join.signals = {}
-            
-        signal_caller_join.signals[room_name] = {
+        # Wakes any subscriber or long-poller on the room immediately
+        await caller_signals.publish(room_name, {
             'conference_name': conference_name,
             'message': message,
-            'timestamp': datetime.now()
-        }
+            'timestamp': datetime.now().isoformat()
+        })
+
+        session = await session_store.find_by_room(conference_name or room_name)
+        if session is not None:
+            await session_store.update(session.session_id, status="caller_signaled")
         
         return {
             "status": "signal_sent",
@@ -231,16 +245,41 @@ async def signal_caller_join(request: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/check-caller-signal/{room_name}")
-async def check_caller_signal(room_name: str):
-    """Check if caller should join Twilio conference"""
+async def check_caller_signal(room_name: str, wait: float = Query(0, ge=0, le=30)):
+    """Check if caller should join Twilio conference; `wait` > 0 long-polls for up to that many seconds"""
     try:
-        if hasattr(signal_caller_join, 'signals') and room_name in signal_caller_join.signals:
-            signal = signal_caller_join.signals[room_name]
-            # Clear the signal after retrieving it
-            del signal_caller_join.signals[room_name]
+        signal = await caller_signals.wait(room_name, wait)
+        if signal is not None:
             return signal
         
         return {"message": "no_signal"}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/caller-signal/{room_name}/events")
+async def caller_signal_events(room_name: str):
+    """Server-Sent Events stream of signals for a room, pushed as soon as they are posted"""
+
+    async def events():
+        async for signal in caller_signals.subscribe(room_name):
+            if signal is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: signal\ndata: {json.dumps(signal)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/caller-signal-stats")
+async def caller_signal_stats():
+    """Pending signals, waiting rooms and delivery counters"""
+    return caller_signals.stats()
+
+@router.get("/idempotency-stats")
+async def idempotency_stats():
+    """Keyed requests run, joined by concurrent duplicates, replayed, and rejected for a changed body"""
+    return idempotency.stats()
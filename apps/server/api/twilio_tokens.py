@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException
+from services.session_store import session_store
+from services.token_service import token_minter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Browser voice tokens; mounted under /twilio by the "tokens" and "full" roles
+router = APIRouter()
+
+@router.post("/web-join-conference")
+async def web_join_conference(request: dict):
+    try:
+        agent_identity = request["agent_identity"]
+        conference_name = request.get("conference_name", "")
+        
+        # Ensure unique identity with role prefix
+        if agent_identity.startswith('caller-'):
+            # For callers, add 'voice-' prefix to distinguish from LiveKit identity
+            twilio_identity = f"voice-{agent_identity}"
+        elif agent_identity.startswith('agent-'):
+            # For agents, add 'voice-' prefix
+            twilio_identity = f"voice-{agent_identity}"
+        else:
+            # Fallback
+            twilio_identity = f"voice-{agent_identity}"
+            
+        logger.info("Creating Twilio voice token", extra={"identity": twilio_identity})
+        
+        # Create token with unique identity (reused on quick reconnects)
+        access_token, expires_at = token_minter.twilio_voice_token(twilio_identity)
+
+        session = await session_store.find_by_room(conference_name) if conference_name else None
+        if session is not None:
+            await session_store.update(session.session_id, add_participants=[twilio_identity])
+        
+        return {
+            "access_token": access_token,
+            "identity": twilio_identity,
+            "expires_at": int(expires_at)
+        }
+        
+    except Exception as e:
+        logger.exception("Twilio voice token creation failed")
+        raise HTTPException(status_code=500, detail=str(e))
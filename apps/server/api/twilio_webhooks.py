@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from services.conference_events import conference_events
+from utils import twiml as twiml_templates
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+# High-volume TwiML bodies; sampled through LOG_SAMPLE_RATES
+twiml_logger = logging.getLogger("twiml")
+
+# Twilio-facing callbacks; needs no SDK or credentials, so webhook-only pods start fast
+router = APIRouter()
+
+@router.post("/conference-status")
+async def conference_status_webhook(request: Request):
+    """Handle Twilio conference status callbacks"""
+    form_data = await request.form()
+    
+    # Acknowledge right away; logging and state updates happen in the background consumer
+    conference_events.record(dict(form_data))
+    
+    return {"status": "received"}
+
+
+@router.get("/conferences")
+async def list_conferences(include_completed: bool = False):
+    """Conferences currently known from status callbacks, without calling the Twilio API"""
+    return {
+        "conferences": [state.snapshot() for state in conference_events.conferences(not include_completed)],
+        "events": conference_events.stats(),
+    }
+
+
+@router.get("/conferences/{conference_name}")
+async def get_conference(conference_name: str):
+    """Current membership of one conference, from status callbacks"""
+    state = conference_events.get(conference_name)
+    if state is None:
+        raise HTTPException(status_code=404, detail="No status events seen for this conference")
+    return state.snapshot()
+
+@router.post("/voice-webhook")
+async def voice_webhook(request: Request):
+    """Handle TwiML requests from web clients"""
+    try:
+        form_data = await request.form()
+        to = form_data.get('To', '')
+        from_param = form_data.get('From', '')
+        
+        logger.info("Voice webhook", extra={"to": to, "from": from_param})
+        
+        # Precompiled templates: only the conference name is escaped per request
+        if to and to.startswith('transfer-'):
+            twiml = twiml_templates.WEB_JOIN_CONFERENCE.render(conference_name=to)
+        else:
+            # Default response
+            twiml = twiml_templates.DEFAULT_GREETING
+        
+        if twiml_logger.isEnabledFor(logging.DEBUG):
+            twiml_logger.debug("TwiML response", extra={"to": to, "twiml": twiml.decode()})
+        
+        return Response(content=twiml, media_type="application/xml")
+        
+    except Exception:
+        logger.exception("Voice webhook failed")
+        
+        # Always return valid TwiML even on error
+        return Response(content=twiml_templates.WEBHOOK_ERROR, media_type="application/xml")
+
+@router.get("/webhook-health")
+async def webhook_health():
+    """Health check for webhook connectivity"""
+    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException, Query
+from schemas.requests import WarmTransferRequest
+from services.transfer_orchestrator import warm_transfers
+
+router = APIRouter()
+
+@router.post("/warm-transfer")
+async def start_warm_transfer(request: WarmTransferRequest):
+    """Start every transfer step at once and return a handle to follow them"""
+    try:
+        session, summary_stream = await warm_transfers.start(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    handle = {
+        "session_id": session.session_id,
+        "kind": session.kind,
+        "status": session.status,
+        "steps": session.steps,
+        "status_url": f"/warm-transfer/{session.session_id}",
+        "summary_id": summary_stream.summary_id,
+        "summary_status": summary_stream.status,
+        "summary_stream_url": f"/summaries/{summary_stream.summary_id}/stream",
+        "caller_room": session.caller_room,
+    }
+    if session.kind == "phone":
+        handle["conference_name"] = session.conference_name
+        handle["phone_number"] = session.phone_number
+    else:
+        handle["consultation_room"] = session.consultation_room
+        handle["consultation_url"] = (
+            f"http://localhost:3000/agent-consultation?room={session.consultation_room}"
+            f"&summary_id={summary_stream.summary_id}"
+        )
+    return handle
+
+@router.get("/warm-transfer/{session_id}")
+async def get_warm_transfer(session_id: str, wait: float = Query(0, ge=0, le=30)):
+    """Per-step status of a warm transfer; `wait` long-polls until every step has finished"""
+    session = await warm_transfers.wait(session_id, wait)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Transfer session not found")
+    return session
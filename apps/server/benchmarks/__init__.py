@@ -0,0 +1 @@
+# Load tests and micro-benchmarks, run from apps/server with `python -m benchmarks.<name>`
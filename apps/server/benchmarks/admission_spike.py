@@ -0,0 +1,139 @@
+"""A spike of transfers with and without admission control, while Twilio webhooks keep arriving.
+
+--spike clients each POST --route once (/twilio/transfer-to-phone, or /transfer),
+all within --ramp seconds, and give up after --client-timeout. Answered transfers
+then follow their summary until it is done. Meanwhile /twilio/voice-webhook is
+called at --webhook-rate per second, the way Twilio keeps calling during a spike.
+Per mode:
+  ok         transfers answered 2xx in time whose summary completed
+  fallback   answered 2xx, but the summary timed out into the fallback text
+  shed       answered 503/429 with Retry-After (the summary queue bound applies in both modes)
+  timed out  the client gave up first
+  fail ms    median time until a client learned its transfer would not happen
+  webhook    p50/p99 latency of the webhooks sent during the spike
+
+Usage (from apps/server):
+    python -m benchmarks.admission_spike --spike 600 --ramp 1
+    python -m benchmarks.admission_spike --route transfer --spike 200 --llm-latency 0.5 --llm-timeout 2
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from benchmarks.stubs import StubProcess, groq_stub_app, twilio_stub_app, use_dummy_env
+from benchmarks.summary_load import wait_for_summary
+from benchmarks.transfer_flow import percentile
+
+ROUTES = {"phone": "/twilio/transfer-to-phone", "transfer": "/transfer"}
+
+
+async def spike(client, args) -> dict:
+    outcomes = {"ok": 0, "fallback": 0, "shed": 0, "timed out": 0, "error": 0}
+    fail_times, webhook_times = [], []
+    done = asyncio.Event()
+
+    async def transfer(n: int):
+        await asyncio.sleep(args.ramp * n / args.spike)
+        body = {"caller_room": f"room-{n}", "caller_identity": f"caller-{n}", "agent_a_identity": f"agent-{n}",
+                "context": f"spike {n} {uuid.uuid4().hex[:6]}"}
+        if args.route == "phone":
+            body["phone_number"] = f"+1555{n:07d}"
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                client.post(ROUTES[args.route], json=body, headers={"X-Caller-Identity": f"caller-{n}"}),
+                args.client_timeout,
+            )
+        except asyncio.TimeoutError:
+            outcomes["timed out"] += 1
+            fail_times.append(time.perf_counter() - started)
+            return
+        if response.status_code < 300:
+            status = await wait_for_summary(client, response.json()["summary_id"], 0.05)
+            outcomes["ok" if status == "complete" else "fallback"] += 1
+            return
+        outcomes["shed" if response.status_code in (429, 503) else "error"] += 1
+        fail_times.append(time.perf_counter() - started)
+
+    async def webhooks():
+        while not done.is_set():
+            started = time.perf_counter()
+            response = await client.post("/twilio/voice-webhook", data={"To": "transfer-abc", "From": "client:x"})
+            if response.status_code == 200:
+                webhook_times.append(time.perf_counter() - started)
+            await asyncio.sleep(max(0.0, 1 / args.webhook_rate - (time.perf_counter() - started)))
+
+    poller = asyncio.create_task(webhooks())
+    await asyncio.gather(*(transfer(n) for n in range(args.spike)))
+    done.set()
+    await poller
+    return {"outcomes": outcomes, "fail_times": fail_times, "webhook_times": webhook_times}
+
+
+async def run(args) -> dict:
+    import httpx
+    from main import create_app
+
+    for noisy in ("httpx", "services", "api", "twiml", "core"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+
+    results = {}
+    for mode, enabled in (("off", False), ("on", True)):
+        app = create_app(admission=enabled)
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=120) as client:
+                results[mode] = await spike(client, args)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--route", choices=ROUTES, default="phone")
+    parser.add_argument("--spike", type=int, default=600, help="transfer requests in the spike")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which they arrive")
+    parser.add_argument("--client-timeout", type=float, default=5.0)
+    parser.add_argument("--webhook-rate", type=float, default=50.0)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-timeout", type=float, default=10.0, help="GROQ_TIMEOUT_SECONDS")
+    parser.add_argument("--llm-concurrency", type=int, default=16, help="GROQ_MAX_CONCURRENCY")
+    parser.add_argument("--summary-queue", type=int, default=32, help="SUMMARY_MAX_QUEUED")
+    parser.add_argument("--twilio-latency", type=float, default=0.3)
+    parser.add_argument("--twilio-concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=18120, help="first of two stub ports")
+    args = parser.parse_args()
+
+    with StubProcess(groq_stub_app, args.port, latency=args.llm_latency) as groq, \
+            StubProcess(twilio_stub_app, args.port + 1, latency=args.twilio_latency) as twilio:
+        use_dummy_env(
+            GROQ_BASE_URL=groq.url,
+            GROQ_TIMEOUT_SECONDS=args.llm_timeout,
+            GROQ_MAX_CONCURRENCY=args.llm_concurrency,
+            SUMMARY_MAX_QUEUED=args.summary_queue,
+            TWILIO_API_BASE_URL=twilio.url,
+            TWILIO_CALLS_PER_SECOND=1000,
+            TWILIO_MAX_CONCURRENCY=args.twilio_concurrency,
+            CONFERENCE_EVENT_DB="",
+            LOG_LEVEL="WARNING",
+        )
+        results = asyncio.run(run(args))
+
+    capacity = args.twilio_concurrency / args.twilio_latency
+    print(f"{args.spike} {ROUTES[args.route]} over {args.ramp}s (dial capacity ~{capacity:.0f}/s, "
+          f"{args.llm_concurrency} summaries at a time), client timeout {args.client_timeout}s, "
+          f"webhooks at {args.webhook_rate}/s")
+    print(f"{'admission':<11}{'ok':>6}{'fallback':>10}{'shed':>6}{'timed out':>11}{'fail p50 ms':>13}"
+          f"{'webhook p50':>13}{'webhook p99':>13}{'webhooks':>10}")
+    for mode, result in results.items():
+        outcomes = result["outcomes"]
+        fails = [t * 1000 for t in result["fail_times"]] or [0.0]
+        hooks = [t * 1000 for t in result["webhook_times"]] or [0.0]
+        print(f"{mode:<11}{outcomes['ok']:>6}{outcomes['fallback']:>10}{outcomes['shed']:>6}{outcomes['timed out']:>11}"
+              f"{percentile(fails, 50):>13.1f}{percentile(hooks, 50):>13.1f}{percentile(hooks, 99):>13.1f}"
+              f"{len(result['webhook_times']):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Skill-based routing decisions per second with many agents and constant churn.
+
+--agents agents each have --skills-per-agent of --skills skills and capacity 2. Every
+step routes one transfer for a random skill (reserving the agent), releases random
+reservations to keep about half the capacity in use, flips the presence of --churn
+agents (available <-> away) and, every 20 steps, replaces one agent's skills. Both
+directories replay the same seeded workload:
+  heap   per-skill priority queues (services.agent_directory), O(log n) per decision
+  scan   the same directory choosing by a scan over every agent, O(n) per decision
+
+Usage (from apps/server):
+    python -m benchmarks.agent_routing --agents 10000 --steps 20000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.stubs import use_dummy_env
+from benchmarks.transfer_flow import percentile
+
+
+def scan_directory():
+    from services.agent_directory import AgentDirectory
+
+    class ScanDirectory(AgentDirectory):
+        """Chooses the agent with a linear scan; keeps no heaps"""
+
+        def _touch(self, agent):
+            agent.version = next(self._sequence)
+            agent.updated_at = time.time()
+
+        def route(self, skill=None, channel="livekit", exclude=()):
+            self._expire()
+            best = None
+            for agent in self._agents.values():
+                if not agent.available or agent.agent_id in exclude:
+                    continue
+                if (skill and skill not in agent.skills) or not (agent.identity if channel == "livekit" else agent.phone_number):
+                    continue
+                if best is None or (agent.load / agent.capacity, agent.last_assigned) < (best.load / best.capacity, best.last_assigned):
+                    best = agent
+            if best is None:
+                self.unroutable += 1
+                return None
+            self.routed += 1
+            return best, self._reserve(best, skill, channel)
+
+    return ScanDirectory(reservation_seconds=3600, default_capacity=2)
+
+
+def workload(directory, args) -> dict:
+    rng = random.Random(args.seed)
+    skills = [f"skill-{n}" for n in range(args.skills)]
+    for n in range(args.agents):
+        directory.upsert(f"agent-{n}", identity=f"agent-b-{n}", phone_number=f"+1555{n:07d}",
+                         skills=rng.sample(skills, args.skills_per_agent))
+    target = args.agents  # Half of the total capacity (2 per agent)
+    outstanding, decisions = [], []
+    started = time.perf_counter()
+    for step in range(args.steps):
+        skill = rng.choice(skills)
+        excluded = (f"agent-{rng.randrange(args.agents)}",)
+        decided = time.perf_counter()
+        routed = directory.route(skill, "livekit", exclude=excluded)
+        decisions.append(time.perf_counter() - decided)
+        if routed is not None:
+            outstanding.append(routed[1].reservation_id)
+        while len(outstanding) > target or (outstanding and rng.random() < 0.5):
+            index = rng.randrange(len(outstanding))
+            outstanding[index], outstanding[-1] = outstanding[-1], outstanding[index]
+            directory.release(outstanding.pop())
+        for _ in range(args.churn):
+            agent_id = f"agent-{rng.randrange(args.agents)}"
+            directory.set_status(agent_id, "away" if rng.random() < 0.3 else "available")
+        if step % 20 == 0:
+            n = rng.randrange(args.agents)
+            directory.upsert(f"agent-{n}", identity=f"agent-b-{n}", phone_number=f"+1555{n:07d}",
+                             skills=rng.sample(skills, args.skills_per_agent))
+    return {"elapsed": time.perf_counter() - started, "decisions": decisions, "stats": directory.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=10000)
+    parser.add_argument("--skills", type=int, default=20)
+    parser.add_argument("--skills-per-agent", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=20000, help="routing decisions per directory")
+    parser.add_argument("--churn", type=int, default=5, help="presence changes per step")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    use_dummy_env()
+    from services.agent_directory import AgentDirectory
+
+    results = {
+        "heap": workload(AgentDirectory(reservation_seconds=3600, default_capacity=2), args),
+        "scan": workload(scan_directory(), args),
+    }
+
+    print(f"{args.agents} agents, {args.skills} skills ({args.skills_per_agent} each), {args.steps} decisions, "
+          f"{args.churn} presence changes per decision")
+    print(f"{'index':<7}{'decisions/s':>13}{'p50 us':>9}{'p99 us':>9}{'routed':>9}{'none':>7}{'heap entries':>14}")
+    for name, result in results.items():
+        decisions = [t * 1e6 for t in result["decisions"]]
+        stats = result["stats"]
+        print(f"{name:<7}{len(decisions) / sum(result['decisions']):>13,.0f}{percentile(decisions, 50):>9.1f}"
+              f"{percentile(decisions, 99):>9.1f}{stats['routed']:>9}{stats['unroutable']:>7}{stats['heap_entries']:>14}")
+
+
+if __name__ == "__main__":
+    main()
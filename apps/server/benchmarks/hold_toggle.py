@@ -0,0 +1,99 @@
+"""Hold/resume toggling with and without the participant cache, then one bulk hold.
+
+Each of --rooms rooms holds a caller, an agent and --extra other participants. Every
+room toggles its caller's hold --toggles times, rooms in parallel. With the cache
+("cached") the room is listed once; without it ("uncached", TTL 0) every toggle
+lists the room again before muting. Reported per mode: LiveKit requests by method and
+toggle latency. Then every room is held with one bulk hold (agents are skipped).
+
+Usage (from apps/server):
+    python -m benchmarks.hold_toggle --rooms 50 --toggles 10
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.stubs import StubServer, livekit_stub_app, seed_livekit_participant, use_dummy_env
+from benchmarks.transfer_flow import percentile
+
+
+async def toggles(args, ttl_seconds: float) -> list:
+    from schemas.requests import HoldCallerRequest
+    from services import livekit_service
+
+    livekit_service.participant_cache.ttl_seconds = ttl_seconds
+    lkapi = await livekit_service.get_livekit_api()
+    samples = []
+
+    async def room(n: int):
+        for toggle in range(args.toggles):
+            started = time.perf_counter()
+            await livekit_service.hold_caller_service(
+                HoldCallerRequest(caller_identity=f"caller-{n}", room=f"room-{n}", hold=toggle % 2 == 0), lkapi=lkapi
+            )
+            samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(room(n) for n in range(args.rooms)))
+    return samples
+
+
+async def run(args, stub) -> dict:
+    from services import livekit_service
+
+    logging.getLogger("services").setLevel(logging.ERROR)
+    await livekit_service.startup()
+    results = {}
+    try:
+        for mode, ttl_seconds in (("uncached", 0.0), ("cached", 60.0)):
+            for room in range(args.rooms):
+                livekit_service.participant_cache.invalidate(f"room-{room}")
+            stub.state.method_counts.clear()
+            samples = await toggles(args, ttl_seconds)
+            results[mode] = (samples, dict(stub.state.method_counts))
+
+        stub.state.method_counts.clear()
+        started = time.perf_counter()
+        bulk = await livekit_service.hold_rooms([f"room-{n}" for n in range(args.rooms)], hold=True)
+        results["bulk"] = (time.perf_counter() - started, bulk, dict(stub.state.method_counts))
+    finally:
+        await livekit_service.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--toggles", type=int, default=10, help="hold/resume toggles per room")
+    parser.add_argument("--extra", type=int, default=2, help="other participants per room")
+    parser.add_argument("--livekit-latency", type=float, default=0.02)
+    parser.add_argument("--port", type=int, default=18130)
+    args = parser.parse_args()
+
+    stub = livekit_stub_app(latency=args.livekit_latency)
+    for n in range(args.rooms):
+        seed_livekit_participant(stub, f"room-{n}", f"caller-{n}")
+        seed_livekit_participant(stub, f"room-{n}", f"agent-a-{n}")
+        for extra in range(args.extra):
+            seed_livekit_participant(stub, f"room-{n}", f"guest-{n}-{extra}")
+
+    with StubServer(stub, args.port) as livekit:
+        use_dummy_env(LIVEKIT_URL=livekit.url, LOG_LEVEL="WARNING")
+        results = asyncio.run(run(args, stub))
+
+    print(f"{args.rooms} rooms x {args.toggles} toggles, {args.extra + 2} participants per room, "
+          f"livekit {args.livekit_latency}s")
+    print(f"{'mode':<10}{'list':>7}{'mute':>7}{'subs':>7}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode in ("uncached", "cached"):
+        samples, counts = results[mode]
+        times = [t * 1000 for t in samples]
+        print(f"{mode:<10}{counts.get('ListParticipants', 0):>7}{counts.get('MutePublishedTrack', 0):>7}"
+              f"{counts.get('UpdateSubscriptions', 0):>7}{percentile(times, 50):>9.1f}{percentile(times, 95):>9.1f}")
+    elapsed, bulk, counts = results["bulk"]
+    held = sum(1 for result in bulk if result["status"] == "success")
+    print(f"bulk hold: {held}/{len(bulk)} participants in {elapsed * 1000:.0f}ms, "
+          f"{counts.get('ListParticipants', 0)} listings (cached), {counts.get('MutePublishedTrack', 0)} mutes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Summary latency with one LLM backend vs hedged routing across two.
+
+Two stub LLMs run in their own processes:
+  primary    fast, but a fraction of requests hit a long tail (--tail-rate, --tail-latency)
+  secondary  steadier and a little slower
+
+Scenarios, each with a fresh router:
+  single        primary only (the old behaviour)
+  hedged        primary, hedged to secondary after primary's tracked p95
+  primary-down  primary failing every request; the router fails over, then skips it during cooldown
+
+Usage (from apps/server):
+    python -m benchmarks.llm_hedging --requests 400 --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.stubs import StubProcess, groq_stub_app, use_dummy_env
+from benchmarks.transfer_flow import percentile
+
+
+async def drive(router, requests: int, concurrency: int, timeout: float) -> dict:
+    messages = [{"role": "user", "content": "Summarize: caller was charged twice."}]
+    counter = iter(range(requests))
+    latencies, failures = [], 0
+
+    async def worker():
+        nonlocal failures
+        for _ in counter:
+            started = time.perf_counter()
+            try:
+                await router.complete(messages, timeout)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    await router.startup()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await router.shutdown()
+    return {"latencies": latencies, "failures": failures, "backends": router.stats()}
+
+
+async def run(args, primary_url: str, secondary_url: str, down_url: str) -> dict:
+    from services.llm_router import LLMRouter, parse_backends
+
+    logging.getLogger("services").setLevel(logging.ERROR)
+
+    def router(spec: str):
+        return LLMRouter(parse_backends(spec), hedge_percentile=args.hedge_percentile, min_samples=20,
+                         hedge_delay=1.0, cooldown=args.cooldown)
+
+    scenarios = {
+        "single": f"groq:stub@{primary_url}",
+        "hedged": f"groq:stub@{primary_url},groq:stub@{secondary_url}",
+        "primary-down": f"groq:stub@{down_url},groq:stub@{secondary_url}",
+    }
+    return {
+        name: await drive(router(spec), args.requests, args.concurrency, args.timeout)
+        for name, spec in scenarios.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--primary-latency", type=float, default=0.15)
+    parser.add_argument("--tail-rate", type=float, default=0.08, help="fraction of primary requests in the tail")
+    parser.add_argument("--tail-latency", type=float, default=2.5)
+    parser.add_argument("--secondary-latency", type=float, default=0.3)
+    parser.add_argument("--hedge-percentile", type=float, default=90)
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request deadline")
+    parser.add_argument("--cooldown", type=float, default=5.0, help="seconds a failing backend is skipped")
+    parser.add_argument("--port", type=int, default=18110, help="first of three stub ports")
+    args = parser.parse_args()
+
+    with StubProcess(groq_stub_app, args.port, latency=args.primary_latency, slow_rate=args.tail_rate,
+                     slow_latency=args.tail_latency) as primary, \
+            StubProcess(groq_stub_app, args.port + 1, latency=args.secondary_latency) as secondary, \
+            StubProcess(groq_stub_app, args.port + 2, latency=0.05, error_rate=1.0) as down:
+        use_dummy_env(GROQ_MAX_RETRIES=0, LOG_LEVEL="WARNING")
+        results = asyncio.run(run(args, primary.url, secondary.url, down.url))
+
+    print(f"{args.requests} requests per scenario, concurrency {args.concurrency}; primary {args.primary_latency}s "
+          f"with {args.tail_rate:.0%} at {args.tail_latency}s, secondary {args.secondary_latency}s")
+    print(f"{'scenario':<14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'failed':>8}  per backend (requests/wins/hedged/errors)")
+    for name, result in results.items():
+        samples = [latency * 1000 for latency in result["latencies"]]
+        backends = "  ".join(
+            f"#{i}: {b['requests']}/{b['wins']}/{b['hedged']}/{b['errors']}" for i, b in enumerate(result["backends"], 1)
+        )
+        print(f"{name:<14}{percentile(samples, 50):>9.1f}{percentile(samples, 95):>9.1f}"
+              f"{percentile(samples, 99):>9.1f}{max(samples):>9.1f}{result['failures']:>8}  {backends}")
+
+
+if __name__ == "__main__":
+    main()
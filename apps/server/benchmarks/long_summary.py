@@ -0,0 +1,105 @@
+"""Summaries of long call transcripts: one prompt vs token-budgeted map-reduce.
+
+Rows:
+  single-shot   the whole transcript in one completion (the old path)
+  map-reduce    first submission: every chunk summarized concurrently, then combined
+  appended      the same transcript plus a few new lines: only the last chunk and
+                the combine step go to the LLM, earlier chunk summaries are reused
+
+The stub LLM's latency grows with prompt size (--latency-per-kchar), and with
+--max-prompt-chars it rejects oversized prompts the way a token limit would.
+
+Usage (from apps/server):
+    python -m benchmarks.long_summary --lines 3000 --latency-per-kchar 0.02
+    python -m benchmarks.long_summary --lines 3000 --max-prompt-chars 48000
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+from benchmarks.stubs import StubServer, groq_stub_app, use_dummy_env
+
+PHRASES = (
+    "I was charged twice for the same order",
+    "the refund has not arrived after ten days",
+    "my account number ends in 4471",
+    "can you check the billing address on file",
+    "I already reset the password but still cannot log in",
+    "please escalate this to a supervisor",
+    "the technician never showed up on Tuesday",
+)
+
+
+def transcript(lines: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(lines):
+        speaker = "caller" if i % 2 == 0 else "agent-a"
+        rows.append(f"[{i // 60:02d}:{i % 60:02d}] {speaker}: {rng.choice(PHRASES)}, {rng.choice(PHRASES)}.")
+    return "\n".join(rows)
+
+
+async def run(args, stub_app):
+    from services import ai_service
+
+    for noisy in ("httpx", "services"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+
+    await ai_service.startup()
+    context = transcript(args.lines)
+    appended = context + "\n" + transcript(args.append, seed=2)
+    rows = []
+
+    async def measure(label, call):
+        requests_before = stub_app.state.requests
+        errors_before = stub_app.state.errors
+        chars_before = len(stub_app.state.prompt_chars)
+        started = time.perf_counter()
+        try:
+            summary = await call()
+            outcome = "ok"
+        except Exception as e:
+            summary, outcome = "", f"failed: {type(e).__name__}"
+        elapsed = time.perf_counter() - started
+        prompts = stub_app.state.prompt_chars[chars_before:]
+        rows.append((label, elapsed, stub_app.state.requests - requests_before,
+                     stub_app.state.errors - errors_before, max(prompts, default=0), outcome, summary))
+
+    await measure("single-shot", lambda: ai_service._request_summary(
+        ai_service._summary_messages(context), ai_service.GROQ_TIMEOUT_SECONDS))
+    await measure("map-reduce", lambda: ai_service.generate_call_summary(context))
+    await measure("appended", lambda: ai_service.generate_call_summary(appended))
+    await ai_service.shutdown()
+
+    chunks = ai_service.split_chunks(context)
+    print(f"transcript: {args.lines} lines, ~{ai_service.estimate_tokens(context)} tokens, "
+          f"{len(chunks)} chunks of <= {ai_service.SUMMARY_CHUNK_TOKENS} tokens "
+          f"(budget {ai_service.SUMMARY_TOKEN_BUDGET}); appended {args.append} lines")
+    print(f"{'path':<14}{'seconds':>9}{'llm calls':>11}{'errors':>8}{'largest prompt':>16}  outcome")
+    for label, elapsed, calls, errors, largest, outcome, _ in rows:
+        print(f"{label:<14}{elapsed:>9.2f}{calls:>11}{errors:>8}{largest:>16}  {outcome}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=3000, help="transcript lines (~25 tokens each)")
+    parser.add_argument("--append", type=int, default=20, help="lines added before resubmitting")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--latency-per-kchar", type=float, default=0.02, help="extra stub latency per 1000 prompt chars")
+    parser.add_argument("--max-prompt-chars", type=int, default=0, help="stub rejects larger prompts (0: no limit)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=18098)
+    args = parser.parse_args()
+
+    stub_app = groq_stub_app(latency=args.llm_latency, token_delay=0.0, latency_per_kchar=args.latency_per_kchar,
+                             max_prompt_chars=args.max_prompt_chars)
+    with StubServer(stub_app, args.port) as groq:
+        use_dummy_env(GROQ_BASE_URL=groq.url, GROQ_TIMEOUT_SECONDS=args.timeout, GROQ_MAX_RETRIES=0,
+                      LOG_LEVEL="WARNING")
+        asyncio.run(run(args, stub_app))
+
+
+if __name__ == "__main__":
+    main()
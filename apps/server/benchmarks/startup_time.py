@@ -0,0 +1,74 @@
+"""Cold-start time per deployment role.
+
+Each role is started in fresh interpreters. Reports process wall time, `import main`
+(router imports plus config validation), lifespan startup, and which SDKs got loaded.
+The webhooks role runs without any credentials to show it does not need them.
+
+Usage (from apps/server):
+    python -m benchmarks.startup_time --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.stubs import DUMMY_ENV
+
+SDKS = ("groq", "twilio.rest", "twilio.jwt.access_token", "livekit.api", "aiohttp", "redis")
+
+CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(lifespan())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (ready - imported) * 1000,
+    "routes": len(main.app.routes),
+    "sdks": [name for name in SDKS if name in sys.modules],
+}))
+"""
+
+
+def start_once(role: str, db_path: str) -> dict:
+    env = {"PATH": os.environ.get("PATH", ""), "APP_ROLE": role, "CONFERENCE_EVENT_DB": db_path,
+           "LOG_LEVEL": "WARNING"}
+    if role != "webhooks":
+        env.update(DUMMY_ENV)
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", f"SDKS = {SDKS!r}\n{CHILD}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--roles", default="webhooks,tokens,full")
+    args = parser.parse_args()
+
+    print(f"{'role':<10}{'process ms':>12}{'import ms':>11}{'lifespan ms':>13}{'routes':>8}  sdks loaded")
+    with tempfile.TemporaryDirectory() as tmp:
+        for role in args.roles.split(","):
+            runs = [start_once(role, os.path.join(tmp, f"{role}.db")) for _ in range(args.runs)]
+            median = lambda key: statistics.median(run[key] for run in runs)
+            print(f"{role:<10}{median('process_ms'):>12.0f}{median('import_ms'):>11.0f}"
+                  f"{median('lifespan_ms'):>13.1f}{runs[0]['routes']:>8}  {', '.join(runs[0]['sdks']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
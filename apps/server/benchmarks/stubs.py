@@ -0,0 +1,453 @@
+"""Local stand-ins for the upstream APIs used by the load tests"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Dummy credentials so core.config validation passes without a real account
+DUMMY_ENV = {
+    "LIVEKIT_API_KEY": "bench-key",
+    "LIVEKIT_API_SECRET": "bench-secret-bench-secret-bench-secret",
+    "LIVEKIT_URL": "ws://127.0.0.1:7880",
+    "GROQ_API_KEY": "bench-groq-key",
+    "TWILIO_ACCOUNT_SID": "ACbench00000000000000000000000000",
+    "TWILIO_AUTH_TOKEN": "bench-token",
+    "TWILIO_PHONE_NUMBER": "+15550000000",
+    "TWILIO_API_KEY": "SKbench",
+    "TWILIO_API_SECRET": "bench-twilio-secret",
+    "TWILIO_APP_SID": "APbench",
+    # Load generators send everything from one address; per-caller limits would throttle them
+    "ADMISSION_IDENTITY_RATE": "0",
+}
+
+
+def use_dummy_env(**overrides):
+    """Populate env vars before the app modules are imported"""
+    for key, value in {**DUMMY_ENV, **overrides}.items():
+        os.environ.setdefault(key, str(value))
+
+
+def groq_stub_app(latency: float = 1.0, summary: str = "Stub summary: customer needs a password reset.",
+                  token_delay: float = 0.02, error_rate: float = 0.0, latency_per_kchar: float = 0.0,
+                  max_prompt_chars: int = 0, slow_rate: float = 0.0, slow_latency: float = 0.0):
+    """OpenAI-compatible chat completions endpoint that answers after `latency` seconds.
+
+    Streaming requests get their first token after `latency` and the rest every `token_delay`.
+    A fraction `error_rate` of requests fail with a 503 after `latency`. Prompts add
+    `latency_per_kchar` per 1000 characters, and prompts over `max_prompt_chars` (if set)
+    are rejected with a 413 like an over-limit request. A fraction `slow_rate` of requests
+    takes `slow_latency` instead of `latency`, for a heavy latency tail.
+    """
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.errors = 0
+    app.state.prompt_chars = []
+
+    async def stream_chunks(model: str, delay: float):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        await asyncio.sleep(delay)
+        words = summary.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else f" {word}"},
+                    "finish_reason": "stop" if i == len(words) - 1 else None,
+                }],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(token_delay)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        prompt_chars = sum(len(message.get("content") or "") for message in body.get("messages", []))
+        app.state.prompt_chars.append(prompt_chars)
+        if max_prompt_chars and prompt_chars > max_prompt_chars:
+            app.state.errors += 1
+            return JSONResponse({"error": {"message": "Request too large", "type": "tokens",
+                                           "code": "rate_limit_exceeded"}}, status_code=413)
+        base = slow_latency if random.random() < slow_rate else latency
+        delay = base + latency_per_kchar * prompt_chars / 1000
+        if random.random() < error_rate:
+            app.state.errors += 1
+            await asyncio.sleep(delay)
+            return JSONResponse({"error": {"message": "injected error", "type": "service_unavailable"}},
+                                status_code=503)
+        if body.get("stream"):
+            return StreamingResponse(stream_chunks(body.get("model", "stub"), delay), media_type="text/event-stream")
+        await asyncio.sleep(delay)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": summary},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    return app
+
+
+def twilio_stub_app(latency: float = 0.05, error_rate: float = 0.0, error_status: int = 429):
+    """Twilio REST `Calls.json` endpoint; `app.state.call_times` records each accepted call"""
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.errors = 0
+    app.state.call_times = []
+    app.state.calls = {}
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Calls.json")
+    async def create_call(account_sid: str, request: Request):
+        form = await request.form()
+        app.state.requests += 1
+        await asyncio.sleep(latency)
+        if random.random() < error_rate:
+            app.state.errors += 1
+            return JSONResponse(
+                {"code": 20429 if error_status == 429 else 20500, "message": "injected error",
+                 "more_info": "https://www.twilio.com/docs/errors", "status": error_status},
+                status_code=error_status,
+            )
+        sid = f"CA{uuid.uuid4().hex}"
+        call = {
+            "sid": sid,
+            "account_sid": account_sid,
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "status": "queued",
+            "direction": "outbound-api",
+            "date_created": None,
+            "uri": f"/2010-04-01/Accounts/{account_sid}/Calls/{sid}.json",
+        }
+        app.state.calls[sid] = call
+        app.state.call_times.append(time.monotonic())
+        return JSONResponse(call, status_code=201)
+
+    return app
+
+
+def livekit_stub_app(latency: float = 0.02, error_rate: float = 0.0):
+    """Twirp RoomService endpoints backed by an in-memory room/participant table.
+
+    `app.state.rooms` maps room name -> {identity: ParticipantInfo}; seed it before driving load,
+    in-process with `seed_livekit_participant` or over HTTP with `POST /stub/participants`.
+    """
+    from livekit import api
+
+    app = FastAPI()
+    app.state.rooms = {}
+    app.state.requests = 0
+    app.state.method_counts = {}
+
+    def participant(room: str, identity: str):
+        found = app.state.rooms.get(room, {}).get(identity)
+        if found is None:
+            raise KeyError(f"participant {identity} not found in {room}")
+        return found
+
+    def move(req):
+        info = app.state.rooms[req.room].pop(req.identity) if req.identity in app.state.rooms.get(req.room, {}) else None
+        if info is None:
+            raise KeyError(f"participant {req.identity} not found in {req.room}")
+        app.state.rooms.setdefault(req.destination_room, {})[req.identity] = info
+        return api.MoveParticipantResponse()
+
+    def remove(req):
+        participant(req.room, req.identity)
+        del app.state.rooms[req.room][req.identity]
+        return api.RemoveParticipantResponse()
+
+    def list_participants(req):
+        return api.ListParticipantsResponse(participants=list(app.state.rooms.get(req.room, {}).values()))
+
+    def mute_track(req):
+        info = participant(req.room, req.identity)
+        for track in info.tracks:
+            if track.sid == req.track_sid:
+                track.muted = req.muted
+                return api.MuteRoomTrackResponse(track=track)
+        raise KeyError(f"track {req.track_sid} not found")
+
+    def update_subscriptions(req):
+        participant(req.room, req.identity)
+        return api.UpdateSubscriptionsResponse()
+
+    def update_participant(req):
+        info = participant(req.room, req.identity)
+        if req.metadata:
+            info.metadata = req.metadata
+        return info
+
+    def create_room(req):
+        app.state.rooms.setdefault(req.name, {})
+        return api.Room(sid=f"RM_{uuid.uuid4().hex[:12]}", name=req.name, empty_timeout=req.empty_timeout)
+
+    methods = {
+        "CreateRoom": (api.CreateRoomRequest, create_room),
+        "MoveParticipant": (api.MoveParticipantRequest, move),
+        "RemoveParticipant": (api.RoomParticipantIdentity, remove),
+        "ListParticipants": (api.ListParticipantsRequest, list_participants),
+        "MutePublishedTrack": (api.MuteRoomTrackRequest, mute_track),
+        "UpdateSubscriptions": (api.UpdateSubscriptionsRequest, update_subscriptions),
+        "UpdateParticipant": (api.UpdateParticipantRequest, update_participant),
+    }
+
+    def twirp_error(status: int, code: str, msg: str):
+        return JSONResponse({"code": code, "msg": msg}, status_code=status)
+
+    @app.post("/stub/participants")
+    async def add_participant(request: Request):
+        body = await request.json()
+        info = seed_livekit_participant(app, body["room"], body["identity"], body.get("kind", "audio"))
+        return {"sid": info.sid, "track_sids": [track.sid for track in info.tracks]}
+
+    @app.post("/twirp/livekit.RoomService/{method}")
+    async def room_service(method: str, request: Request):
+        app.state.requests += 1
+        app.state.method_counts[method] = app.state.method_counts.get(method, 0) + 1
+        await asyncio.sleep(latency)
+        if random.random() < error_rate:
+            return twirp_error(503, "unavailable", "injected error")
+        if method not in methods:
+            return twirp_error(404, "bad_route", f"unknown method {method}")
+        request_class, handler = methods[method]
+        try:
+            result = handler(request_class.FromString(await request.body()))
+        except KeyError as e:
+            return twirp_error(404, "not_found", str(e))
+        return Response(content=result.SerializeToString(), media_type="application/protobuf")
+
+    return app
+
+
+def seed_livekit_participant(app, room: str, identity: str, kind: str = "audio"):
+    """Add a participant with one published microphone track to a livekit_stub_app"""
+    from livekit import api
+
+    track = api.TrackInfo(sid=f"TR_{uuid.uuid4().hex[:12]}", type=api.TrackType.AUDIO, source=api.TrackSource.MICROPHONE)
+    info = api.ParticipantInfo(sid=f"PA_{uuid.uuid4().hex[:12]}", identity=identity, tracks=[track] if kind == "audio" else [])
+    app.state.rooms.setdefault(room, {})[identity] = info
+    return info
+
+
+class FakeRedisServer:
+    """Minimal Redis-protocol (RESP2) server for offline runs of the shared session store.
+
+    Supports HELLO, PING, GET, SET [EX|PX] [NX], GETDEL, DEL, EXISTS, SCRIPT LOAD and
+    EVALSHA of the session store's compare-and-set script, and CLIENT/SELECT as no-ops.
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.data = {}
+        self.scripts = {}
+        self.commands = 0
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _execute(self, args):
+        self.commands += 1
+        command = args[0].upper()
+        # Replies are None (null), int, str (status/error line) or bytes (bulk string / raw frame)
+        if command == b"HELLO":
+            protocol = int(args[1]) if len(args) > 1 else 2
+            if protocol == 3:
+                return b"%1\r\n+proto\r\n:3\r\n"
+            return b"*2\r\n$5\r\nproto\r\n:2\r\n"
+        if command == b"PING":
+            return "+PONG"
+        if command in (b"CLIENT", b"SELECT"):
+            return "+OK"
+        if command == b"GET":
+            return self._get(args[1])
+        if command == b"GETDEL":
+            value = self._get(args[1])
+            self.data.pop(args[1], None)
+            return value
+        if command == b"SET":
+            expires_at = None
+            options = [a.upper() for a in args[3:]]
+            if b"NX" in options and self._get(args[1]) is not None:
+                return None
+            if b"EX" in options:
+                expires_at = time.monotonic() + float(args[3 + options.index(b"EX") + 1])
+            if b"PX" in options:
+                expires_at = time.monotonic() + float(args[3 + options.index(b"PX") + 1]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return "+OK"
+        if command == b"SCRIPT" and args[1].upper() == b"LOAD":
+            sha = hashlib.sha1(args[2]).hexdigest().encode()
+            self.scripts[sha] = args[2].decode()
+            return sha
+        if command == b"EVALSHA":
+            from services.session_store import COMPARE_AND_SET_SCRIPT
+
+            if args[1] not in self.scripts:
+                return "-NOSCRIPT No matching script. Please use EVAL."
+            if self.scripts[args[1]] != COMPARE_AND_SET_SCRIPT:
+                return "-ERR FakeRedisServer only runs the compare-and-set script"
+            key, expected, value, ttl_ms = args[3:7]
+            if self._get(key) != expected:
+                return 0
+            self.data[key] = (value, time.monotonic() + float(ttl_ms) / 1000)
+            return 1
+        if command in (b"DEL", b"EXISTS"):
+            keys = [key for key in args[1:] if self._get(key) is not None]
+            if command == b"DEL":
+                for key in keys:
+                    del self.data[key]
+            return len(keys)
+        return f"-ERR unknown command '{command.decode()}'"
+
+    @staticmethod
+    def _encode(reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"{reply}\r\n".encode()
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+    @staticmethod
+    def _frame(reply) -> bytes:
+        if isinstance(reply, bytes) and reply[:1] in (b"%", b"*"):
+            return reply
+        return FakeRedisServer._encode(reply)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self._frame(self._execute(args)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self._ready.set()
+        self._loop.run_forever()
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+def _serve_stub(factory, kwargs, host: str, port: int):
+    uvicorn.run(factory(**kwargs), host=host, port=port, log_level="warning")
+
+
+class StubProcess:
+    """Run `factory(**kwargs)` with uvicorn in its own process.
+
+    Keeps the stub off the load generator's GIL, so under concurrency the measured
+    latency is the app's rather than thread contention between stub and app.
+    """
+
+    def __init__(self, factory, port: int, host: str = "127.0.0.1", **kwargs):
+        import multiprocessing
+
+        self.host = host
+        self.port = port
+        self._process = multiprocessing.get_context("spawn").Process(
+            target=_serve_stub, args=(factory, kwargs, host, port), daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        import socket
+
+        self._process.start()
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection((self.host, self.port), timeout=0.2).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+        self._process.terminate()
+        raise RuntimeError(f"stub on port {self.port} did not start")
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join(timeout=5)
+
+
+class StubServer:
+    """Run an ASGI app with uvicorn on a background thread"""
+
+    def __init__(self, app, port: int, host: str = "127.0.0.1"):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self):
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
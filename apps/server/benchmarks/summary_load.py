@@ -0,0 +1,115 @@
+"""Webhook latency while summaries are in flight against a slow stub LLM.
+
+Usage (from apps/server):
+    python -m benchmarks.summary_load --summaries 50 --llm-latency 2
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from benchmarks.stubs import StubServer, groq_stub_app, use_dummy_env
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    print(f"{label:<28} n={len(samples):<4} "
+          f"p50={percentile(samples, 50) * 1000:7.2f}ms "
+          f"p95={percentile(samples, 95) * 1000:7.2f}ms "
+          f"max={max(samples) * 1000:7.2f}ms")
+
+
+async def sample_webhook(client, stop: asyncio.Event, interval: float):
+    samples = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.post("/twilio/voice-webhook", data={"To": "transfer-bench", "From": "client:bench"})
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def wait_for_summary(client, summary_id: str, interval: float) -> str:
+    """Poll /summaries/{id} like a client would until the summary stops streaming"""
+    while True:
+        response = await client.get(f"/summaries/{summary_id}")
+        response.raise_for_status()
+        status = response.json()["status"]
+        if status != "streaming":
+            return status
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    import httpx
+    from main import app
+
+    for noisy in ("httpx", "services"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60) as client:
+            stop = asyncio.Event()
+            idle_sampler = asyncio.create_task(sample_webhook(client, stop, args.interval))
+            await asyncio.sleep(args.warmup)
+            stop.set()
+            idle = await idle_sampler
+
+            stop = asyncio.Event()
+            loaded_sampler = asyncio.create_task(sample_webhook(client, stop, args.interval))
+            payload = {
+                "caller_room": "bench-room",
+                "caller_identity": "caller-bench",
+                "agent_a_identity": "agent-bench",
+            }
+            started = time.perf_counter()
+            transfers = await asyncio.gather(*[
+                client.post("/transfer", json={**payload, "context": f"bench call {i}"})
+                for i in range(args.summaries)
+            ])
+            responded = time.perf_counter() - started
+            # /transfer answers before its summary is done; keep the load on until every one has finished
+            statuses = await asyncio.gather(*[
+                wait_for_summary(client, r.json()["summary_id"], args.interval)
+                for r in transfers if r.status_code == 200
+            ])
+            elapsed = time.perf_counter() - started
+            stop.set()
+            loaded = await loaded_sampler
+
+    failures = sum(1 for r in transfers if r.status_code != 200) + statuses.count("failed")
+    print(f"{args.summaries} transfers answered in {responded:.2f}s, summaries finished in {elapsed:.2f}s "
+          f"({failures} failed), stub LLM latency {args.llm_latency}s")
+    report("voice-webhook idle", idle)
+    report("voice-webhook under load", loaded)
+    drift = statistics.median(loaded) - statistics.median(idle)
+    print(f"median drift under load: {drift * 1000:+.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--summaries", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=18081)
+    args = parser.parse_args()
+
+    with StubServer(groq_stub_app(latency=args.llm_latency), port=args.port) as stub:
+        use_dummy_env(
+            GROQ_BASE_URL=stub.url,
+            GROQ_MAX_CONCURRENCY=args.summaries,
+            GROQ_MAX_CONNECTIONS=args.summaries,
+        )
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Time-to-ring and time-to-ready: sequential transfer steps vs /warm-transfer.
+
+sequential   the order the frontend used to drive: wait for the summary, then dial
+             Agent B (phone) or create the consultation room (LiveKit), then hold
+             the caller. Replayed through the service functions, one step after another.
+orchestrated POST /warm-transfer, then long-poll GET /warm-transfer/{id} until every
+             step has finished.
+
+"ring" is when Twilio accepted the call to Agent B (phone) or the consultation room
+exists (LiveKit); "ready" is when every step, including the summary, has finished.
+Every transfer uses a distinct context, so each one waits for the LLM.
+
+Usage (from apps/server):
+    python -m benchmarks.time_to_ring --transfers 100 --concurrency 10
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+from benchmarks.stubs import StubProcess, groq_stub_app, livekit_stub_app, twilio_stub_app, use_dummy_env
+from benchmarks.transfer_flow import percentile
+
+
+def request_body(kind: str, n: int) -> dict:
+    body = {
+        "caller_room": f"room-{n}-{uuid.uuid4().hex[:6]}",
+        "caller_identity": f"caller-{n}",
+        "agent_a_identity": f"agent-a-{n}",
+        "context": f"Caller {n} ({uuid.uuid4().hex[:6]}) wants to dispute a charge",
+    }
+    if kind == "phone":
+        body["phone_number"] = f"+1555{n:07d}"
+    return body
+
+
+async def sequential(kind: str, body: dict) -> tuple:
+    from schemas.requests import HoldCallerRequest
+    from services.ai_service import start_summary_stream
+    from services.livekit_service import create_consultation_room, hold_caller_service
+    from services.twilio_service import twilio_service
+
+    started = time.time()
+    # Same streamed summary the orchestrator uses, so only the ordering differs
+    await (await start_summary_stream(body["context"])).wait()
+    if kind == "phone":
+        await twilio_service.create_conference_call(body["phone_number"], f"transfer-{uuid.uuid4().hex[:8]}")
+    else:
+        await create_consultation_room(f"consult-{uuid.uuid4().hex[:8]}")
+    ring = time.time() - started
+    await hold_caller_service(HoldCallerRequest(caller_identity=body["caller_identity"],
+                                                room=body["caller_room"], hold=True))
+    return ring, time.time() - started
+
+
+async def orchestrated(client, kind: str, body: dict) -> tuple:
+    started = time.time()
+    response = await client.post("/warm-transfer", json=body)
+    response.raise_for_status()
+    status_url = response.json()["status_url"]
+    while True:
+        session = (await client.get(status_url, params={"wait": 10})).json()
+        if session["status"] != "orchestrating":
+            break
+    steps = session["steps"]
+    primary = steps["dial" if kind == "phone" else "room"]
+    if any(step["status"] != "done" for step in steps.values()):
+        raise RuntimeError(f"steps failed: {steps}")
+    ring = primary["finished_at"] - started
+    ready = max(step["finished_at"] for step in steps.values()) - started
+    return ring, ready
+
+
+async def run(args) -> dict:
+    import httpx
+    from core.config import LIVEKIT_URL
+    from main import app
+
+    for noisy in ("httpx", "services", "api", "twiml"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60) as client, \
+                httpx.AsyncClient(base_url=LIVEKIT_URL, timeout=10) as livekit:
+            for kind in ("phone", "livekit"):
+                for mode in ("sequential", "orchestrated"):
+                    counter = iter(range(args.transfers))
+                    samples = []
+
+                    async def worker():
+                        for n in counter:
+                            body = request_body(kind, n)
+                            # The caller must be in the room for the hold step to find their tracks
+                            await livekit.post("/stub/participants", json={"room": body["caller_room"],
+                                                                           "identity": body["caller_identity"]})
+                            if mode == "sequential":
+                                samples.append(await sequential(kind, body))
+                            else:
+                                samples.append(await orchestrated(client, kind, body))
+
+                    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+                    results[(kind, mode)] = samples
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transfers", type=int, default=100, help="per kind and mode")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--groq-latency", type=float, default=0.6, help="seconds to first summary token")
+    parser.add_argument("--twilio-latency", type=float, default=0.15)
+    parser.add_argument("--livekit-latency", type=float, default=0.03)
+    parser.add_argument("--port", type=int, default=18095, help="first of three stub ports")
+    args = parser.parse_args()
+
+    with StubProcess(groq_stub_app, args.port, latency=args.groq_latency) as groq, \
+            StubProcess(twilio_stub_app, args.port + 1, latency=args.twilio_latency) as twilio, \
+            StubProcess(livekit_stub_app, args.port + 2, latency=args.livekit_latency) as livekit:
+        use_dummy_env(
+            GROQ_BASE_URL=groq.url,
+            GROQ_MAX_CONCURRENCY=args.concurrency,
+            GROQ_MAX_CONNECTIONS=args.concurrency,
+            TWILIO_API_BASE_URL=twilio.url,
+            TWILIO_CALLS_PER_SECOND=1000,
+            TWILIO_MAX_CONCURRENCY=args.concurrency,
+            LIVEKIT_URL=livekit.url,
+            CONFERENCE_EVENT_DB="",
+            LOG_LEVEL="WARNING",
+        )
+        results = asyncio.run(run(args))
+
+    print(f"{args.transfers} transfers per row, concurrency {args.concurrency}, groq {args.groq_latency}s, "
+          f"twilio {args.twilio_latency}s, livekit {args.livekit_latency}s")
+    print(f"{'kind':<9}{'mode':<14}{'ring p50':>10}{'ring p95':>10}{'ready p50':>11}{'ready p95':>11}")
+    for (kind, mode), samples in results.items():
+        rings = [ring * 1000 for ring, _ in samples]
+        readies = [ready * 1000 for _, ready in samples]
+        print(f"{kind:<9}{mode:<14}{percentile(rings, 50):>10.1f}{percentile(rings, 95):>10.1f}"
+              f"{percentile(readies, 50):>11.1f}{percentile(readies, 95):>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
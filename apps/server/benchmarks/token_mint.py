@@ -0,0 +1,49 @@
+"""Access-token minting throughput with and without the token cache.
+
+Simulates a reconnect storm: `--identities` users each reconnecting `--reconnects` times.
+
+Usage (from apps/server):
+    python -m benchmarks.token_mint --identities 500 --reconnects 20
+"""
+import argparse
+import time
+
+from benchmarks.stubs import use_dummy_env
+
+
+def run(label, mint, requests):
+    started = time.perf_counter()
+    for args in requests:
+        mint(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {len(requests) / elapsed:>10,.0f} tokens/s  ({elapsed * 1000:.1f}ms for {len(requests)})")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--identities", type=int, default=500)
+    parser.add_argument("--reconnects", type=int, default=20)
+    args = parser.parse_args()
+
+    use_dummy_env()
+    from services.token_service import TokenCache, TokenMinter
+
+    livekit = [(f"room-{i % 50}", f"caller-{i}", "agent" if i % 2 else "participant")
+               for _ in range(args.reconnects) for i in range(args.identities)]
+    twilio = [(f"voice-agent-{i}",) for _ in range(args.reconnects) for i in range(args.identities)]
+
+    uncached = TokenMinter(cache=None)
+    cached = TokenMinter(TokenCache(max_entries=args.identities * 2))
+
+    base = run("livekit /token, no cache", uncached.livekit_token, livekit)
+    fast = run("livekit /token, cached", cached.livekit_token, livekit)
+    print(f"{'speedup':<32} {base / fast:>10.1f}x")
+    base = run("twilio voice token, no cache", uncached.twilio_voice_token, twilio)
+    fast = run("twilio voice token, cached", cached.twilio_voice_token, twilio)
+    print(f"{'speedup':<32} {base / fast:>10.1f}x")
+    print(f"cache: {cached.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
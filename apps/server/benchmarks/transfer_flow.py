@@ -0,0 +1,270 @@
+"""End-to-end warm-transfer load test against local Groq, Twilio and LiveKit stubs.
+
+Each simulated call runs one complete flow through the app:
+  livekit: /token (caller, agent A) -> /transfer -> /token (agent B) -> /complete-transfer
+  phone:   /twilio/transfer-to-phone -> /twilio/voice-webhook -> /twilio/signal-caller-join
+           -> /twilio/check-caller-signal/{room}
+
+Per-step throughput and p50/p95/p99 go to a JSON file. With --baseline, the run
+is compared against a stored result and exits 1 on regressions, so CI can gate on it.
+
+Usage (from apps/server):
+    python -m benchmarks.transfer_flow --flows 200 --concurrency 20 --output results.json
+    python -m benchmarks.transfer_flow --baseline benchmarks/baseline.json --max-regression 0.25
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+from benchmarks.stubs import StubProcess, groq_stub_app, livekit_stub_app, twilio_stub_app, use_dummy_env
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StepRecorder:
+    """Latency samples and failures per named step"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, step: str, request, ok=lambda body: True):
+        """Await one request; a non-2xx status or a failed `ok(body)` counts as an error"""
+        started = time.perf_counter()
+        try:
+            response = await request
+        except Exception:
+            self.samples[step].append(time.perf_counter() - started)
+            self.errors[step] += 1
+            return None
+        self.samples[step].append(time.perf_counter() - started)
+        body = response.json() if response.headers.get("content-type", "").startswith("application/json") \
+            else response.text
+        if response.status_code >= 400 or not ok(body):
+            self.errors[step] += 1
+            return None
+        return body
+
+    def summary(self, elapsed: float) -> dict:
+        steps = {}
+        for step, samples in self.samples.items():
+            steps[step] = {
+                "count": len(samples),
+                "errors": self.errors[step],
+                "error_rate": round(self.errors[step] / len(samples), 4),
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                "max_ms": round(max(samples) * 1000, 2),
+            }
+        return steps
+
+
+async def livekit_flow(client, stub_client, recorder: StepRecorder, n: int) -> bool:
+    caller_room = f"room-{n}-{uuid.uuid4().hex[:6]}"
+    caller, agent_a, agent_b = f"caller-{n}", f"agent-a-{n}", f"agent-b-{n}"
+    has_token = lambda body: bool(body.get("token"))
+
+    for identity, role in ((caller, "participant"), (agent_a, "agent")):
+        if await recorder.call("token", client.get(
+                "/token", params={"room": caller_room, "identity": identity, "role": role}), has_token) is None:
+            return False
+
+    transfer = await recorder.call("transfer", client.post("/transfer", json={
+        "caller_room": caller_room,
+        "caller_identity": caller,
+        "agent_a_identity": agent_a,
+        # Distinct contexts so every flow exercises the LLM instead of the summary cache
+        "context": f"Caller {n} cannot log in after a password reset",
+    }))
+    if transfer is None:
+        return False
+
+    consultation_room = transfer["consultation_room"]
+    if await recorder.call("token", client.get(
+            "/token", params={"room": consultation_room, "identity": agent_b, "role": "agent"}), has_token) is None:
+        return False
+    # Agent B "joins" the consultation room on the LiveKit side
+    await stub_client.post("/stub/participants", json={"room": consultation_room, "identity": agent_b})
+
+    completed = await recorder.call("complete_transfer", client.post("/complete-transfer", json={
+        "consultation_room": consultation_room,
+        "agent_b_identity": agent_b,
+        "destination_room": caller_room,
+        "session_id": transfer["session_id"],
+    }), lambda body: body.get("status") == "transfer_complete")
+    return completed is not None
+
+
+async def phone_flow(client, recorder: StepRecorder, n: int) -> bool:
+    caller_room = f"room-{n}-{uuid.uuid4().hex[:6]}"
+    transfer = await recorder.call("transfer_to_phone", client.post("/twilio/transfer-to-phone", json={
+        "caller_room": caller_room,
+        "caller_identity": f"caller-{n}",
+        "agent_a_identity": f"agent-a-{n}",
+        "phone_number": f"+1555{n:07d}",
+        "context": f"Caller {n} wants to dispute a charge",
+    }))
+    if transfer is None:
+        return False
+    conference = transfer["conference_name"]
+
+    twiml = await recorder.call("voice_webhook", client.post(
+        "/twilio/voice-webhook", data={"To": conference, "From": f"client:voice-agent-a-{n}"}),
+        lambda body: conference in body)
+    if twiml is None:
+        return False
+
+    if await recorder.call("signal_caller_join", client.post("/twilio/signal-caller-join", json={
+            "room_name": caller_room, "conference_name": conference, "message": "Joining phone agent"})) is None:
+        return False
+
+    signal = await recorder.call("check_caller_signal", client.get(
+        f"/twilio/check-caller-signal/{caller_room}", params={"wait": 5}),
+        lambda body: body.get("conference_name") == conference)
+    return signal is not None
+
+
+async def run(args, livekit_url: str) -> dict:
+    import httpx
+    from main import app
+
+    for noisy in ("httpx", "services", "api", "twiml"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+
+    recorder = StepRecorder()
+    outcomes = defaultdict(lambda: {"completed": 0, "failed": 0})
+    counter = iter(range(args.flows))
+    rng = random.Random(args.seed)
+
+    async def worker(client, stub_client):
+        for n in counter:
+            kind = "phone" if rng.random() < args.phone_ratio else "livekit"
+            if kind == "phone":
+                ok = await phone_flow(client, recorder, n)
+            else:
+                ok = await livekit_flow(client, stub_client, recorder, n)
+            outcomes[kind]["completed" if ok else "failed"] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60) as client, \
+                httpx.AsyncClient(base_url=livekit_url, timeout=10) as stub_client:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client, stub_client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    completed = sum(outcome["completed"] for outcome in outcomes.values())
+    return {
+        "config": {
+            "flows": args.flows,
+            "concurrency": args.concurrency,
+            "phone_ratio": args.phone_ratio,
+            "groq_latency": args.groq_latency,
+            "twilio_latency": args.twilio_latency,
+            "livekit_latency": args.livekit_latency,
+            "error_rate": args.error_rate,
+        },
+        "duration_s": round(elapsed, 3),
+        "flows": {
+            "completed": completed,
+            "failed": args.flows - completed,
+            "per_second": round(completed / elapsed, 2),
+            "by_kind": dict(outcomes),
+        },
+        "steps": recorder.summary(elapsed),
+    }
+
+
+def compare(result: dict, baseline: dict, max_regression: float, floor_ms: float) -> list:
+    """Steps whose p95/p99 or error rate got worse than the baseline allows"""
+    regressions = []
+    for step, base in baseline.get("steps", {}).items():
+        current = result["steps"].get(step)
+        if current is None:
+            regressions.append(f"{step}: missing from this run")
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            limit = max(base[key] * (1 + max_regression), base[key] + floor_ms)
+            if current[key] > limit:
+                regressions.append(f"{step}: {key} {current[key]} > {limit:.2f} (baseline {base[key]})")
+        if current["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{step}: error_rate {current['error_rate']} (baseline {base['error_rate']})")
+    return regressions
+
+
+def print_report(result: dict):
+    flows = result["flows"]
+    print(f"{flows['completed']} flows completed, {flows['failed']} failed in {result['duration_s']}s "
+          f"({flows['per_second']} flows/s)")
+    print(f"{'step':<22}{'n':>6}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step, stats in result["steps"].items():
+        print(f"{step:<22}{stats['count']:>6}{stats['errors']:>6}{stats['throughput_rps']:>9}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--phone-ratio", type=float, default=0.5, help="fraction of flows that go to a phone")
+    parser.add_argument("--groq-latency", type=float, default=0.3)
+    parser.add_argument("--twilio-latency", type=float, default=0.05)
+    parser.add_argument("--livekit-latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="injected into every stub")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="transfer_flow_results.json")
+    parser.add_argument("--baseline", help="stored result JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p95/p99 growth fraction")
+    parser.add_argument("--floor-ms", type=float, default=5.0, help="ignore regressions smaller than this")
+    parser.add_argument("--port", type=int, default=18091, help="first of three stub ports")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    # Each stub in its own process so stub work does not compete with the app for the GIL
+    with StubProcess(groq_stub_app, args.port, latency=args.groq_latency, error_rate=args.error_rate) as groq, \
+            StubProcess(twilio_stub_app, args.port + 1, latency=args.twilio_latency,
+                        error_rate=args.error_rate, error_status=503) as twilio, \
+            StubProcess(livekit_stub_app, args.port + 2, latency=args.livekit_latency,
+                        error_rate=args.error_rate) as livekit:
+        use_dummy_env(
+            GROQ_BASE_URL=groq.url,
+            GROQ_MAX_CONCURRENCY=args.concurrency,
+            GROQ_MAX_CONNECTIONS=args.concurrency,
+            TWILIO_API_BASE_URL=twilio.url,
+            TWILIO_CALLS_PER_SECOND=1000,
+            TWILIO_MAX_CONCURRENCY=args.concurrency,
+            LIVEKIT_URL=livekit.url,
+            CONFERENCE_EVENT_DB="",
+            LOG_LEVEL="WARNING",
+        )
+        result = asyncio.run(run(args, livekit.url))
+
+    print_report(result)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.max_regression, args.floor_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Outbound dialing against a local Twilio REST stub: CPS pacing, retries and event-loop health.
+
+Usage (from apps/server):
+    python -m benchmarks.twilio_load --calls 30 --cps 5 --error-rate 0.2
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.stubs import StubServer, twilio_stub_app, use_dummy_env
+
+
+def max_in_window(times, window: float = 1.0) -> int:
+    best, start = 0, 0
+    for end in range(len(times)):
+        while times[end] - times[start] >= window:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+async def probe_loop(stop: asyncio.Event, interval: float = 0.01):
+    """Worst scheduling delay seen by a task that wakes every `interval`"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(args, stub_app):
+    from services.twilio_service import twilio_service
+
+    logging.getLogger("services").setLevel(logging.ERROR)
+    await twilio_service.startup()
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop(stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        twilio_service.make_call(f"+1555{i:07d}", "Load test call") for i in range(args.calls)
+    ], return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst_lag = await probe
+    await twilio_service.shutdown()
+
+    failed = sum(1 for r in results if isinstance(r, Exception))
+    times = sorted(stub_app.state.call_times)
+    print(f"{args.calls} calls in {elapsed:.2f}s: {args.calls - failed} placed, {failed} failed")
+    print(f"stub saw {stub_app.state.requests} requests, {stub_app.state.errors} injected errors, "
+          f"{twilio_service.retries} client retries")
+    print(f"configured CPS {args.cps}, peak calls accepted in any 1s window: {max_in_window(times)}")
+    print(f"worst event-loop lag during run: {worst_lag * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--cps", type=float, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--port", type=int, default=18082)
+    args = parser.parse_args()
+
+    stub_app = twilio_stub_app(latency=args.latency, error_rate=args.error_rate, error_status=args.error_status)
+    with StubServer(stub_app, port=args.port) as stub:
+        use_dummy_env(
+            TWILIO_API_BASE_URL=stub.url,
+            TWILIO_CALLS_PER_SECOND=args.cps,
+            TWILIO_RETRY_BASE_DELAY=0.1,
+        )
+        asyncio.run(run(args, stub_app))
+
+
+if __name__ == "__main__":
+    main()
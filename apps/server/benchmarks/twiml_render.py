@@ -0,0 +1,57 @@
+"""Voice-webhook TwiML rendering: VoiceResponse object tree vs precompiled templates.
+
+Usage (from apps/server):
+    python -m benchmarks.twiml_render --iterations 100000
+"""
+import argparse
+import time
+
+from twilio.twiml.voice_response import VoiceResponse
+
+from utils import twiml as twiml_templates
+
+
+def voice_response_join(conference_name: str) -> bytes:
+    """The webhook's previous VoiceResponse path, for comparison"""
+    response = VoiceResponse()
+    response.say("Connecting you to the conference.", voice="alice")
+    dial = response.dial()
+    dial.conference(conference_name,
+                    start_conference_on_enter=True,
+                    end_conference_on_exit=False,
+                    beep=False,
+                    wait_url="",
+                    max_participants=10)
+    return str(response).encode()
+
+
+def template_join(conference_name: str) -> bytes:
+    return twiml_templates.WEB_JOIN_CONFERENCE.render(conference_name=conference_name)
+
+
+def run(label, render, names):
+    started = time.perf_counter()
+    for name in names:
+        render(name)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<20} {len(names) / elapsed:>12,.0f} renders/s  {elapsed / len(names) * 1e6:>7.2f}us each")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    # Same bytes on the wire, including names that need escaping
+    for name in ("transfer-1a2b3c4d", 'transfer-<a & "b">'):
+        assert voice_response_join(name) == template_join(name), name
+
+    names = [f"transfer-{i:08x}" for i in range(args.iterations)]
+    base = run("VoiceResponse", voice_response_join, names)
+    fast = run("template", template_join, names)
+    print(f"{'speedup':<20} {base / fast:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
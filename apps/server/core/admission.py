@@ -0,0 +1,71 @@
+"""Route classes for admission control, and the process-wide controller"""
+from typing import Dict, List, Optional, Tuple
+
+from core.config import (
+    ADMISSION_CLASSES,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_IDENTITY_RATE,
+    ADMISSION_IDENTITY_BURST,
+    ADMISSION_MAX_IDENTITIES,
+)
+from utils.admission import AdmissionClass, AdmissionController
+
+# Expensive or latency-critical routes by (method, path); anything else is not admission-controlled
+ROUTE_CLASSES: Dict[Tuple[str, str], str] = {
+    ("POST", "/twilio/voice-webhook"): "webhooks",
+    ("POST", "/twilio/conference-status"): "webhooks",
+    ("POST", "/livekit/webhook"): "webhooks",
+    ("GET", "/token"): "tokens",
+    ("POST", "/twilio/web-join-conference"): "tokens",
+    ("POST", "/transfer"): "llm",
+    ("POST", "/twilio/call"): "telephony",
+    ("POST", "/twilio/conference"): "telephony",
+    ("POST", "/twilio/transfer-to-phone"): "telephony",
+    ("POST", "/twilio/bridge-to-conference"): "telephony",
+    ("POST", "/twilio/bulk-call"): "telephony",
+    ("POST", "/warm-transfer"): "telephony",
+    ("POST", "/complete-transfer"): "telephony",
+    ("POST", "/hold-caller"): "telephony",
+    ("POST", "/hold-caller/bulk"): "telephony",
+    ("POST", "/participants/batch"): "telephony",
+}
+# Routes with path parameters, matched by prefix
+ROUTE_CLASS_PREFIXES: List[Tuple[str, str, str]] = [
+    ("POST", "/transcripts/", "llm"),
+]
+
+# Classes that skip the shared in-flight ceiling and are dispatched first
+PRIORITY_CLASSES = ("webhooks",)
+
+
+def parse_classes(spec: str) -> List[AdmissionClass]:
+    """"llm=32:64,telephony=16:32" -> one class per entry, as name=concurrency:queue"""
+    classes = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, limits = entry.partition("=")
+        limit, _, queue_size = limits.partition(":")
+        priority = name in PRIORITY_CLASSES
+        classes.append(AdmissionClass(name, int(limit), int(queue_size or 0), priority=priority,
+                                      rate_limited=not priority))
+    return classes
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    name = ROUTE_CLASSES.get((method, path))
+    if name is not None:
+        return name
+    for prefix_method, prefix, prefix_name in ROUTE_CLASS_PREFIXES:
+        if method == prefix_method and path.startswith(prefix):
+            return prefix_name
+    return None
+
+
+admission = AdmissionController(
+    parse_classes(ADMISSION_CLASSES),
+    max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    identity_rate=ADMISSION_IDENTITY_RATE,
+    identity_burst=ADMISSION_IDENTITY_BURST,
+    max_identities=ADMISSION_MAX_IDENTITIES,
+)
@@ -7,43 +7,157 @@ load_dotenv()
 LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY")
 LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET") 
 LIVEKIT_URL = os.getenv("LIVEKIT_URL")
+LIVEKIT_MAX_CONNECTIONS = int(os.getenv("LIVEKIT_MAX_CONNECTIONS", "32"))
+LIVEKIT_KEEPALIVE_SECONDS = float(os.getenv("LIVEKIT_KEEPALIVE_SECONDS", "30"))
+LIVEKIT_TIMEOUT_SECONDS = float(os.getenv("LIVEKIT_TIMEOUT_SECONDS", "10"))
+LIVEKIT_BATCH_CONCURRENCY = int(os.getenv("LIVEKIT_BATCH_CONCURRENCY", "8"))  # Fan-out for batch moves
+LIVEKIT_TOKEN_TTL_SECONDS = float(os.getenv("LIVEKIT_TOKEN_TTL_SECONDS", "21600"))
+LIVEKIT_CONSULTATION_EMPTY_TIMEOUT = int(os.getenv("LIVEKIT_CONSULTATION_EMPTY_TIMEOUT", "300"))  # Seconds a pre-created room waits for Agent B
+LIVEKIT_PARTICIPANT_CACHE_SECONDS = float(os.getenv("LIVEKIT_PARTICIPANT_CACHE_SECONDS", "30"))  # Reused room listings for hold/resume
+LIVEKIT_PARTICIPANT_CACHE_ROOMS = int(os.getenv("LIVEKIT_PARTICIPANT_CACHE_ROOMS", "1000"))
+LIVEKIT_AGENT_IDENTITY_PREFIX = os.getenv("LIVEKIT_AGENT_IDENTITY_PREFIX", "agent-")  # Never put on hold by bulk hold
 
 # AI Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # Optional override, e.g. a local stub server
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "16"))  # In-flight summaries
+SUMMARY_MAX_QUEUED = int(os.getenv("SUMMARY_MAX_QUEUED", "32"))  # Summaries waiting for a slot; beyond this transfers answer 503
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "32"))
+GROQ_KEEPALIVE_SECONDS = float(os.getenv("GROQ_KEEPALIVE_SECONDS", "30"))
+GROQ_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GROQ_CONNECT_TIMEOUT_SECONDS", "3"))
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", "10"))  # Per summary call
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "1"))
+# Summary backends in preference order: "groq:<model>" or "openai:<model>@<base url>" (any
+# OpenAI-compatible server). Slow answers are hedged to the next backend after its tracked latency
+# percentile; backends that keep failing are skipped for a cooldown.
+LLM_BACKENDS = os.getenv("LLM_BACKENDS", "groq:llama-3.1-8b-instant")
+LLM_OPENAI_API_KEY = os.getenv("LLM_OPENAI_API_KEY", "none")  # Local servers usually ignore it
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "1.0"))  # Until a backend has enough samples
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))  # Recent latencies kept per backend
+LLM_MIN_SAMPLES = int(os.getenv("LLM_MIN_SAMPLES", "20"))
+LLM_FAILURE_THRESHOLD = int(os.getenv("LLM_FAILURE_THRESHOLD", "3"))  # Consecutive failures before cooldown
+LLM_DEGRADED_ERROR_RATE = float(os.getenv("LLM_DEGRADED_ERROR_RATE", "0.5"))  # Moving error rate before cooldown
+LLM_DEGRADED_SECONDS = float(os.getenv("LLM_DEGRADED_SECONDS", "30"))
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "1024"))
+SUMMARY_CACHE_TTL_SECONDS = float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "600"))
+SUMMARY_STREAM_TTL_SECONDS = float(os.getenv("SUMMARY_STREAM_TTL_SECONDS", "900"))  # Replay window
+# Contexts over the token budget are summarized in chunks concurrently, then combined
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "6000"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "2000"))
+SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "16"))  # Beyond this, the opening and latest chunks are kept
+
+# Live transcripts: each room's rolling summary is refreshed after N new tokens or T seconds
+TRANSCRIPT_REFRESH_TOKENS = int(os.getenv("TRANSCRIPT_REFRESH_TOKENS", "200"))
+TRANSCRIPT_REFRESH_SECONDS = float(os.getenv("TRANSCRIPT_REFRESH_SECONDS", "15"))
+TRANSCRIPT_HISTORY_SIZE = int(os.getenv("TRANSCRIPT_HISTORY_SIZE", "200"))  # Recent utterances kept per room
+TRANSCRIPT_MAX_PENDING_TOKENS = int(os.getenv("TRANSCRIPT_MAX_PENDING_TOKENS", "24000"))  # Oldest unsummarized lines beyond this are dropped
+TRANSCRIPT_MAX_ROOMS = int(os.getenv("TRANSCRIPT_MAX_ROOMS", "5000"))
+TRANSCRIPT_TTL_SECONDS = float(os.getenv("TRANSCRIPT_TTL_SECONDS", "7200"))  # Idle rooms are dropped after this
 
 # 🎯 NEW: Twilio Configuration
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+TWILIO_API_BASE_URL = os.getenv("TWILIO_API_BASE_URL")  # Optional override, e.g. a local stub server
+TWILIO_STATUS_CALLBACK_URL = os.getenv(
+    "TWILIO_STATUS_CALLBACK_URL", "http://your-ngrok-url.ngrok.io/twilio/conference-status"
+)  # Conference events for outbound conference calls
+TWILIO_CALLS_PER_SECOND = float(os.getenv("TWILIO_CALLS_PER_SECOND", "1"))  # Account CPS limit
+TWILIO_MAX_CONCURRENCY = int(os.getenv("TWILIO_MAX_CONCURRENCY", "10"))  # In-flight REST requests
+TWILIO_TIMEOUT_SECONDS = float(os.getenv("TWILIO_TIMEOUT_SECONDS", "10"))
+TWILIO_MAX_RETRIES = int(os.getenv("TWILIO_MAX_RETRIES", "3"))  # On 429 and 5xx
+TWILIO_RETRY_BASE_DELAY = float(os.getenv("TWILIO_RETRY_BASE_DELAY", "0.5"))
+TWILIO_RETRY_MAX_DELAY = float(os.getenv("TWILIO_RETRY_MAX_DELAY", "8"))
+BULK_DIAL_MAX_JOBS = int(os.getenv("BULK_DIAL_MAX_JOBS", "100"))  # Finished jobs kept for status
+
+# Transfer session store: "memory" (single worker) or "redis" (any Redis-protocol server)
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory")
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL")  # e.g. redis://localhost:6379/0
+SESSION_STORE_PREFIX = os.getenv("SESSION_STORE_PREFIX", "wct")
+SESSION_STORE_MAX_KEYS = int(os.getenv("SESSION_STORE_MAX_KEYS", "100000"))  # Memory backend only
+TRANSFER_SESSION_TTL_SECONDS = float(os.getenv("TRANSFER_SESSION_TTL_SECONDS", "14400"))
+
+# Idempotency-Key replay for call-placing endpoints; same backend choice as the session store by default
+IDEMPOTENCY_STORE_BACKEND = os.getenv("IDEMPOTENCY_STORE_BACKEND", SESSION_STORE_BACKEND)
+IDEMPOTENCY_STORE_URL = os.getenv("IDEMPOTENCY_STORE_URL", SESSION_STORE_URL)
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))  # Memory backend only
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))  # Responses replayed this long
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120"))  # Longer than any request deadline
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))  # Duplicates wait this long, then 409
+
+# Request deadlines: clients may send X-Request-Timeout (seconds); transfer routes also have a default.
+# Upstream steps get only the time left, and the endpoint answers 504 naming the step that ran out.
+REQUEST_MAX_TIMEOUT_SECONDS = float(os.getenv("REQUEST_MAX_TIMEOUT_SECONDS", "60"))  # Larger header values are capped
+TRANSFER_DEADLINE_SECONDS = float(os.getenv("TRANSFER_DEADLINE_SECONDS", "15"))
+
+# Admission control: per route class "name=concurrency:queue". Full queues answer 503 with Retry-After.
+# Webhooks skip the shared in-flight ceiling and are admitted first; see core/admission.py for the routes.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_CLASSES = os.getenv("ADMISSION_CLASSES", "webhooks=128:512,tokens=64:128,llm=32:64,telephony=16:64")
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "96"))  # Across every class but webhooks
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+ADMISSION_IDENTITY_RATE = float(os.getenv("ADMISSION_IDENTITY_RATE", "0"))  # Requests/second per caller; 0 (default) disables
+ADMISSION_IDENTITY_BURST = float(os.getenv("ADMISSION_IDENTITY_BURST", "10"))
+ADMISSION_MAX_IDENTITIES = int(os.getenv("ADMISSION_MAX_IDENTITIES", "10000"))  # Token buckets kept (LRU)
+
+# Logging: records are queued and written as JSON lines by a background thread
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "httpx=WARNING")  # Per-module overrides, e.g. "services.ai_service=DEBUG"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records beyond this are dropped, not blocked on
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "twiml=0.01")  # Fraction of records kept per logger
+
+# Caller signaling
+CALLER_SIGNAL_TTL_SECONDS = float(os.getenv("CALLER_SIGNAL_TTL_SECONDS", "120"))
+CALLER_SIGNAL_MAX_ROOMS = int(os.getenv("CALLER_SIGNAL_MAX_ROOMS", "10000"))
+CALLER_SIGNAL_POLL_SECONDS = float(os.getenv("CALLER_SIGNAL_POLL_SECONDS", "0.5"))  # Shared store re-check
+
+# Conference status callbacks: in-memory membership plus a batched SQLite event log
+CONFERENCE_EVENT_DB = os.getenv("CONFERENCE_EVENT_DB", "conference_events.db")
+CONFERENCE_EVENT_QUEUE_SIZE = int(os.getenv("CONFERENCE_EVENT_QUEUE_SIZE", "10000"))
+CONFERENCE_EVENT_BATCH_SIZE = int(os.getenv("CONFERENCE_EVENT_BATCH_SIZE", "200"))
+CONFERENCE_EVENT_FLUSH_SECONDS = float(os.getenv("CONFERENCE_EVENT_FLUSH_SECONDS", "0.5"))  # Max wait to fill a batch
+CONFERENCE_STATE_MAX = int(os.getenv("CONFERENCE_STATE_MAX", "5000"))  # Conferences tracked in memory
+
+# Agent directory: skill-based routing of Agent B
+AGENT_RESERVATION_SECONDS = float(os.getenv("AGENT_RESERVATION_SECONDS", "600"))  # Unreleased reservations expire after this
+AGENT_DEFAULT_CAPACITY = int(os.getenv("AGENT_DEFAULT_CAPACITY", "1"))  # Concurrent transfers per agent
+
+# LiveKit webhooks: in-memory index of rooms, participants and tracks
+ROOM_INDEX_MAX_ROOMS = int(os.getenv("ROOM_INDEX_MAX_ROOMS", "5000"))
+ROOM_INDEX_IDLE_SECONDS = float(os.getenv("ROOM_INDEX_IDLE_SECONDS", "3600"))  # Rooms without events this long are dropped
 
 TWILIO_API_KEY = os.getenv("TWILIO_API_KEY")
 TWILIO_API_SECRET = os.getenv("TWILIO_API_SECRET") 
 TWILIO_APP_SID = os.getenv("TWILIO_APP_SID") 
+TWILIO_TOKEN_TTL_SECONDS = float(os.getenv("TWILIO_TOKEN_TTL_SECONDS", "14400"))  # 4 hours
+
+# Access-token cache: a token is reused until this fraction of its TTL has elapsed
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_REUSE_FRACTION = float(os.getenv("TOKEN_CACHE_REUSE_FRACTION", "0.5"))
 
-def validate_config():
-    """Validate that all required environment variables are set"""
+# Deployment role: which routers this process mounts ("full", "webhooks" or "tokens")
+APP_ROLE = os.getenv("APP_ROLE", "full")
+
+# Variables each subsystem needs; only subsystems enabled by the role are checked
+REQUIRED_ENV = {
+    "livekit_api": ("LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "LIVEKIT_URL"),
+    "livekit_tokens": ("LIVEKIT_API_KEY", "LIVEKIT_API_SECRET", "LIVEKIT_URL"),
+    "livekit_webhooks": ("LIVEKIT_API_KEY", "LIVEKIT_API_SECRET"),
+    "twilio_rest": ("TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER"),
+    "twilio_tokens": ("TWILIO_ACCOUNT_SID", "TWILIO_API_KEY", "TWILIO_API_SECRET", "TWILIO_APP_SID"),
+}
+
+def validate_config(subsystems=None):
+    """Validate that the environment variables for the given subsystems (default: all) are set"""
+    if subsystems is None:
+        subsystems = REQUIRED_ENV.keys()
     missing = []
-    if not LIVEKIT_API_KEY:
-        missing.append("LIVEKIT_API_KEY")
-    if not LIVEKIT_API_SECRET:
-        missing.append("LIVEKIT_API_SECRET")
-    if not LIVEKIT_URL:
-        missing.append("LIVEKIT_URL")
-    if not TWILIO_ACCOUNT_SID:
-        missing.append("TWILIO_ACCOUNT_SID")
-    if not TWILIO_AUTH_TOKEN:
-        missing.append("TWILIO_AUTH_TOKEN")
-    if not TWILIO_PHONE_NUMBER:
-        missing.append("TWILIO_PHONE_NUMBER")
-    if not TWILIO_API_KEY:
-        missing.append("TWILIO_API_KEY")
-    if not TWILIO_API_SECRET:
-        missing.append("TWILIO_API_SECRET")
-    if not TWILIO_APP_SID:
-        missing.append("TWILIO_APP_SID")
+    for subsystem in subsystems:
+        for name in REQUIRED_ENV.get(subsystem, ()):
+            if not globals()[name] and name not in missing:
+                missing.append(name)
     
     if missing:
         raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
-
-# Validate on import
-validate_config()
@@ -0,0 +1,143 @@
+"""Queue-based logging: handlers only enqueue, a background thread formats and writes.
+
+Call `setup_logging()` once at startup. Records carry structured fields through
+`extra={...}`, which the JSON formatter emits as top-level keys.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from core.config import LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES
+
+# Attributes every LogRecord has; anything else came from `extra=` and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, any extra fields, and exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development, extras appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(
+            f"{key}={value}" for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS and not key.startswith("_")
+        )
+        return f"{line} {extras}" if extras else line
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Enqueues records as-is, so formatting happens on the listener thread.
+
+    When the queue is full the record is dropped and counted instead of blocking
+    the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Args can be mutable objects changed after the call returns; freeze the message now
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SampleFilter(logging.Filter):
+    """Passes roughly `rate` of the records logged directly on the logger it is attached to"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1 or random.random() < self.rate
+
+
+def _parse_pairs(spec: str) -> Dict[str, str]:
+    """"a=1,b.c=2" -> {"a": "1", "b.c": "2"}"""
+    pairs = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+def setup_logging(level: str = LOG_LEVEL, module_levels: str = LOG_LEVELS, fmt: str = LOG_FORMAT,
+                  queue_size: int = LOG_QUEUE_SIZE, sample_rates: str = LOG_SAMPLE_RATES):
+    """Route every logger (including uvicorn's) through one queue and background writer"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    # uvicorn installs its own stream handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    for name, module_level in _parse_pairs(module_levels).items():
+        logging.getLogger(name).setLevel(module_level.upper())
+    for name, rate in _parse_pairs(sample_rates).items():
+        logging.getLogger(name).addFilter(SampleFilter(float(rate)))
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    return sum(getattr(handler, "dropped", 0) for handler in logging.getLogger().handlers)
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+
+from starlette.responses import JSONResponse
+
+from utils import deadlines
+from utils.admission import Rejected
+from utils.metrics import (
+    ADMISSION_REJECTIONS,
+    ADMISSION_WAIT_SECONDS,
+    HTTP_CLIENT_DISCONNECTS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUEST_ERRORS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, in-flight count and errors per route.
+
+    Requests are labelled by the matched route template (e.g. `/summaries/{summary_id}`)
+    so path parameters never create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, *labels)
+            if scope.get("client_disconnected"):
+                HTTP_CLIENT_DISCONNECTS.inc(*labels)
+            elif status >= 500:
+                HTTP_REQUEST_ERRORS.inc(*labels)
+
+
+class DeadlineMiddleware:
+    """Pure ASGI middleware giving each request a deadline and cancelling it if the client leaves.
+
+    The deadline comes from the `X-Request-Timeout` header (seconds, capped at
+    `max_timeout`); see utils/deadlines.py for how steps use it. The request runs in
+    its own task while the client connection is watched, so a disconnect before the
+    response is complete cancels the endpoint and any upstream call it is awaiting.
+    """
+
+    def __init__(self, app, max_timeout: float = 60.0, header: bytes = b"x-request-timeout"):
+        self.app = app
+        self.max_timeout = max_timeout
+        self.header = header
+
+    def _timeout(self, scope):
+        for name, value in scope["headers"]:
+            if name == self.header:
+                try:
+                    timeout = float(value)
+                except ValueError:
+                    return None
+                return min(max(timeout, 0.0), self.max_timeout)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        messages = asyncio.Queue()
+        disconnected = asyncio.Event()
+        response_complete = False
+
+        async def read():
+            # The app reads the request from `messages`; the disconnect is seen here as well
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def send_tracked(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        token = deadlines.start(self._timeout(scope))
+        try:
+            handler = asyncio.create_task(self.app(scope, messages.get, send_tracked))
+        finally:
+            deadlines.reset(token)
+        reader = asyncio.create_task(read())
+        watcher = asyncio.create_task(disconnected.wait())
+        try:
+            await asyncio.wait((handler, watcher), return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_complete:
+                # Servers also report a disconnect once the response is sent; only an early one cancels
+                handler.cancel()
+                await asyncio.wait((handler,))
+                scope["client_disconnected"] = True
+                logger.info("Client disconnected, request cancelled", extra={
+                    "method": scope["method"], "path": scope["path"]
+                })
+                return
+            await handler
+        finally:
+            if not handler.done():
+                handler.cancel()
+            reader.cancel()
+            watcher.cancel()
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware admitting requests into their route class's pool before routing.
+
+    Unclassified routes pass straight through. A classified request waits in its
+    class's queue for up to the queue timeout (or what is left of its deadline); a
+    full queue or timeout answers 503, a caller over its token bucket 429, both with
+    Retry-After. Callers are identified by `X-Caller-Identity`, else the client address.
+    """
+
+    def __init__(self, app, controller, classify, identity_header: bytes = b"x-caller-identity"):
+        self.app = app
+        self.controller = controller
+        self.classify = classify
+        self.identity_header = identity_header
+
+    def _identity(self, scope):
+        for name, value in scope["headers"]:
+            if name == self.identity_header:
+                return value.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name = self.classify(scope["method"], scope["path"])
+        cls = self.controller.by_name.get(name) if name is not None else None
+        if cls is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            # Runs in the request's task, so a client disconnect also ends the wait
+            await self.controller.acquire(cls, self._identity(scope), deadlines.cap(self.controller.queue_timeout))
+        except Rejected as e:
+            ADMISSION_REJECTIONS.inc(cls.name, e.reason)
+            response = JSONResponse(
+                {"detail": f"Server busy: {e.reason}", "class": cls.name, "reason": e.reason},
+                status_code=429 if e.reason == "rate_limited" else 503,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        admitted = time.perf_counter()
+        ADMISSION_WAIT_SECONDS.observe(admitted - started, cls.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(cls, time.perf_counter() - admitted)
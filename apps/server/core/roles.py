@@ -0,0 +1,52 @@
+"""Deployment roles: which routers a process mounts, and which subsystems they need"""
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class RouterSpec(NamedTuple):
+    prefix: str
+    tags: List[str]
+    subsystems: Tuple[str, ...]
+
+
+# Router modules under api/, in mount order
+ROUTERS: Dict[str, RouterSpec] = {
+    "health": RouterSpec("", ["health"], ()),
+    "metrics": RouterSpec("", ["metrics"], ()),
+    "auth": RouterSpec("", ["auth"], ("livekit_tokens",)),
+    "transfer": RouterSpec("", ["transfer"], ("groq", "sessions")),
+    "warm_transfer": RouterSpec("", ["transfer"], ("groq", "livekit_api", "twilio_rest", "sessions")),
+    "agent": RouterSpec("", ["agent"], ("livekit_api", "sessions")),
+    "agent_directory": RouterSpec("", ["agent"], ()),
+    "summary": RouterSpec("", ["summary"], ("groq", "sessions")),
+    "transcripts": RouterSpec("", ["transcripts"], ("groq", "transcripts")),
+    "twilio_api": RouterSpec("/twilio", ["twilio"], ("twilio_rest", "groq", "sessions", "idempotency")),
+    "twilio_tokens": RouterSpec("/twilio", ["twilio"], ("twilio_tokens", "sessions")),
+    "twilio_webhooks": RouterSpec("/twilio", ["twilio"], ("conference_events",)),
+    "livekit_webhooks": RouterSpec("/livekit", ["livekit"], ("livekit_webhooks",)),
+}
+
+# Mounted by every role
+ALWAYS = ("health", "metrics")
+
+ROLES: Dict[str, Tuple[str, ...]] = {
+    # Twilio voice and conference-status callbacks, and LiveKit room webhooks
+    "webhooks": ("twilio_webhooks", "livekit_webhooks"),
+    # LiveKit and Twilio voice access tokens
+    "tokens": ("auth", "twilio_tokens"),
+    "full": tuple(name for name in ROUTERS if name not in ALWAYS),
+}
+
+
+def routers_for_role(role: str) -> List[str]:
+    if role not in ROLES:
+        raise ValueError(f"Unknown APP_ROLE: {role} (expected one of {', '.join(ROLES)})")
+    return [name for name in ROUTERS if name in ALWAYS or name in ROLES[role]]
+
+
+def subsystems_for(routers: List[str]) -> List[str]:
+    subsystems = []
+    for name in routers:
+        for subsystem in ROUTERS[name].subsystems:
+            if subsystem not in subsystems:
+                subsystems.append(subsystem)
+    return subsystems
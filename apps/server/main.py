@@ -1,38 +1,133 @@
-from fastapi import FastAPI
+import importlib
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
-from api import health, auth, transfer, agent, twilio_api
-import logging
+from core.config import APP_ROLE, ADMISSION_ENABLED, REQUEST_MAX_TIMEOUT_SECONDS, validate_config
+from core.middleware import AdmissionMiddleware, DeadlineMiddleware, MetricsMiddleware
+from core.roles import ROUTERS, routers_for_role, subsystems_for
+from core.logging_config import setup_logging
+from utils.deadlines import DeadlineExceeded
 
-logging.basicConfig(
-    level=logging.INFO,  # Show INFO and above
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+# JSON lines written by a background thread; see LOG_* settings in core/config.py
+setup_logging()
 
 load_dotenv()
 
-app = FastAPI(
-    title="Warm Call Transfer API",
-    description="LiveKit-based warm call transfer system with AI summaries",
-    version="1.0.0"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(health.router, tags=["health"])
-app.include_router(auth.router, tags=["auth"]) 
-app.include_router(transfer.router, tags=["transfer"])
-app.include_router(agent.router, tags=["agent"])
-app.include_router(twilio_api.router, prefix="/twilio", tags=["twilio"])
+
+def _lifecycle(subsystem: str):
+    """(startup, shutdown) for one subsystem; services are imported only if the role uses them"""
+    if subsystem == "groq":
+        from services import ai_service
+        return ai_service.startup, ai_service.shutdown
+    if subsystem == "transcripts":
+        from services.transcript_service import transcripts
+        return transcripts.startup, transcripts.shutdown
+    if subsystem == "livekit_api":
+        from services import livekit_service
+        return livekit_service.startup, livekit_service.shutdown
+    if subsystem == "twilio_rest":
+        from services.twilio_service import twilio_service
+        from services.dialer_service import bulk_dialer
+
+        async def shutdown():
+            await bulk_dialer.shutdown()
+            await twilio_service.shutdown()
+        return twilio_service.startup, shutdown
+    if subsystem == "conference_events":
+        from services.conference_events import conference_events
+        return conference_events.startup, conference_events.shutdown
+    if subsystem == "idempotency":
+        from services.idempotency import idempotency
+        return None, idempotency.close
+    if subsystem == "sessions":
+        from services.session_store import session_store
+        return None, session_store.close
+    return None, None
+
+
+# Startup order; shutdown runs in reverse so the session store closes last
+_LIFECYCLE_ORDER = ("sessions", "idempotency", "groq", "transcripts", "livekit_api", "twilio_rest", "conference_events")
+
+
+def _lifespan(subsystems: List[str]):
+    hooks = [_lifecycle(name) for name in _LIFECYCLE_ORDER if name in subsystems]
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Create shared upstream clients on startup and close them on shutdown"""
+        for startup, _ in hooks:
+            if startup is not None:
+                await startup()
+        try:
+            yield
+        finally:
+            for _, shutdown in reversed(hooks):
+                if shutdown is not None:
+                    await shutdown()
+
+    return lifespan
+
+
+async def _deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc), "step": exc.step})
+
+
+def create_app(role: str = APP_ROLE, admission: bool = ADMISSION_ENABLED) -> FastAPI:
+    """Build the app for a deployment role ("full", "webhooks" or "tokens").
+
+    Only the role's routers are imported and mounted, and only the configuration of
+    the subsystems they use is validated. `admission` toggles admission control.
+    """
+    routers = routers_for_role(role)
+    subsystems = subsystems_for(routers)
+    validate_config(subsystems)
+
+    app = FastAPI(
+        title="Warm Call Transfer API",
+        description="LiveKit-based warm call transfer system with AI summaries",
+        version="1.0.0",
+        lifespan=_lifespan(subsystems)
+    )
+    app.state.role = role
+    app.state.subsystems = subsystems
+
+    # Innermost, so shed responses still get CORS headers and queue waits see the request deadline
+    if admission:
+        from core.admission import admission as controller, classify
+        app.add_middleware(AdmissionMiddleware, controller=controller, classify=classify)
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Request deadline from X-Request-Timeout; cancels the request if the client disconnects
+    app.add_middleware(DeadlineMiddleware, max_timeout=REQUEST_MAX_TIMEOUT_SECONDS)
+    app.add_exception_handler(DeadlineExceeded, _deadline_exceeded)
+
+    # Outermost, so timings include every other middleware
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    for name in routers:
+        spec = ROUTERS[name]
+        module = importlib.import_module(f"api.{name}")
+        app.include_router(module.router, prefix=spec.prefix, tags=spec.tags)
+
+    return app
+
+
+# `uvicorn main:app` serves APP_ROLE; `uvicorn --factory main:create_app` works too
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # log_config=None keeps uvicorn on the queued handlers instead of its own stream handlers
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_config=None)
@@ -0,0 +1,4 @@
+# Models package
+from .transfer_session import TransferSession
+
+__all__ = ["TransferSession"]
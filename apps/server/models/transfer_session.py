@@ -0,0 +1,37 @@
+import time
+import uuid
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TransferSession(BaseModel):
+    """Server-side state of one warm transfer, shared by every worker through the session store"""
+    session_id: str = Field(default_factory=lambda: f"xfer-{uuid.uuid4().hex[:12]}")
+    kind: Literal["livekit", "phone"]
+    status: str
+    caller_room: str
+    caller_identity: str
+    agent_a_identity: str
+    agent_b_identity: Optional[str] = None
+    phone_number: Optional[str] = None
+    reservation_id: Optional[str] = None  # Agent B's reservation in the agent directory, if routed by skill
+    consultation_room: Optional[str] = None
+    conference_name: Optional[str] = None
+    participants: List[str] = Field(default_factory=list)
+    caller_on_hold: bool = False
+    summary_id: Optional[str] = None
+    summary: Optional[str] = None
+    call_sids: List[str] = Field(default_factory=list)
+    # Orchestrated transfers: step name -> {"status", "started_at", "finished_at", "duration_ms", "error"}
+    steps: Dict[str, dict] = Field(default_factory=dict)
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+
+    def rooms(self) -> List[str]:
+        """Every room or conference name this session can be looked up by"""
+        return [room for room in (self.caller_room, self.consultation_room, self.conference_name) if room]
+
+    def add_participant(self, identity: str):
+        if identity and identity not in self.participants:
+            self.participants.append(identity)
@@ -1,25 +1,47 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 class TransferRequest(BaseModel):
     caller_room: str
     caller_identity: str
     agent_a_identity: str
     context: Optional[str] = None
+    agent_b_skill: Optional[str] = None  # Route to and reserve an available Agent B with this skill
 
 class MoveParticipantRequest(BaseModel):
     consultation_room: str
     agent_b_identity: str
     destination_room: str
+    session_id: Optional[str] = None  # Falls back to the session for consultation_room
 
 class HoldCallerRequest(BaseModel):
     caller_identity: str
     room: str
     hold: bool
+
+class ParticipantOperation(BaseModel):
+    action: Literal["move", "remove"]
+    room: str
+    identity: str
+    destination_room: Optional[str] = None  # Required for "move"
+
+class BatchParticipantRequest(BaseModel):
+    operations: List[ParticipantOperation] = Field(..., min_length=1)
+    max_concurrency: Optional[int] = Field(None, ge=1, le=64)
+
+class BulkHoldRequest(BaseModel):
+    rooms: List[str] = Field(..., min_length=1)
+    hold: bool
+    max_concurrency: Optional[int] = Field(None, ge=1, le=64)
+
 class PhoneCallRequest(BaseModel):
     phone_number: str
     message: Optional[str] = "Hello! You are being connected to customer support."
 
+class BulkCallRequest(BaseModel):
+    phone_numbers: List[str] = Field(..., min_length=1, max_length=1000)
+    message: Optional[str] = "Hello! You are being connected to customer support."
+
 class ConferenceCallRequest(BaseModel):
     phone_number: str
     conference_name: str
@@ -28,5 +50,36 @@ class PhoneTransferRequest(BaseModel):
     caller_room: str
     caller_identity: str
     agent_a_identity: str
-    phone_number: str  # Agent B's phone number
-    context: Optional[str] = None
\ No newline at end of file
+    phone_number: Optional[str] = None  # Agent B's phone number
+    agent_b_skill: Optional[str] = None  # Without a phone number: route to an available Agent B with this skill
+    context: Optional[str] = None
+
+class WarmTransferRequest(BaseModel):
+    caller_room: str
+    caller_identity: str
+    agent_a_identity: str
+    phone_number: Optional[str] = None  # Agent B's phone; without it Agent B joins a LiveKit consultation room
+    context: Optional[str] = None
+    hold_caller: bool = True
+
+class AgentProfileRequest(BaseModel):
+    identity: Optional[str] = None  # LiveKit identity, for LiveKit transfers
+    phone_number: Optional[str] = None  # For phone transfers
+    skills: List[str] = Field(default_factory=list, max_length=100)
+    capacity: Optional[int] = Field(None, ge=1, le=100)  # Concurrent transfers
+    status: Literal["available", "busy", "away", "offline"] = "available"
+
+class AgentStatusRequest(BaseModel):
+    status: Literal["available", "busy", "away", "offline"]
+
+class RouteAgentRequest(BaseModel):
+    skill: Optional[str] = None  # Any agent on the channel if omitted
+    channel: Literal["livekit", "phone"] = "livekit"
+    exclude: List[str] = Field(default_factory=list)  # Agent ids or identities to pass over, e.g. Agent A
+
+class Utterance(BaseModel):
+    speaker: str  # e.g. "caller" or the agent's identity
+    text: str = Field(..., min_length=1)
+
+class TranscriptAppendRequest(BaseModel):
+    utterances: List[Utterance] = Field(..., min_length=1, max_length=500)
@@ -0,0 +1,268 @@
+import heapq
+import itertools
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+
+from core.config import AGENT_RESERVATION_SECONDS, AGENT_DEFAULT_CAPACITY
+
+# How a transfer reaches Agent B: a LiveKit identity or a phone number
+CHANNELS = ("livekit", "phone")
+# Heap of every agent on a channel, for routing without a skill
+ANY_SKILL = "*"
+
+
+class Agent:
+    """One agent's presence, skills, load and routing bookkeeping"""
+
+    __slots__ = ("agent_id", "identity", "phone_number", "skills", "capacity", "status", "load",
+                 "last_assigned", "version", "updated_at")
+
+    def __init__(self, agent_id: str):
+        self.agent_id = agent_id
+        self.identity: Optional[str] = None
+        self.phone_number: Optional[str] = None
+        self.skills: Set[str] = set()
+        self.capacity = 1
+        self.status = "offline"
+        self.load = 0
+        self.last_assigned = 0.0
+        # Changed on every update; heap entries carrying another version are stale
+        self.version = -1
+        self.updated_at = time.time()
+
+    @property
+    def available(self) -> bool:
+        return self.status == "available" and self.load < self.capacity
+
+    def keys(self) -> List[Tuple[str, str]]:
+        channels = [channel for channel, target in zip(CHANNELS, (self.identity, self.phone_number)) if target]
+        return [(skill, channel) for skill in (*self.skills, ANY_SKILL) for channel in channels]
+
+    def snapshot(self) -> dict:
+        return {
+            "agent_id": self.agent_id,
+            "identity": self.identity,
+            "phone_number": self.phone_number,
+            "skills": sorted(self.skills),
+            "capacity": self.capacity,
+            "status": self.status,
+            "load": self.load,
+            "available": self.available,
+            "last_assigned": self.last_assigned or None,
+            "updated_at": self.updated_at,
+        }
+
+
+class Reservation:
+    __slots__ = ("reservation_id", "agent_id", "skill", "channel", "created_at", "expires_at")
+
+    def __init__(self, agent_id: str, skill: Optional[str], channel: str, ttl_seconds: float):
+        self.reservation_id = f"rsv-{uuid.uuid4().hex[:12]}"
+        self.agent_id = agent_id
+        self.skill = skill
+        self.channel = channel
+        self.created_at = time.time()
+        self.expires_at = time.monotonic() + ttl_seconds
+
+    def snapshot(self) -> dict:
+        return {
+            "reservation_id": self.reservation_id,
+            "agent_id": self.agent_id,
+            "skill": self.skill,
+            "channel": self.channel,
+            "created_at": self.created_at,
+            "expires_in": round(max(0.0, self.expires_at - time.monotonic()), 1),
+        }
+
+
+class AgentDirectory:
+    """Agents' presence, skills and load, with skill-based routing of Agent B.
+
+    Each (skill, channel) has a min-heap of available agents keyed by (utilisation,
+    last assigned), so the least loaded, longest idle agent is on top. Entries are
+    never updated in place: any change to an agent bumps its version and pushes fresh
+    entries, and stale ones are discarded when they reach the top (or the heap is
+    rebuilt once they outnumber live ones). Routing therefore costs O(log n) amortized.
+    Nothing here awaits, so picking and reserving an agent is atomic in the process.
+
+    A reservation counts toward the agent's load until it is released or expires
+    after `reservation_seconds`, so an abandoned transfer does not hold Agent B.
+    """
+
+    def __init__(self, reservation_seconds: float = 600.0, default_capacity: int = 1):
+        self.reservation_seconds = reservation_seconds
+        self.default_capacity = default_capacity
+        self._agents: Dict[str, Agent] = {}
+        self._heaps: Dict[Tuple[str, str], list] = {}
+        # Agents per (skill, channel), for rebuilding a heap full of stale entries
+        self._members: Dict[Tuple[str, str], Set[str]] = {}
+        self._reservations: Dict[str, Reservation] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._sequence = itertools.count()
+        self.routed = 0
+        self.unroutable = 0
+        self.expired = 0
+        self.rebuilds = 0
+
+    def upsert(self, agent_id: str, identity: Optional[str] = None, phone_number: Optional[str] = None,
+               skills: Iterable[str] = (), capacity: Optional[int] = None, status: str = "available") -> Agent:
+        """Register an agent or replace its profile; load and last-assigned time are kept"""
+        agent = self._agents.get(agent_id)
+        if agent is None:
+            agent = self._agents[agent_id] = Agent(agent_id)
+        self._unlink(agent)
+        agent.identity = identity
+        agent.phone_number = phone_number
+        agent.skills = set(skills)
+        agent.capacity = capacity or self.default_capacity
+        agent.status = status
+        for key in agent.keys():
+            self._members.setdefault(key, set()).add(agent_id)
+        self._touch(agent)
+        return agent
+
+    def set_status(self, agent_id: str, status: str) -> Optional[Agent]:
+        agent = self._agents.get(agent_id)
+        if agent is not None:
+            agent.status = status
+            self._touch(agent)
+        return agent
+
+    def remove(self, agent_id: str) -> bool:
+        agent = self._agents.pop(agent_id, None)
+        if agent is None:
+            return False
+        # Its heap entries are now stale; its reservations release as no-ops
+        self._unlink(agent)
+        return True
+
+    def _unlink(self, agent: Agent):
+        for key in agent.keys():
+            members = self._members.get(key)
+            if members is not None:
+                members.discard(agent.agent_id)
+
+    def _entry(self, agent: Agent) -> tuple:
+        return (agent.load / agent.capacity, agent.last_assigned, next(self._sequence), agent.version, agent.agent_id)
+
+    def _touch(self, agent: Agent):
+        # From the directory-wide counter, so a removed and re-registered agent never
+        # matches entries pushed for its earlier self
+        agent.version = next(self._sequence)
+        agent.updated_at = time.time()
+        if not agent.available:
+            return
+        entry = self._entry(agent)
+        for key in agent.keys():
+            heap = self._heaps.setdefault(key, [])
+            heapq.heappush(heap, entry)
+            if len(heap) > 2 * len(self._members.get(key, ())) + 64:
+                self._rebuild(key)
+
+    def _rebuild(self, key: Tuple[str, str]):
+        agents = (self._agents[agent_id] for agent_id in self._members.get(key, ()))
+        heap = self._heaps[key] = [self._entry(agent) for agent in agents if agent.available]
+        heapq.heapify(heap)
+        self.rebuilds += 1
+
+    def _current(self, entry: tuple) -> Optional[Agent]:
+        agent = self._agents.get(entry[4])
+        if agent is None or agent.version != entry[3]:
+            return None
+        return agent
+
+    def route(self, skill: Optional[str] = None, channel: str = "livekit",
+              exclude: Iterable[str] = ()) -> Optional[Tuple[Agent, Reservation]]:
+        """Reserve the best available agent with `skill` reachable on `channel`, or None.
+
+        `exclude` lists agent ids or identities to pass over, such as Agent A.
+        """
+        self._expire()
+        heap = self._heaps.get((skill or ANY_SKILL, channel))
+        exclude = set(exclude)
+        skipped = []
+        try:
+            while heap:
+                agent = self._current(heap[0])
+                if agent is None:
+                    heapq.heappop(heap)
+                    continue
+                if agent.agent_id in exclude or agent.identity in exclude:
+                    skipped.append(heapq.heappop(heap))
+                    continue
+                heapq.heappop(heap)
+                self.routed += 1
+                return agent, self._reserve(agent, skill, channel)
+        finally:
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+        self.unroutable += 1
+        return None
+
+    def _reserve(self, agent: Agent, skill: Optional[str], channel: str) -> Reservation:
+        reservation = Reservation(agent.agent_id, skill, channel, self.reservation_seconds)
+        self._reservations[reservation.reservation_id] = reservation
+        heapq.heappush(self._expiry, (reservation.expires_at, reservation.reservation_id))
+        agent.load += 1
+        agent.last_assigned = time.time()
+        self._touch(agent)
+        return reservation
+
+    def release(self, reservation_id: str) -> bool:
+        """End a reservation, freeing the agent's slot; False if it already ended"""
+        reservation = self._reservations.pop(reservation_id, None)
+        if reservation is None:
+            return False
+        agent = self._agents.get(reservation.agent_id)
+        if agent is not None:
+            agent.load = max(0, agent.load - 1)
+            self._touch(agent)
+        return True
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, reservation_id = heapq.heappop(self._expiry)
+            if self.release(reservation_id):
+                self.expired += 1
+
+    def get(self, agent_id: str) -> Optional[Agent]:
+        return self._agents.get(agent_id)
+
+    def reservation(self, reservation_id: str) -> Optional[Reservation]:
+        self._expire()
+        return self._reservations.get(reservation_id)
+
+    def agents(self, skill: Optional[str] = None) -> List[Agent]:
+        return [agent for agent in self._agents.values() if skill is None or skill in agent.skills]
+
+    def stats(self) -> dict:
+        self._expire()
+        return {
+            "agents": len(self._agents),
+            "available": sum(1 for agent in self._agents.values() if agent.available),
+            "reservations": len(self._reservations),
+            "routed": self.routed,
+            "unroutable": self.unroutable,
+            "expired": self.expired,
+            "heap_entries": sum(len(heap) for heap in self._heaps.values()),
+            "rebuilds": self.rebuilds,
+        }
+
+
+def reserve_agent(skill: Optional[str], channel: str = "livekit", exclude: Iterable[str] = ()) -> Tuple[Agent, Reservation]:
+    """`agent_directory.route(...)`, answering 503 while nobody suitable is available"""
+    routed = agent_directory.route(skill, channel, exclude=exclude)
+    if routed is None:
+        raise HTTPException(status_code=503, detail=f"No available agent with skill {skill or 'any'}",
+                            headers={"Retry-After": "5"})
+    return routed
+
+
+agent_directory = AgentDirectory(
+    reservation_seconds=AGENT_RESERVATION_SECONDS,
+    default_capacity=AGENT_DEFAULT_CAPACITY,
+)
@@ -1,41 +1,362 @@
+import asyncio
+import functools
 import logging
-import os
-from groq import Groq
-from core.config import GROQ_API_KEY
+import math
+import time
+from typing import List, Optional
 
+from fastapi import HTTPException
+from core.config import (
+    GROQ_MAX_CONCURRENCY,
+    GROQ_TIMEOUT_SECONDS,
+    LLM_BACKENDS,
+    SUMMARY_CACHE_SIZE,
+    SUMMARY_CACHE_TTL_SECONDS,
+    SUMMARY_STREAM_TTL_SECONDS,
+    SUMMARY_TOKEN_BUDGET,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_MAX_CHUNKS,
+    SUMMARY_MAX_QUEUED,
+)
+from services.summary_cache import SummaryCache, summary_cache_key
+from services.llm_router import llm_router
+from services.summary_stream import SummaryStream, SummaryStreamRegistry
+from utils import deadlines
+from utils.metrics import ADMISSION_REJECTIONS
 
 logger = logging.getLogger(__name__)
 
+# Part of every cache key, so changing the backends does not serve summaries from the old ones
+SUMMARY_MODEL = LLM_BACKENDS
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that creates concise call summaries for warm transfers. Keep it under 50 words and include key details for the next agent. Be professional and clear."
+DEFAULT_CONTEXT = "Customer called about account login issues. Needs password reset assistance."
+ROLLING_SUMMARY_SYSTEM_PROMPT = "You keep a running summary of a live support call for a warm transfer. Merge the new transcript lines into the current summary, keeping details that still matter. Keep it under 50 words and include key details for the next agent. Be professional and clear."
+CHUNK_SYSTEM_PROMPT = "You summarize one part of a longer support call transcript. Keep names, numbers, decisions and open issues. Keep it under 80 words."
+REDUCE_SYSTEM_PROMPT = "You combine summaries of consecutive parts of one support call into a single warm transfer summary. Keep it under 50 words and include key details for the next agent. Be professional and clear."
+# Share of the summary timeout the map stage may use; the rest is left for the reduce call
+MAP_TIMEOUT_SHARE = 0.6
 
-async def generate_call_summary(context: str = ""):
-    """Generate AI summary using Groq API"""
+# In-flight summary limit, created by the app lifespan along with the backend clients
+_summary_slots: Optional[asyncio.Semaphore] = None
+# Moving average of how long a stream runs, for Retry-After estimates when the queue is full
+_stream_seconds = 1.0
+
+summary_cache = SummaryCache(max_entries=SUMMARY_CACHE_SIZE, ttl_seconds=SUMMARY_CACHE_TTL_SECONDS)
+summary_streams = SummaryStreamRegistry(max_streams=SUMMARY_CACHE_SIZE, ttl_seconds=SUMMARY_STREAM_TTL_SECONDS)
+
+
+async def startup():
+    """Create the LLM backend clients and the in-flight summary limit.
+
+    The Groq and OpenAI SDKs are imported here, so roles without summaries never load them.
+    """
+    global _summary_slots
+    if _summary_slots is not None:
+        return
+    await llm_router.startup()
+    _summary_slots = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+
+
+async def shutdown():
+    """Close the LLM backend clients and their connection pools"""
+    global _summary_slots
+    for stream in summary_streams.active_streams():
+        if stream.task is not None:
+            stream.task.cancel()
+    await llm_router.shutdown()
+    _summary_slots = None
+
+
+async def _slots() -> asyncio.Semaphore:
+    """The in-flight summary limit, starting the clients if the lifespan has not run"""
+    if _summary_slots is None:
+        await startup()
+    return _summary_slots
+
+
+def _summary_messages(context: str):
+    return [
+        {
+            "role": "system",
+            "content": SUMMARY_SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": f"Create a warm transfer summary for this call context: {context}"
+        }
+    ]
+
+
+def _rolling_messages(previous: Optional[str], delta: str):
+    return [
+        {
+            "role": "system",
+            "content": ROLLING_SUMMARY_SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": f"Current summary: {previous or '(none yet)'}\n\nNew transcript lines:\n{delta}"
+        }
+    ]
+
+
+def _rolling_key(previous: Optional[str], delta: str) -> str:
+    return summary_cache_key(f"{previous or ''}\n---\n{delta}", SUMMARY_MODEL, ROLLING_SUMMARY_SYSTEM_PROMPT)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token), without loading a tokenizer"""
+    return (len(text) + 3) // 4
+
+
+def split_chunks(context: str, chunk_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[str]:
+    """Pack whole lines into chunks of at most `chunk_tokens`, splitting only overlong lines.
+
+    Packing is greedy from the start, so appending text only changes the last chunk;
+    earlier chunks keep their cache keys and their summaries are reused.
+    """
+    max_chars = chunk_tokens * 4
+    chunks, current, size = [], [], 0
+    for line in context.splitlines():
+        for start in range(0, max(len(line), 1), max_chars):
+            piece = line[start:start + max_chars]
+            if current and size + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _select_chunks(chunks: List[str], max_chunks: int) -> List[str]:
+    """Bound the map stage: keep the opening chunk (why they called) and the most recent ones"""
+    if len(chunks) <= max_chunks:
+        return chunks
+    return chunks[:1] + chunks[len(chunks) - max_chunks + 1:]
+
+
+def _chunk_messages(chunk: str):
+    return [
+        {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Summarize this part of the call:\n{chunk}"}
+    ]
+
+
+def _reduce_messages(partials: List[str]):
+    parts = "\n".join(f"Part {i}: {partial}" for i, partial in enumerate(partials, 1))
+    return [
+        {"role": "system", "content": REDUCE_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Create a warm transfer summary from these partial summaries, in call order:\n{parts}"}
+    ]
+
+
+def _rolling_reduce_messages(previous: Optional[str], partials: List[str]):
+    parts = "\n".join(f"Part {i}: {partial}" for i, partial in enumerate(partials, 1))
+    return _rolling_messages(previous, f"(too long to send; summarized in parts, in call order)\n{parts}")
+
+
+def _fallback_summary(context: str) -> str:
+    if estimate_tokens(context) > SUMMARY_TOKEN_BUDGET:
+        context = f"{context[:600]}..."
+    return f"Call Summary: {context} - Customer needs assistance and requires transfer to specialist agent."
+
+
+async def _request_summary(messages: list, timeout: float, max_tokens: int = 100) -> str:
+    """Run one completion for the given messages on the first backend to answer"""
+    async with await _slots():
+        summary = await llm_router.complete(messages, timeout, max_tokens)
+
+    logger.debug("Generated summary", extra={"summary": summary})
+    return summary
+
+
+async def _summarize_chunk(chunk: str, timeout: float) -> str:
+    """Summary of one chunk, cached by its text; falls back to the chunk's opening if the call fails"""
+    key = summary_cache_key(chunk, SUMMARY_MODEL, CHUNK_SYSTEM_PROMPT)
     try:
-        if not context:
-            context = "Customer called about account login issues. Needs password reset assistance."
-            
-        groq_client = Groq(api_key=GROQ_API_KEY)
-        
-        chat_completion = groq_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that creates concise call summaries for warm transfers. Keep it under 50 words and include key details for the next agent. Be professional and clear."
-                },
-                {
-                    "role": "user", 
-                    "content": f"Create a warm transfer summary for this call context: {context}"
-                }
-            ],
-            model="llama-3.1-8b-instant",
-            max_tokens=100,
-            temperature=0.1
+        # The load is shielded, so a chunk that misses this deadline is still cached for the next request
+        return await asyncio.wait_for(
+            summary_cache.get_or_load(key, lambda: _request_summary(_chunk_messages(chunk), timeout, max_tokens=150)),
+            timeout
         )
-        
-        summary = chat_completion.choices[0].message.content
-        logger.info("\n" + "="*50 + f"\nGenerated summary:\n{summary}\n" + "="*50)
-        return summary
-        
     except Exception as e:
-        print(f"Groq API Error: {e}")
-        return f"Call Summary: {context} - Customer needs assistance and requires transfer to specialist agent."
+        logger.warning("Chunk summary failed, using excerpt", extra={"error": str(e) or type(e).__name__})
+        return f"{chunk[:300]}..."
+
+
+async def _map_chunks(context: str, timeout: float) -> List[str]:
+    """Summarize the context's chunks concurrently; every chunk returns within `timeout`"""
+    chunks = split_chunks(context)
+    selected = _select_chunks(chunks, SUMMARY_MAX_CHUNKS)
+    partials = await asyncio.gather(*(_summarize_chunk(chunk, timeout) for chunk in selected))
+    logger.debug("Mapped long context", extra={
+        "tokens": estimate_tokens(context), "chunks": len(chunks), "summarized": len(selected)
+    })
+    return list(partials)
+
+
+async def _map_reduce_summary(context: str, timeout: float, reduce=_reduce_messages) -> str:
+    """Chunk summaries combined by one more completion (messages from `reduce`), all within `timeout`"""
+    started = time.monotonic()
+    partials = await _map_chunks(context, timeout * MAP_TIMEOUT_SHARE)
+    remaining = timeout - (time.monotonic() - started)
+    return await _request_summary(reduce(partials), remaining)
+
+
+async def _stream_summary(stream: SummaryStream, messages: Optional[list], fallback: str, timeout: float,
+                          map_context: Optional[str] = None, reduce=_reduce_messages):
+    """Feed the first backend's streamed completion into `stream` token by token.
+
+    With `map_context`, the chunks are summarized first and the streamed completion
+    combines them (messages from `reduce`); both stages together stay within `timeout`.
+    """
+    global _stream_seconds
+    started = time.monotonic()
+    try:
+        slots = await _slots()
+
+        if map_context is not None:
+            started = time.monotonic()
+            messages = reduce(await _map_chunks(map_context, timeout * MAP_TIMEOUT_SHARE))
+            timeout -= time.monotonic() - started
+
+        async def consume():
+            async with slots:
+                tokens = llm_router.stream(messages, timeout)
+                try:
+                    async for token in tokens:
+                        stream.append(token)
+                finally:
+                    await tokens.aclose()
+
+        await asyncio.wait_for(consume(), timeout)
+        summary_cache.set(stream.key, stream.text)
+        stream.finish()
+        logger.debug("Generated summary", extra={"summary": stream.text, "summary_id": stream.summary_id})
+
+    except asyncio.CancelledError:
+        # Abandoned by every request that wanted it, or shutting down; unblock any subscriber
+        stream.finish(final_text=fallback, error="cancelled")
+        raise
+    except Exception as e:
+        logger.warning("Streamed summary failed, using fallback", extra={"error": str(e) or type(e).__name__})
+        stream.finish(final_text=fallback, error=str(e) or type(e).__name__)
+    finally:
+        summary_streams.release(stream)
+        _stream_seconds += 0.1 * (time.monotonic() - started - _stream_seconds)
+
+
+async def start_summary_stream(context: str = "", timeout: Optional[float] = None) -> SummaryStream:
+    """Start (or join) a streamed summary and return immediately with its stream"""
+    if not context:
+        context = DEFAULT_CONTEXT
+
+    key = summary_cache_key(context, SUMMARY_MODEL, SUMMARY_SYSTEM_PROMPT)
+    if estimate_tokens(context) > SUMMARY_TOKEN_BUDGET:
+        return _start_stream(key, None, _fallback_summary(context), timeout, map_context=context)
+    return _start_stream(key, _summary_messages(context), _fallback_summary(context), timeout)
+
+
+async def start_rolling_summary_stream(previous: Optional[str], delta: str,
+                                       timeout: Optional[float] = None) -> SummaryStream:
+    """Stream `previous` updated with the transcript lines in `delta`; only the delta is sent as new text.
+
+    A delta over SUMMARY_TOKEN_BUDGET is map-reduced, with `previous` folded in at the reduce step.
+    """
+    fallback = f"{previous} Latest: {delta[-300:]}" if previous else _fallback_summary(delta[-300:])
+    key = _rolling_key(previous, delta)
+    if estimate_tokens(delta) > SUMMARY_TOKEN_BUDGET:
+        return _start_stream(key, None, fallback, timeout, map_context=delta,
+                             reduce=functools.partial(_rolling_reduce_messages, previous))
+    return _start_stream(key, _rolling_messages(previous, delta), fallback, timeout)
+
+
+def _admit_stream(timeout: float):
+    """Refuse a new stream once GROQ_MAX_CONCURRENCY are running and SUMMARY_MAX_QUEUED more are
+    waiting, or sooner if the expected wait for a slot would leave it no time to finish.
+
+    Streams outlive the request that starts them, so the request's admission slot does
+    not bound them; without this a spike queues summaries that can only time out into
+    the fallback.
+    """
+    in_flight = summary_streams.in_flight()
+    if in_flight < GROQ_MAX_CONCURRENCY:
+        return
+    # Slots free up about GROQ_MAX_CONCURRENCY at a time, one stream length apart
+    wait = (in_flight - GROQ_MAX_CONCURRENCY + 1) / GROQ_MAX_CONCURRENCY * _stream_seconds
+    if in_flight < GROQ_MAX_CONCURRENCY + SUMMARY_MAX_QUEUED and wait + _stream_seconds <= timeout:
+        return
+    ADMISSION_REJECTIONS.inc("llm", "summary_queue_full")
+    raise HTTPException(status_code=503, detail="Too many summaries in progress",
+                        headers={"Retry-After": str(max(1, math.ceil(wait)))})
+
+
+def _start_stream(key: str, messages: Optional[list], fallback: str, timeout: Optional[float],
+                  map_context: Optional[str] = None, reduce=_reduce_messages) -> SummaryStream:
+    stream = summary_streams.find_active(key)
+    if stream is not None:
+        summary_cache.coalesced += 1
+        stream.holders += 1
+        return stream
+
+    cached = summary_cache.get(key)
+    if cached is not None:
+        summary_cache.hits += 1
+        return summary_streams.completed(key, cached)
+
+    summary_cache.misses += 1
+    call_timeout = timeout if timeout is not None else GROQ_TIMEOUT_SECONDS
+    _admit_stream(call_timeout)
+    stream = summary_streams.create(key)
+    stream.holders = 1
+    # Streams outlive the request that started them, so they are not bound by its deadline
+    stream.task = asyncio.create_task(_stream_summary(stream, messages, fallback, call_timeout, map_context, reduce),
+                                      context=deadlines.detached())
+    return stream
+
+
+async def generate_call_summary(context: str = "", timeout: Optional[float] = None):
+    """Generate AI summary using Groq API; contexts over SUMMARY_TOKEN_BUDGET are map-reduced.
+
+    Blocking and bounded by the request deadline, but no endpoint uses it any more:
+    transfers stream their summary (`start_summary_stream`), which runs detached with
+    the full GROQ_TIMEOUT_SECONDS. Kept for benchmarks/long_summary.
+    """
+    try:
+        if not context:
+            context = DEFAULT_CONTEXT
+
+        # Never waits past the request deadline; the fallback is returned instead
+        call_timeout = deadlines.cap(timeout if timeout is not None else GROQ_TIMEOUT_SECONDS)
+        key = summary_cache_key(context, SUMMARY_MODEL, SUMMARY_SYSTEM_PROMPT)
+        stream = summary_streams.find_active(key)
+        if stream is not None:
+            summary_cache.coalesced += 1
+            return await asyncio.wait_for(asyncio.shield(stream.wait()), call_timeout)
+        if estimate_tokens(context) > SUMMARY_TOKEN_BUDGET:
+            return await summary_cache.get_or_load(key, lambda: _map_reduce_summary(context, call_timeout))
+        return await summary_cache.get_or_load(key, lambda: _request_summary(_summary_messages(context), call_timeout))
+
+    except Exception as e:
+        logger.warning("Summary failed, using fallback", extra={"error": str(e) or type(e).__name__})
+        return _fallback_summary(context)
+
 
+async def update_rolling_summary(previous: Optional[str], delta: str, timeout: Optional[float] = None) -> str:
+    """Fold `delta` into `previous` without streaming; raises on failure so the caller keeps `previous`"""
+    call_timeout = timeout if timeout is not None else GROQ_TIMEOUT_SECONDS
+    key = _rolling_key(previous, delta)
+    # A transfer may already be streaming this exact update
+    stream = summary_streams.find_active(key)
+    if stream is not None:
+        summary_cache.coalesced += 1
+        text = await asyncio.wait_for(asyncio.shield(stream.wait()), call_timeout)
+        if stream.error:
+            raise RuntimeError(stream.error)
+        return text
+    if estimate_tokens(delta) > SUMMARY_TOKEN_BUDGET:
+        reduce = functools.partial(_rolling_reduce_messages, previous)
+        return await summary_cache.get_or_load(key, lambda: _map_reduce_summary(delta, call_timeout, reduce))
+    return await summary_cache.get_or_load(key, lambda: _request_summary(_rolling_messages(previous, delta), call_timeout))
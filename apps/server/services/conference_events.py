@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.config import (
+    CONFERENCE_EVENT_DB,
+    CONFERENCE_EVENT_QUEUE_SIZE,
+    CONFERENCE_EVENT_BATCH_SIZE,
+    CONFERENCE_EVENT_FLUSH_SECONDS,
+    CONFERENCE_STATE_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conference_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    received_at REAL NOT NULL,
+    conference_sid TEXT,
+    conference_name TEXT,
+    event TEXT,
+    call_sid TEXT,
+    participant_label TEXT,
+    sequence INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conference_events_name ON conference_events (conference_name, received_at);
+"""
+
+
+class ConferenceEventLog:
+    """Append-only SQLite log of raw status callbacks, written in batches.
+
+    WAL mode lets readers (e.g. sqlite3 on the host) query the log while batches are
+    being committed. All methods block, so callers run them off the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    def open(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps commits durable across process crashes with synchronous=NORMAL
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def write(self, events: List[dict]):
+        rows = [
+            (
+                event["received_at"],
+                event.get("ConferenceSid"),
+                _conference_name(event),
+                event.get("StatusCallbackEvent"),
+                event.get("CallSid"),
+                event.get("ParticipantLabel"),
+                _sequence(event),
+                json.dumps(event),
+            )
+            for event in events
+        ]
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO conference_events (received_at, conference_sid, conference_name, event,"
+                " call_sid, participant_label, sequence, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def _conference_name(event: dict) -> Optional[str]:
+    # Twilio sends FriendlyName; ConferenceFriendlyName is accepted for older callers
+    return event.get("FriendlyName") or event.get("ConferenceFriendlyName")
+
+
+def _sequence(event: dict) -> Optional[int]:
+    try:
+        return int(event["SequenceNumber"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _flag(value) -> bool:
+    return str(value).lower() == "true"
+
+
+class ConferenceState:
+    """Live view of one conference, built from its status callbacks"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.conference_sid: Optional[str] = None
+        self.status = "pending"
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.end_reason: Optional[str] = None
+        self.participants: Dict[str, dict] = {}
+        self.events = 0
+        self.updated_at = time.time()
+
+    def apply(self, event: dict):
+        kind = event.get("StatusCallbackEvent")
+        at = event["received_at"]
+        call_sid = event.get("CallSid")
+        self.conference_sid = event.get("ConferenceSid") or self.conference_sid
+        self.events += 1
+        self.updated_at = at
+
+        if kind == "conference-start":
+            self.status = "in-progress"
+            self.started_at = self.started_at or at
+        elif kind == "conference-end":
+            self.status = "completed"
+            self.ended_at = at
+            self.end_reason = event.get("ReasonConferenceEnded")
+            self.participants.clear()
+        elif kind == "participant-join" and call_sid:
+            self.participants[call_sid] = {
+                "call_sid": call_sid,
+                "label": event.get("ParticipantLabel"),
+                "joined_at": at,
+                "muted": _flag(event.get("Muted")),
+                "hold": _flag(event.get("Hold")),
+            }
+        elif kind == "participant-leave" and call_sid:
+            self.participants.pop(call_sid, None)
+        elif kind in ("participant-mute", "participant-unmute", "participant-hold", "participant-unhold"):
+            participant = self.participants.get(call_sid)
+            if participant is not None:
+                participant["muted"] = _flag(event.get("Muted", participant["muted"]))
+                participant["hold"] = _flag(event.get("Hold", participant["hold"]))
+
+    @property
+    def active(self) -> bool:
+        return self.status != "completed"
+
+    def snapshot(self) -> dict:
+        return {
+            "conference_name": self.name,
+            "conference_sid": self.conference_sid,
+            "status": self.status,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "end_reason": self.end_reason,
+            "participants": list(self.participants.values()),
+            "participant_count": len(self.participants),
+            "events": self.events,
+            "updated_at": self.updated_at,
+        }
+
+
+class ConferenceEventTracker:
+    """Accepts status callbacks without blocking and applies them in a background consumer.
+
+    `record()` only enqueues. The consumer takes up to `batch_size` events at a time
+    (waiting at most `flush_seconds` to fill a batch), updates the in-memory state,
+    notifies subscribers, then appends the batch to the SQLite log in a worker thread.
+    """
+
+    def __init__(self, log: Optional[ConferenceEventLog], queue_size: int = 10000, batch_size: int = 200,
+                 flush_seconds: float = 0.5, max_conferences: int = 5000):
+        self.log = log
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_conferences = max_conferences
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._conferences: "OrderedDict[str, ConferenceState]" = OrderedDict()
+        self._consumer: Optional[asyncio.Task] = None
+        self._subscribers: List[Callable[[ConferenceState, dict], Awaitable[None]]] = []
+        self.received = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    async def startup(self):
+        if self._consumer is not None:
+            return
+        if self._queue.empty():
+            # Bind the queue to the running loop (matters when the app is restarted in-process)
+            self._queue = asyncio.Queue(maxsize=self._queue.maxsize)
+        if self.log is not None:
+            await asyncio.to_thread(self.log.open)
+        self._consumer = asyncio.create_task(self._consume())
+
+    async def shutdown(self):
+        """Stop the consumer after it has applied and written everything already queued"""
+        if self._consumer is None:
+            return
+        await self._queue.put(None)
+        await self._consumer
+        self._consumer = None
+        if self.log is not None:
+            await asyncio.to_thread(self.log.close)
+
+    def record(self, event: dict) -> bool:
+        """Enqueue one callback; returns False if the queue is full and it was dropped"""
+        event["received_at"] = time.time()
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.received += 1
+        return True
+
+    def subscribe(self, callback: Callable[[ConferenceState, dict], Awaitable[None]]):
+        """`await callback(state, event)` after each event is applied, from the consumer"""
+        self._subscribers.append(callback)
+
+    async def _consume(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+
+            for event in batch:
+                state = self._apply(event)
+                if state is not None:
+                    await self._notify(state, event)
+            await self._write(batch)
+
+    def _apply(self, event: dict) -> Optional[ConferenceState]:
+        name = _conference_name(event)
+        if not name:
+            return None
+        state = self._conferences.get(name)
+        if state is None:
+            state = self._conferences[name] = ConferenceState(name)
+            self._evict()
+        self._conferences.move_to_end(name)
+        state.apply(event)
+        return state
+
+    async def _notify(self, state: ConferenceState, event: dict):
+        for callback in self._subscribers:
+            try:
+                await callback(state, event)
+            except Exception:
+                # A failing subscriber must not stop the consumer
+                logger.exception("Conference event subscriber failed")
+
+    def _evict(self):
+        # Drop the least recently updated conferences, finished ones first
+        excess = len(self._conferences) - self.max_conferences
+        if excess <= 0:
+            return
+        for name in [name for name, state in self._conferences.items() if not state.active][:excess]:
+            del self._conferences[name]
+            excess -= 1
+        while excess > 0:
+            self._conferences.popitem(last=False)
+            excess -= 1
+
+    async def _write(self, batch: List[dict]):
+        if self.log is None:
+            return
+        try:
+            await asyncio.to_thread(self.log.write, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except sqlite3.Error as e:
+            # Membership stays correct in memory; only the durable log misses this batch
+            self.write_errors += 1
+            logger.error(f"Failed to write {len(batch)} conference events: {e}")
+
+    def get(self, name: str) -> Optional[ConferenceState]:
+        return self._conferences.get(name)
+
+    def conferences(self, active_only: bool = True) -> List[ConferenceState]:
+        return [state for state in self._conferences.values() if state.active or not active_only]
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "conferences": len(self._conferences),
+        }
+
+
+conference_events = ConferenceEventTracker(
+    ConferenceEventLog(CONFERENCE_EVENT_DB) if CONFERENCE_EVENT_DB else None,
+    queue_size=CONFERENCE_EVENT_QUEUE_SIZE,
+    batch_size=CONFERENCE_EVENT_BATCH_SIZE,
+    flush_seconds=CONFERENCE_EVENT_FLUSH_SECONDS,
+    max_conferences=CONFERENCE_STATE_MAX,
+)
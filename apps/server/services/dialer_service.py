@@ -0,0 +1,121 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from core.config import BULK_DIAL_MAX_JOBS
+from services.twilio_service import twilio_service
+from utils import deadlines
+
+# Per-number states: queued -> dialing -> initiated | failed, or queued -> cancelled
+
+
+class BulkDialJob:
+    """A list of numbers dialed through the shared CPS token bucket"""
+
+    def __init__(self, phone_numbers: List[str], message: str):
+        self.job_id = f"bulk-{uuid.uuid4().hex[:12]}"
+        self.message = message
+        self.status = "queued"
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.entries = [
+            {"phone_number": number, "status": "queued", "call_sid": None, "error": None}
+            for number in phone_numbers
+        ]
+        self.task: Optional[asyncio.Task] = None
+        self._dials: List[asyncio.Task] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "cancelled")
+
+    async def run(self):
+        self.status = "running"
+        try:
+            for entry in self.entries:
+                # One token per number; the dial itself only re-acquires on retry
+                await twilio_service.rate_limiter.acquire()
+                entry["status"] = "dialing"
+                self._dials.append(asyncio.create_task(self._dial(entry)))
+            # Shielded so cancelling the job never abandons a call mid-request
+            await asyncio.gather(*(asyncio.shield(dial) for dial in self._dials))
+            self.status = "completed"
+        except asyncio.CancelledError:
+            dropped = 0
+            for entry in self.entries:
+                if entry["status"] == "queued":
+                    entry["status"] = "cancelled"
+                    dropped += 1
+            # Calls already handed to Twilio are allowed to finish
+            await asyncio.gather(*self._dials, return_exceptions=True)
+            # Every number was already dialed: the job ran to completion
+            self.status = "cancelled" if dropped else "completed"
+            raise
+        finally:
+            self.finished_at = datetime.now()
+
+    async def _dial(self, entry: dict):
+        try:
+            result = await twilio_service.make_call(entry["phone_number"], self.message, pre_acquired=True)
+            entry.update({"status": "initiated", "call_sid": result["call_sid"]})
+        except HTTPException as e:
+            entry.update({"status": "failed", "error": e.detail})
+
+    def cancel(self) -> bool:
+        if self.done or self.task is None:
+            return False
+        self.task.cancel()
+        return True
+
+    def snapshot(self) -> dict:
+        counts = {}
+        for entry in self.entries:
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": len(self.entries),
+            "counts": counts,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "calls": self.entries,
+        }
+
+
+class BulkDialer:
+    """Registry of bulk dial jobs, keeping the most recent `max_jobs`"""
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, BulkDialJob]" = OrderedDict()
+
+    async def submit(self, phone_numbers: List[str], message: str) -> BulkDialJob:
+        if twilio_service.rate_limiter is None:
+            await twilio_service.startup()
+        self._evict()
+        job = BulkDialJob(phone_numbers, message)
+        self._jobs[job.job_id] = job
+        # Runs long after the submitting request, so its deadline does not apply
+        job.task = asyncio.create_task(job.run(), context=deadlines.detached())
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkDialJob]:
+        return self._jobs.get(job_id)
+
+    def _evict(self):
+        for job_id, job in list(self._jobs.items()):
+            if len(self._jobs) < self.max_jobs:
+                break
+            if job.done:
+                del self._jobs[job_id]
+
+    async def shutdown(self):
+        for job in self._jobs.values():
+            job.cancel()
+        await asyncio.gather(*(job.task for job in self._jobs.values() if job.task), return_exceptions=True)
+
+
+bulk_dialer = BulkDialer(max_jobs=BULK_DIAL_MAX_JOBS)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from core.config import (
+    IDEMPOTENCY_STORE_BACKEND,
+    IDEMPOTENCY_STORE_URL,
+    IDEMPOTENCY_MAX_KEYS,
+    IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_LOCK_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+    SESSION_STORE_PREFIX,
+)
+from services.session_store import create_backend
+from utils import deadlines
+from utils.deadlines import DeadlineExceeded, deadline_step
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class IdempotencyStore:
+    """Runs a request once per Idempotency-Key and replays its response to retries.
+
+    The first request with a key claims it in the backend and runs. Duplicates on this
+    worker wait on that run directly; duplicates on other workers (shared backend) poll
+    the claim until the response is stored, or answer 409 after `wait_seconds`.
+    Responses below 500 are kept for `ttl_seconds`. Other 5xx responses release the
+    key so a retry runs again, but a timeout (504) is kept too: the call may have been
+    placed, so a retry must not dial again. A claim expires after `lock_seconds`, so a
+    worker that died mid-request does not hold its key forever.
+
+    The handler runs detached from the request: its client disconnecting or the
+    request deadline passing only ends the wait (with a 504), while the handler runs
+    on, bounded by `lock_seconds`, and stores its response for the retry to find.
+    """
+
+    def __init__(self, backend, prefix: str = "wct", ttl_seconds: float = 86400.0, lock_seconds: float = 120.0,
+                 wait_seconds: float = 30.0, poll_interval: float = 0.05):
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        # Runs owned by this worker: store key -> (request fingerprint, task)
+        self._running: Dict[str, Tuple[str, asyncio.Task]] = {}
+        self.executed = 0
+        self.joined = 0
+        self.replayed = 0
+        self.conflicts = 0
+
+    def _key(self, scope: str, key: str) -> str:
+        return f"{self.prefix}:idempotency:{scope}:{key}"
+
+    async def run(self, key: Optional[str], scope: str, payload: Any, handler: Callable[[], Awaitable[Any]]):
+        """`handler()`'s response, run at most once per (`scope`, `key`); without a key it just runs"""
+        if not key:
+            return await handler()
+        if len(key) > 255:
+            raise HTTPException(status_code=400, detail="Idempotency-Key must be at most 255 characters")
+
+        store_key = self._key(scope, key)
+        fingerprint = hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True).encode()).hexdigest()
+        give_up_at = time.monotonic() + self.wait_seconds
+        while True:
+            running = self._running.get(store_key)
+            if running is not None:
+                self._check(running[0], fingerprint)
+                self.joined += 1
+                return self._respond(await asyncio.shield(running[1]), replayed=True)
+
+            raw = await self.backend.get(store_key)
+            if raw is not None:
+                record = json.loads(raw)
+                self._check(record["fingerprint"], fingerprint)
+                if record["state"] == "done":
+                    self.replayed += 1
+                    return self._respond(record, replayed=True)
+                # Claimed by another worker
+                if time.monotonic() >= give_up_at:
+                    raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress")
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            claim = json.dumps({"state": "running", "fingerprint": fingerprint})
+            if await self.backend.add(store_key, claim, self.lock_seconds):
+                break
+
+        self.executed += 1
+        task = asyncio.create_task(self._execute(store_key, fingerprint, handler), context=deadlines.detached())
+        self._running[store_key] = (fingerprint, task)
+        task.add_done_callback(lambda _: self._running.pop(store_key, None))
+        # Shielded: a disconnect or the request deadline ends only this wait, not the call being placed
+        async with deadline_step("idempotent_request"):
+            record = await asyncio.shield(task)
+        return self._respond(record, replayed=False)
+
+    def _check(self, stored: str, fingerprint: str):
+        if stored != fingerprint:
+            self.conflicts += 1
+            logger.warning("Idempotency-Key reused with a different request body")
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+
+    async def _execute(self, store_key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]) -> dict:
+        # A deadline of its own: the run must not outlive its claim
+        deadlines.start(self.lock_seconds)
+        keep = False
+        try:
+            try:
+                record = {"status": 200, "body": jsonable_encoder(await handler())}
+            except HTTPException as e:
+                record = {"status": e.status_code, "body": {"detail": e.detail}}
+            except DeadlineExceeded as e:
+                record = {"status": 504, "body": {"detail": str(e), "step": e.step}}
+            except asyncio.CancelledError:
+                # Shutdown mid-call: the outcome is unknown, so the claim stays until it expires
+                keep = True
+                raise
+            record.update(state="done", fingerprint=fingerprint)
+            # 504: the upstream outcome is unknown, so a retry must not run again
+            if record["status"] < 500 or record["status"] == 504:
+                await self.backend.set(store_key, json.dumps(record), self.ttl_seconds)
+                keep = True
+            return record
+        finally:
+            if not keep:
+                # Other 5xx or an unexpected error: nothing was placed, so a retry runs again
+                await self.backend.delete(store_key)
+
+    def _respond(self, record: dict, replayed: bool):
+        if record["status"] == 200 and not replayed:
+            return record["body"]
+        headers = {REPLAYED_HEADER: "true"} if replayed else None
+        return JSONResponse(status_code=record["status"], content=record["body"], headers=headers)
+
+    async def close(self):
+        running = [task for _, task in self._running.values()]
+        for task in running:
+            task.cancel()
+        # Cancelled runs keep their claims, which expire after lock_seconds
+        await asyncio.gather(*running, return_exceptions=True)
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self._running),
+            "executed": self.executed,
+            "joined": self.joined,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+        }
+
+
+idempotency = IdempotencyStore(
+    create_backend(IDEMPOTENCY_STORE_BACKEND, IDEMPOTENCY_STORE_URL, max_keys=IDEMPOTENCY_MAX_KEYS),
+    prefix=SESSION_STORE_PREFIX,
+    ttl_seconds=IDEMPOTENCY_TTL_SECONDS,
+    lock_seconds=IDEMPOTENCY_LOCK_SECONDS,
+    wait_seconds=IDEMPOTENCY_WAIT_SECONDS,
+)
@@ -1,27 +1,160 @@
-from livekit import api
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
 from fastapi import HTTPException
-from core.config import LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET
-from schemas.requests import HoldCallerRequest
+from core.config import (
+    LIVEKIT_URL,
+    LIVEKIT_API_KEY,
+    LIVEKIT_API_SECRET,
+    LIVEKIT_MAX_CONNECTIONS,
+    LIVEKIT_KEEPALIVE_SECONDS,
+    LIVEKIT_TIMEOUT_SECONDS,
+    LIVEKIT_BATCH_CONCURRENCY,
+    LIVEKIT_CONSULTATION_EMPTY_TIMEOUT,
+    LIVEKIT_PARTICIPANT_CACHE_SECONDS,
+    LIVEKIT_PARTICIPANT_CACHE_ROOMS,
+    LIVEKIT_AGENT_IDENTITY_PREFIX,
+)
+from schemas.requests import HoldCallerRequest, ParticipantOperation
+from services.room_index import room_index
+from utils.deadlines import DeadlineExceeded, deadline_step
+from utils.metrics import track_upstream
+
+# The LiveKit SDK and aiohttp are imported on first use, so roles without LiveKit never load them
+if TYPE_CHECKING:
+    import aiohttp
+    from livekit import api
+
+logger = logging.getLogger(__name__)
+
+# Shared server-API client and connection pool, owned by the app lifespan
+_session: Optional["aiohttp.ClientSession"] = None
+_lkapi: Optional["api.LiveKitAPI"] = None
+
+
+async def startup():
+    """Create the shared LiveKit server-API client"""
+    global _session, _lkapi
+    if _lkapi is not None:
+        return
+
+    import aiohttp
+    from livekit import api
+
+    _session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=LIVEKIT_MAX_CONNECTIONS,
+            keepalive_timeout=LIVEKIT_KEEPALIVE_SECONDS,
+        ),
+        timeout=aiohttp.ClientTimeout(total=LIVEKIT_TIMEOUT_SECONDS),
+    )
+    _lkapi = api.LiveKitAPI(
+        url=LIVEKIT_URL,
+        api_key=LIVEKIT_API_KEY,
+        api_secret=LIVEKIT_API_SECRET,
+        session=_session
+    )
+
+
+async def shutdown():
+    """Close the shared LiveKit client and its connection pool"""
+    global _session, _lkapi
+    if _lkapi is not None:
+        await _lkapi.aclose()
+    if _session is not None:
+        await _session.close()
+    _session = None
+    _lkapi = None
+
+
+async def get_livekit_api() -> "api.LiveKitAPI":
+    """Shared LiveKit client; usable as a FastAPI dependency"""
+    if _lkapi is None:
+        await startup()
+    return _lkapi
+
+
+class ParticipantCache:
+    """Participants and their published tracks per room, reused for `ttl_seconds`.
+
+    Holding or resuming needs the caller's track sids and everyone else's; one
+    list_participants per room serves every toggle until the entry expires or an
+    operation finds the listing stale. Concurrent loads of one room share a request.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_rooms: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_rooms = max_rooms
+        self._rooms: "OrderedDict[str, Tuple[float, Dict[str, api.ParticipantInfo]]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, room: str, lkapi: "api.LiveKitAPI") -> Dict[str, "api.ParticipantInfo"]:
+        entry = self._rooms.get(room)
+        if entry is not None and entry[0] > time.monotonic():
+            self._rooms.move_to_end(room)
+            self.hits += 1
+            return entry[1]
+        task = self._loading.get(room)
+        if task is None:
+            self.misses += 1
+            task = self._loading[room] = asyncio.create_task(self._load(room, lkapi))
+            task.add_done_callback(lambda done: self._loaded(room, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, room: str, lkapi: "api.LiveKitAPI") -> Dict[str, "api.ParticipantInfo"]:
+        from livekit import api
 
-async def move_participant_between_rooms(consultation_room: str, agent_identity: str, destination_room: str):
+        async with track_upstream("livekit_list_participants"):
+            response = await lkapi.room.list_participants(api.ListParticipantsRequest(room=room))
+        participants = {participant.identity: participant for participant in response.participants}
+        self._rooms[room] = (time.monotonic() + self.ttl_seconds, participants)
+        self._rooms.move_to_end(room)
+        while len(self._rooms) > self.max_rooms:
+            self._rooms.popitem(last=False)
+        return participants
+
+    def _loaded(self, room: str, task: asyncio.Task):
+        self._loading.pop(room, None)
+        if not task.cancelled():
+            # Retrieved here too, in case every waiter gave up first
+            task.exception()
+
+    def invalidate(self, room: str):
+        self._rooms.pop(room, None)
+
+    def stats(self) -> dict:
+        return {"rooms": len(self._rooms), "loading": len(self._loading), "hits": self.hits, "misses": self.misses}
+
+
+participant_cache = ParticipantCache(
+    ttl_seconds=LIVEKIT_PARTICIPANT_CACHE_SECONDS,
+    max_rooms=LIVEKIT_PARTICIPANT_CACHE_ROOMS,
+)
+
+
+async def move_participant_between_rooms(consultation_room: str, agent_identity: str, destination_room: str,
+                                         lkapi: Optional["api.LiveKitAPI"] = None):
     """Move participant from consultation room to destination room"""
     try:
-        # Initialize LiveKit API client
-        lkapi = api.LiveKitAPI(
-            url=LIVEKIT_URL,
-            api_key=LIVEKIT_API_KEY,
-            api_secret=LIVEKIT_API_SECRET
-        )
-        
+        from livekit import api
+
+        lkapi = lkapi or await get_livekit_api()
+
         # Note: LiveKit move_participant is only available in Cloud/Private Cloud
         # For open-source, this is handled client-side by reconnecting
-        await lkapi.room.move_participant(
-            api.MoveParticipantRequest(
-                room=consultation_room,
-                identity=agent_identity,
-                destination_room=destination_room
+        async with deadline_step("livekit_move_participant"), track_upstream("livekit_move_participant"):
+            await lkapi.room.move_participant(
+                api.MoveParticipantRequest(
+                    room=consultation_room,
+                    identity=agent_identity,
+                    destination_room=destination_room
+                )
             )
-        )
         
         return {
             "moved": True,
@@ -30,27 +163,205 @@ async def move_participant_between_rooms(consultation_room: str, agent_identity:
             "participant": agent_identity,
             "method": "client_side_reconnection"
         }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Move failed: {str(e)}")
 
-async def hold_caller_service(request: HoldCallerRequest):
-    """Put caller on hold or resume them"""
+async def remove_participant_from_room(room: str, identity: str, lkapi: Optional["api.LiveKitAPI"] = None):
+    """Disconnect a participant from a room"""
     try:
-        print(f"Hold request: {request.caller_identity} in {request.room}, hold={request.hold}")
-        
-        # LiveKit logic for hold/unhold would go here
-        # This might involve muting audio or updating room metadata
-        # For now, we'll return success as the actual hold logic 
-        # depends on your specific implementation requirements
-        
+        from livekit import api
+
+        lkapi = lkapi or await get_livekit_api()
+        async with deadline_step("livekit_remove_participant"):
+            await lkapi.room.remove_participant(
+                api.RoomParticipantIdentity(room=room, identity=identity)
+            )
+        return {
+            "removed": True,
+            "room": room,
+            "participant": identity
+        }
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Remove failed: {str(e)}")
+
+async def batch_participant_operations(operations: List[ParticipantOperation],
+                                       lkapi: Optional["api.LiveKitAPI"] = None,
+                                       max_concurrency: Optional[int] = None):
+    """Run move/remove operations concurrently with bounded fan-out, one result per operation"""
+    lkapi = lkapi or await get_livekit_api()
+    slots = asyncio.Semaphore(max_concurrency or LIVEKIT_BATCH_CONCURRENCY)
+
+    async def run(operation: ParticipantOperation):
+        result = {
+            "action": operation.action,
+            "room": operation.room,
+            "identity": operation.identity,
+        }
+        async with slots:
+            try:
+                if operation.action == "move":
+                    if not operation.destination_room:
+                        raise HTTPException(status_code=400, detail="destination_room is required for move")
+                    details = await move_participant_between_rooms(
+                        operation.room, operation.identity, operation.destination_room, lkapi=lkapi
+                    )
+                else:
+                    details = await remove_participant_from_room(operation.room, operation.identity, lkapi=lkapi)
+                result.update({"status": "success", "details": details})
+            except HTTPException as e:
+                result.update({"status": "error", "error": e.detail})
+        return result
+
+    return await asyncio.gather(*(run(operation) for operation in operations))
+
+async def create_consultation_room(name: str, lkapi: Optional["api.LiveKitAPI"] = None):
+    """Create a room ahead of the first join, so Agent B does not wait for room setup"""
+    try:
+        from livekit import api
+
+        lkapi = lkapi or await get_livekit_api()
+        async with deadline_step("livekit_create_room"), track_upstream("livekit_create_room"):
+            room = await lkapi.room.create_room(
+                api.CreateRoomRequest(name=name, empty_timeout=LIVEKIT_CONSULTATION_EMPTY_TIMEOUT)
+            )
+        return {
+            "room": room.name,
+            "sid": room.sid
+        }
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Create room failed: {str(e)}")
+
+def _is_holdable(participant) -> bool:
+    """Callers (web or SIP), not agents, recorders or ingress"""
+    from livekit import api
+
+    kinds = (api.ParticipantInfo.Kind.STANDARD, api.ParticipantInfo.Kind.SIP)
+    return participant.kind in kinds and not participant.identity.startswith(LIVEKIT_AGENT_IDENTITY_PREFIX)
+
+
+async def _set_hold(lkapi: "api.LiveKitAPI", room: str, participant, others, hold: bool) -> dict:
+    """Mute `participant`'s published tracks and unsubscribe it from everyone else's, or undo both.
+
+    Every request runs concurrently. Unmuting needs the LiveKit server's
+    `enable_remote_unmute`; without it resume restores subscriptions only.
+    """
+    from livekit import api
+
+    async def mute(track):
+        async with track_upstream("livekit_mute_track"):
+            response = await lkapi.room.mute_published_track(api.MuteRoomTrackRequest(
+                room=room, identity=participant.identity, track_sid=track.sid, muted=hold
+            ))
+        # Keeps the cached listing current for the next toggle
+        track.muted = response.track.muted
+
+    async def subscriptions(track_sids):
+        async with track_upstream("livekit_update_subscriptions"):
+            await lkapi.room.update_subscriptions(api.UpdateSubscriptionsRequest(
+                room=room, identity=participant.identity, track_sids=track_sids, subscribe=not hold
+            ))
+
+    tracks = [track for track in participant.tracks if track.type != api.TrackType.DATA]
+    track_sids = [track.sid for other in others for track in other.tracks if track.type != api.TrackType.DATA]
+    calls = [mute(track) for track in tracks]
+    if track_sids:
+        calls.append(subscriptions(track_sids))
+    await asyncio.gather(*calls)
+    return {"tracks_muted": len(tracks) if hold else 0, "tracks_unmuted": 0 if hold else len(tracks),
+            "subscriptions_updated": len(track_sids)}
+
+
+async def _hold_participant(lkapi: "api.LiveKitAPI", room: str, identity: str, hold: bool) -> dict:
+    """Hold or resume one participant, re-listing the room once if the cached listing is stale"""
+    from livekit.api import TwirpError
+
+    for refreshed in (False, True):
+        participants = await participant_cache.get(room, lkapi)
+        participant = participants.get(identity)
+        if participant is None:
+            if refreshed:
+                raise HTTPException(status_code=404, detail=f"{identity} is not in room {room}")
+        else:
+            others = [other for other in participants.values() if other.identity != identity]
+            try:
+                return await _set_hold(lkapi, room, participant, others, hold)
+            except TwirpError as e:
+                if refreshed or e.code != "not_found":
+                    raise
+        # Someone joined, left or republished since the room was listed
+        participant_cache.invalidate(room)
+
+
+async def hold_caller_service(request: HoldCallerRequest, lkapi: Optional["api.LiveKitAPI"] = None):
+    """Put caller on hold or resume them: mute their tracks and stop what they hear, or undo it"""
+    try:
+        logger.info("Hold request", extra={"caller_identity": request.caller_identity, "room": request.room, "hold": request.hold})
+
+        # The per-worker room index may lag or miss webhooks: when it disagrees with the cached
+        # listing, re-list from LiveKit rather than trusting either
+        if room_index.has_participant(request.room, request.caller_identity) is False:
+            participant_cache.invalidate(request.room)
+
+        lkapi = lkapi or await get_livekit_api()
+        async with deadline_step("livekit_hold"):
+            details = await _hold_participant(lkapi, request.room, request.caller_identity, request.hold)
+
         return {
             "status": "success",
             "caller_identity": request.caller_identity,
             "room": request.room,
             "on_hold": request.hold,
-            "message": f"Caller {'placed on hold' if request.hold else 'resumed'}"
+            "message": f"Caller {'placed on hold' if request.hold else 'resumed'}",
+            "details": details
         }
-        
+
+    except (DeadlineExceeded, HTTPException):
+        raise
     except Exception as e:
-        print(f"Hold caller error: {e}")
+        logger.exception("Hold caller failed")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def hold_rooms(rooms: List[str], hold: bool, lkapi: Optional["api.LiveKitAPI"] = None,
+                     max_concurrency: Optional[int] = None):
+    """Hold or resume every non-agent participant in `rooms` with bounded fan-out, one result per participant"""
+    lkapi = lkapi or await get_livekit_api()
+    slots = asyncio.Semaphore(max_concurrency or LIVEKIT_BATCH_CONCURRENCY)
+
+    async def listing(room: str):
+        async with slots:
+            try:
+                return await participant_cache.get(room, lkapi)
+            except Exception as e:
+                return e
+
+    async def run(room: str, identity: str):
+        result = {"room": room, "identity": identity}
+        async with slots:
+            try:
+                details = await _hold_participant(lkapi, room, identity, hold)
+                result.update({"status": "success", "details": details})
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                result.update({"status": "error", "error": e.detail if isinstance(e, HTTPException) else str(e)})
+        return result
+
+    results, targets = [], []
+    # Rooms the webhook index saw end are re-listed from LiveKit instead of served from the cache
+    for room in rooms:
+        if room_index.is_finished(room):
+            participant_cache.invalidate(room)
+    for room, participants in zip(rooms, await asyncio.gather(*(listing(room) for room in rooms))):
+        if isinstance(participants, Exception):
+            results.append({"room": room, "identity": None, "status": "error", "error": str(participants)})
+        else:
+            targets.extend((room, identity) for identity, p in participants.items() if _is_holdable(p))
+    results.extend(await asyncio.gather(*(run(room, identity) for room, identity in targets)))
+    return results
@@ -0,0 +1,354 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import (
+    GROQ_API_KEY,
+    GROQ_BASE_URL,
+    GROQ_MAX_CONNECTIONS,
+    GROQ_KEEPALIVE_SECONDS,
+    GROQ_CONNECT_TIMEOUT_SECONDS,
+    GROQ_TIMEOUT_SECONDS,
+    GROQ_MAX_RETRIES,
+    LLM_BACKENDS,
+    LLM_OPENAI_API_KEY,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_DELAY_SECONDS,
+    LLM_LATENCY_WINDOW,
+    LLM_MIN_SAMPLES,
+    LLM_FAILURE_THRESHOLD,
+    LLM_DEGRADED_ERROR_RATE,
+    LLM_DEGRADED_SECONDS,
+)
+from utils.metrics import track_upstream
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest outcome in the moving error rate
+ERROR_RATE_ALPHA = 0.1
+# Never hedge sooner than this, so a fast primary is not doubled up on every request
+MIN_HEDGE_DELAY_SECONDS = 0.05
+
+
+class BackendHealth:
+    """Recent latencies, a moving error rate and the cooldown state of one backend.
+
+    Latencies are kept per kind: "complete" (whole completion) and "first_token"
+    (streamed), since hedging a stream only waits for its first token.
+    """
+
+    def __init__(self, window: int = 200):
+        self.latencies: Dict[str, deque] = {"complete": deque(maxlen=window), "first_token": deque(maxlen=window)}
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.degraded_until = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedged = 0
+        self.wins = 0
+
+    def percentile(self, kind: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        samples = self.latencies[kind]
+        if len(samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def success(self, kind: str, seconds: float):
+        self.latencies[kind].append(seconds)
+        self.error_rate *= 1 - ERROR_RATE_ALPHA
+        self.consecutive_failures = 0
+
+    def failure(self, failure_threshold: int, degraded_error_rate: float, cooldown: float):
+        self.errors += 1
+        self.error_rate = self.error_rate * (1 - ERROR_RATE_ALPHA) + ERROR_RATE_ALPHA
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= failure_threshold or self.error_rate >= degraded_error_rate:
+            self.degraded_until = time.monotonic() + cooldown
+
+    @property
+    def degraded(self) -> bool:
+        return time.monotonic() < self.degraded_until
+
+
+class LLMBackend:
+    """One model on one OpenAI-compatible endpoint (Groq's SDK for "groq", OpenAI's for "openai")"""
+
+    def __init__(self, spec: str, window: int = 200):
+        kind, _, rest = spec.strip().partition(":")
+        model, _, base_url = rest.partition("@")
+        if kind not in ("groq", "openai") or not model:
+            raise ValueError(f"Invalid LLM backend '{spec}' (expected groq:<model> or openai:<model>@<url>)")
+        if kind == "openai" and not base_url:
+            raise ValueError(f"LLM backend '{spec}' needs a base URL (openai:<model>@<url>)")
+        self.name = spec.strip()
+        self.kind = kind
+        self.model = model
+        self.base_url = base_url or None
+        self.health = BackendHealth(window)
+        self.client: Any = None
+
+    async def open(self):
+        if self.client is not None:
+            return
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=GROQ_MAX_CONNECTIONS,
+            keepalive_expiry=GROQ_KEEPALIVE_SECONDS,
+        )
+        timeout = httpx.Timeout(GROQ_TIMEOUT_SECONDS, connect=GROQ_CONNECT_TIMEOUT_SECONDS)
+        if self.kind == "groq":
+            from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+            self.client = AsyncGroq(
+                api_key=GROQ_API_KEY,
+                base_url=self.base_url or GROQ_BASE_URL or None,
+                timeout=timeout,
+                max_retries=GROQ_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(limits=limits),
+            )
+        else:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            self.client = AsyncOpenAI(
+                api_key=LLM_OPENAI_API_KEY,
+                base_url=self.base_url,
+                timeout=timeout,
+                max_retries=GROQ_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(limits=limits),
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def complete(self, messages: list, max_tokens: int, timeout: float) -> str:
+        completion = await self.client.chat.completions.create(
+            messages=messages,
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=0.1,
+            timeout=timeout
+        )
+        return completion.choices[0].message.content
+
+    async def stream(self, messages: list, max_tokens: int, timeout: float) -> AsyncIterator[str]:
+        completion = await self.client.chat.completions.create(
+            messages=messages,
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=0.1,
+            stream=True,
+            timeout=timeout
+        )
+        try:
+            async for chunk in completion:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    yield token
+        finally:
+            await completion.close()
+
+
+class LLMRouter:
+    """Sends each summary request to an ordered list of backends with hedging and failover.
+
+    The first usable backend gets the request. If it has not answered within its tracked
+    latency percentile (or fails), the next backend is sent the same request and the
+    first answer wins; the rest are cancelled. Every attempt shares the caller's
+    deadline. Backends that keep failing are moved to the end of the order for a
+    cooldown, as are backends whose median latency would not fit the deadline.
+    """
+
+    def __init__(self, backends: List[LLMBackend], hedge_percentile: float = 95.0, hedge_delay: float = 1.0,
+                 min_samples: int = 20, failure_threshold: int = 3, degraded_error_rate: float = 0.5,
+                 cooldown: float = 30.0):
+        if not backends:
+            raise ValueError("At least one LLM backend is required")
+        self.backends = backends
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.degraded_error_rate = degraded_error_rate
+        self.cooldown = cooldown
+
+    async def startup(self):
+        for backend in self.backends:
+            await backend.open()
+
+    async def shutdown(self):
+        for backend in self.backends:
+            await backend.close()
+
+    def candidates(self, kind: str, timeout: float) -> List[LLMBackend]:
+        """Backends in configured order, except that ones too slow for the deadline, then degraded ones, go last"""
+        def rank(backend: LLMBackend) -> int:
+            if backend.health.degraded:
+                return 2
+            median = backend.health.percentile(kind, 50, self.min_samples)
+            return 1 if median is not None and median > timeout else 0
+
+        return sorted(self.backends, key=rank)
+
+    def _hedge_after(self, backend: LLMBackend, kind: str) -> float:
+        tracked = backend.health.percentile(kind, self.hedge_percentile, self.min_samples)
+        return max(MIN_HEDGE_DELAY_SECONDS, tracked if tracked is not None else self.hedge_delay)
+
+    async def complete(self, messages: list, timeout: float, max_tokens: int = 100) -> str:
+        """Text of the first backend to answer within `timeout`"""
+        async def attempt(backend: LLMBackend, remaining: float) -> str:
+            return await backend.complete(messages, max_tokens, remaining)
+
+        text, _ = await self._race("complete", attempt, timeout)
+        return text
+
+    async def stream(self, messages: list, timeout: float, max_tokens: int = 100) -> AsyncIterator[str]:
+        """Tokens from the first backend to produce one; only the wait for that first token is hedged"""
+        async def attempt(backend: LLMBackend, remaining: float) -> Tuple[str, AsyncIterator[str]]:
+            tokens = backend.stream(messages, max_tokens, remaining)
+            try:
+                first = await tokens.__anext__()
+            except BaseException:
+                await tokens.aclose()
+                raise
+            return first, tokens
+
+        async def discard(result: Tuple[str, AsyncIterator[str]]):
+            await result[1].aclose()
+
+        (first, tokens), backend = await self._race("first_token", attempt, timeout, discard)
+        try:
+            yield first
+            async for token in tokens:
+                yield token
+        except Exception:
+            self._failed(backend)
+            raise
+        finally:
+            await tokens.aclose()
+
+    async def _race(self, kind: str, attempt: Callable[[LLMBackend, float], Awaitable[Any]], timeout: float,
+                    discard: Optional[Callable[[Any], Awaitable[None]]] = None) -> Tuple[Any, LLMBackend]:
+        deadline = time.monotonic() + timeout
+        candidates = self.candidates(kind, timeout)
+        pending: Dict[asyncio.Task, LLMBackend] = {}
+        last_error: Optional[BaseException] = None
+        winner = None
+
+        def launch(backend: LLMBackend):
+            backend.health.requests += 1
+            task = asyncio.create_task(self._timed(backend, kind, attempt, deadline))
+            pending[task] = backend
+            return time.monotonic() + self._hedge_after(backend, kind)
+
+        hedge_at = launch(candidates.pop(0))
+        try:
+            while pending and winner is None:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise asyncio.TimeoutError(f"No LLM backend answered within {timeout:.2f}s")
+                wait = deadline - now
+                if candidates:
+                    wait = min(wait, max(hedge_at - now, 0))
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                    elif winner is None:
+                        winner = (task.result(), backend)
+                        backend.health.wins += 1
+                    elif discard is not None:
+                        await discard(task.result())
+
+                if winner is None and not pending and candidates:
+                    # Everything in flight failed; fail over, even to a degraded backend
+                    hedge_at = launch(candidates.pop(0))
+                elif winner is None and candidates and time.monotonic() >= hedge_at:
+                    # Hedge the slow request, but never onto a backend in cooldown
+                    candidates = [backend for backend in candidates if not backend.health.degraded]
+                    if candidates:
+                        backend = candidates.pop(0)
+                        backend.health.hedged += 1
+                        hedge_at = launch(backend)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                if discard is not None:
+                    for result in results:
+                        if not isinstance(result, BaseException):
+                            await discard(result)
+
+        if winner is None:
+            raise last_error or asyncio.TimeoutError(f"No LLM backend answered within {timeout:.2f}s")
+        return winner
+
+    async def _timed(self, backend: LLMBackend, kind: str, attempt: Callable[[LLMBackend, float], Awaitable[Any]],
+                     deadline: float):
+        started = time.monotonic()
+        try:
+            async with track_upstream(f"llm:{backend.name}"):
+                result = await attempt(backend, deadline - started)
+        except asyncio.CancelledError:
+            # Lost a hedge race; its latency is unknown, not an error
+            raise
+        except Exception as e:
+            self._failed(backend)
+            logger.warning("LLM backend failed", extra={"backend": backend.name, "error": str(e) or type(e).__name__})
+            raise
+        backend.health.success(kind, time.monotonic() - started)
+        return result
+
+    def _failed(self, backend: LLMBackend):
+        was_degraded = backend.health.degraded
+        backend.health.failure(self.failure_threshold, self.degraded_error_rate, self.cooldown)
+        if backend.health.degraded and not was_degraded:
+            logger.warning("LLM backend degraded", extra={
+                "backend": backend.name, "cooldown_seconds": self.cooldown,
+                "error_rate": round(backend.health.error_rate, 3),
+            })
+
+    def stats(self) -> List[dict]:
+        result = []
+        for backend in self.backends:
+            health = backend.health
+            entry = {
+                "backend": backend.name,
+                "degraded": health.degraded,
+                "requests": health.requests,
+                "wins": health.wins,
+                "hedged": health.hedged,
+                "errors": health.errors,
+                "error_rate": round(health.error_rate, 4),
+                "consecutive_failures": health.consecutive_failures,
+            }
+            for kind in health.latencies:
+                for pct in (50, 95, 99):
+                    value = health.percentile(kind, pct)
+                    entry[f"{kind}_p{pct}_ms"] = round(value * 1000, 2) if value is not None else None
+            result.append(entry)
+        return result
+
+
+def parse_backends(spec: str, window: int = LLM_LATENCY_WINDOW) -> List[LLMBackend]:
+    return [LLMBackend(item, window) for item in spec.split(",") if item.strip()]
+
+
+llm_router = LLMRouter(
+    parse_backends(LLM_BACKENDS),
+    hedge_percentile=LLM_HEDGE_PERCENTILE,
+    hedge_delay=LLM_HEDGE_DELAY_SECONDS,
+    min_samples=LLM_MIN_SAMPLES,
+    failure_threshold=LLM_FAILURE_THRESHOLD,
+    degraded_error_rate=LLM_DEGRADED_ERROR_RATE,
+    cooldown=LLM_DEGRADED_SECONDS,
+)
@@ -0,0 +1,212 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from core.config import ROOM_INDEX_MAX_ROOMS, ROOM_INDEX_IDLE_SECONDS
+
+# Webhook events that change membership or published tracks
+PARTICIPANT_EVENTS = ("participant_joined", "participant_left", "participant_connection_aborted")
+TRACK_EVENTS = ("track_published", "track_unpublished")
+
+
+def _enum_name(enum, value: int) -> str:
+    try:
+        return enum.Name(value).lower()
+    except ValueError:
+        return str(value)
+
+
+def _track(info) -> dict:
+    from livekit import api
+
+    return {
+        "sid": info.sid,
+        "type": _enum_name(api.TrackType, info.type),
+        "source": _enum_name(api.TrackSource, info.source),
+        "muted": info.muted,
+    }
+
+
+class RoomState:
+    """Live view of one LiveKit room, built from its webhooks"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sid: Optional[str] = None
+        self.status = "active"
+        self.metadata = ""
+        self.created_at: Optional[int] = None
+        self.finished_at: Optional[float] = None
+        self.participants: Dict[str, dict] = {}
+        # Sids that already left, so a join delivered late does not bring them back
+        self.departed: Set[str] = set()
+        self.events = 0
+        self.updated_at = time.time()
+
+    def apply(self, event, at: float):
+        kind = event.event
+        self.events += 1
+        self.updated_at = at
+        if not self.active and kind != "room_started":
+            if not event.room.sid or event.room.sid == self.sid:
+                # Delivered after room_finished
+                return
+            # The name was reused by a new room whose room_started has not arrived
+            self.status = "active"
+            self.finished_at = None
+        if event.HasField("room"):
+            self.sid = event.room.sid or self.sid
+            self.metadata = event.room.metadata or self.metadata
+            self.created_at = event.room.creation_time or self.created_at
+
+        if kind == "room_started":
+            self.status = "active"
+            self.finished_at = None
+        elif kind == "room_finished":
+            self.status = "finished"
+            self.finished_at = at
+            self.participants.clear()
+        elif kind in PARTICIPANT_EVENTS:
+            info = event.participant
+            if kind == "participant_joined":
+                self._upsert(info)
+            else:
+                self.departed.add(info.sid)
+                current = self.participants.get(info.identity)
+                if current is not None and current["sid"] == info.sid:
+                    del self.participants[info.identity]
+        elif kind in TRACK_EVENTS:
+            participant = self._upsert(event.participant)
+            if participant is None:
+                return
+            if kind == "track_published":
+                participant["tracks"][event.track.sid] = _track(event.track)
+            else:
+                participant["tracks"].pop(event.track.sid, None)
+
+    def _upsert(self, info) -> Optional[dict]:
+        if not info.identity or info.sid in self.departed:
+            return None
+        from livekit import api
+
+        participant = self.participants.get(info.identity)
+        if participant is None or participant["sid"] != info.sid:
+            # New, or rejoined under a new sid
+            participant = self.participants[info.identity] = {
+                "identity": info.identity,
+                "sid": info.sid,
+                "tracks": {},
+            }
+        participant.update(
+            name=info.name,
+            kind=_enum_name(api.ParticipantInfo.Kind, info.kind),
+            metadata=info.metadata,
+            joined_at=info.joined_at or participant.get("joined_at"),
+        )
+        for track in info.tracks:
+            participant["tracks"][track.sid] = _track(track)
+        return participant
+
+    @property
+    def active(self) -> bool:
+        return self.status != "finished"
+
+    def snapshot(self) -> dict:
+        return {
+            "room": self.name,
+            "sid": self.sid,
+            "status": self.status,
+            "metadata": self.metadata,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "participants": [
+                {**participant, "tracks": list(participant["tracks"].values())}
+                for participant in self.participants.values()
+            ],
+            "participant_count": len(self.participants),
+            "events": self.events,
+            "updated_at": self.updated_at,
+        }
+
+
+class RoomIndex:
+    """Rooms, their participants and published tracks, kept current by LiveKit webhooks.
+
+    Lookups are dict reads. Rooms are kept in least-recently-updated order; each
+    event drops rooms with no events for `idle_seconds` from the front, and beyond
+    `max_rooms` finished rooms go first. The index only knows rooms it has had
+    events for, so callers treat an unknown room as "no information", not as empty.
+    """
+
+    def __init__(self, max_rooms: int = 5000, idle_seconds: float = 3600.0):
+        self.max_rooms = max_rooms
+        self.idle_seconds = idle_seconds
+        self._rooms: "OrderedDict[str, RoomState]" = OrderedDict()
+        self.received = 0
+        self.ignored = 0
+        self.expired = 0
+
+    def apply(self, event) -> Optional[RoomState]:
+        """Apply one verified WebhookEvent; returns the room it changed, if any"""
+        self.received += 1
+        name = event.room.name if event.HasField("room") else ""
+        if not name:
+            # Egress and ingress events without a room
+            self.ignored += 1
+            return None
+        now = time.time()
+        state = self._rooms.get(name)
+        if state is None:
+            state = self._rooms[name] = RoomState(name)
+            self._evict()
+        self._rooms.move_to_end(name)
+        state.apply(event, now)
+        self._expire(now)
+        return state
+
+    def _expire(self, now: float):
+        while self._rooms:
+            state = next(iter(self._rooms.values()))
+            if now - state.updated_at < self.idle_seconds:
+                break
+            self._rooms.popitem(last=False)
+            self.expired += 1
+
+    def _evict(self):
+        excess = len(self._rooms) - self.max_rooms
+        if excess <= 0:
+            return
+        for name in [name for name, state in self._rooms.items() if not state.active][:excess]:
+            del self._rooms[name]
+            excess -= 1
+        while excess > 0:
+            self._rooms.popitem(last=False)
+            excess -= 1
+
+    def get(self, room: str) -> Optional[RoomState]:
+        return self._rooms.get(room)
+
+    def has_participant(self, room: str, identity: str) -> Optional[bool]:
+        """Whether `identity` is in `room`, or None if the index has not seen the room"""
+        state = self._rooms.get(room)
+        if state is None:
+            return None
+        return identity in state.participants
+
+    def is_finished(self, room: str) -> bool:
+        state = self._rooms.get(room)
+        return state is not None and not state.active
+
+    def rooms(self, active_only: bool = True) -> List[RoomState]:
+        return [state for state in self._rooms.values() if state.active or not active_only]
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "ignored": self.ignored,
+            "expired": self.expired,
+            "rooms": len(self._rooms),
+        }
+
+
+room_index = RoomIndex(max_rooms=ROOM_INDEX_MAX_ROOMS, idle_seconds=ROOM_INDEX_IDLE_SECONDS)
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from core.config import (
+    SESSION_STORE_BACKEND,
+    SESSION_STORE_URL,
+    SESSION_STORE_PREFIX,
+    SESSION_STORE_MAX_KEYS,
+    TRANSFER_SESSION_TTL_SECONDS,
+)
+from models.transfer_session import TransferSession
+
+logger = logging.getLogger(__name__)
+
+# SET KEYS[1] to ARGV[2] (TTL ARGV[3] ms) only while it still holds ARGV[1]
+COMPARE_AND_SET_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    return 1
+end
+return 0
+"""
+# Conflicting writers an update retries past before giving up
+UPDATE_ATTEMPTS = 20
+# Seconds before the one retry of a failed summary write
+ATTACH_RETRY_SECONDS = 1.0
+
+
+class MemoryBackend:
+    """Process-local key/value store with per-key TTL, for single-worker deployments"""
+
+    shared = False
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        """Set `key` only if it is absent or expired; True if it was set"""
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def compare_and_set(self, key: str, expected: str, value: str, ttl: float) -> bool:
+        """Set `key` to `value` only if it still holds `expected`; True if it was set"""
+        if await self.get(key) != expected:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def take(self, key: str) -> Optional[str]:
+        value = await self.get(key)
+        self._data.pop(key, None)
+        return value
+
+    async def close(self):
+        self._data.clear()
+
+
+class RedisBackend:
+    """Key/value store on any Redis-protocol server, shared by every worker and replica"""
+
+    shared = True
+
+    def __init__(self, url: str):
+        # Imported lazily so single-worker deployments do not need the redis package
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._compare_and_set = self._redis.register_script(COMPARE_AND_SET_SCRIPT)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: str, ttl: float):
+        await self._redis.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        return bool(await self._redis.set(key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    async def compare_and_set(self, key: str, expected: str, value: str, ttl: float) -> bool:
+        # One script, so no other worker can write between the comparison and the set
+        return bool(await self._compare_and_set(keys=[key], args=[expected, value, max(1, int(ttl * 1000))]))
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+    async def take(self, key: str) -> Optional[str]:
+        return await self._redis.getdel(key)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_backend(kind: str = SESSION_STORE_BACKEND, url: Optional[str] = SESSION_STORE_URL,
+                   max_keys: int = SESSION_STORE_MAX_KEYS):
+    if kind == "memory":
+        return MemoryBackend(max_keys=max_keys)
+    if kind == "redis":
+        if not url:
+            raise ValueError("SESSION_STORE_URL is required for the redis session store")
+        return RedisBackend(url)
+    raise ValueError(f"Unknown SESSION_STORE_BACKEND: {kind}")
+
+
+class TransferSessionStore:
+    """TransferSession persistence with lookups by id, room/conference name and summary id"""
+
+    def __init__(self, backend, prefix: str = "wct", ttl_seconds: float = 14400.0):
+        self.backend = backend
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        # Striped locks keep read-modify-write updates ordered without a lock per session
+        self._locks = [asyncio.Lock() for _ in range(64)]
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}:{kind}:{name}"
+
+    async def save(self, session: TransferSession) -> TransferSession:
+        session.updated_at = time.time()
+        await self.backend.set(self._key("session", session.session_id), session.model_dump_json(), self.ttl_seconds)
+        return await self._index(session)
+
+    async def _index(self, session: TransferSession) -> TransferSession:
+        for room in session.rooms():
+            await self.backend.set(self._key("room", room), session.session_id, self.ttl_seconds)
+        if session.summary_id:
+            await self.backend.set(self._key("summary", session.summary_id), session.session_id, self.ttl_seconds)
+        return session
+
+    async def get(self, session_id: str) -> Optional[TransferSession]:
+        raw = await self.backend.get(self._key("session", session_id))
+        return TransferSession.model_validate_json(raw) if raw else None
+
+    async def find_by_room(self, room: str) -> Optional[TransferSession]:
+        """Latest session that uses `room` as caller room, consultation room or conference"""
+        session_id = await self.backend.get(self._key("room", room))
+        return await self.get(session_id) if session_id else None
+
+    async def find_by_summary(self, summary_id: str) -> Optional[TransferSession]:
+        session_id = await self.backend.get(self._key("summary", summary_id))
+        return await self.get(session_id) if session_id else None
+
+    async def update(self, session_id: str, **fields) -> Optional[TransferSession]:
+        """Read-modify-write one session.
+
+        Serialized per session within this worker; across workers the write is a
+        compare-and-set against the value read, re-applied to the newer session if
+        another worker wrote first, so neither update is lost.
+        """
+        participants = fields.pop("add_participants", ())
+        steps = fields.pop("set_steps", {})
+        key = self._key("session", session_id)
+        async with self._locks[hash(session_id) % len(self._locks)]:
+            for _ in range(UPDATE_ATTEMPTS):
+                raw = await self.backend.get(key)
+                if raw is None:
+                    return None
+                session = TransferSession.model_validate_json(raw)
+                for name, value in fields.items():
+                    setattr(session, name, value)
+                # Merged per step, so concurrent steps do not overwrite each other's status
+                session.steps.update(steps)
+                for identity in participants:
+                    session.add_participant(identity)
+                session.updated_at = time.time()
+                if await self.backend.compare_and_set(key, raw, session.model_dump_json(), self.ttl_seconds):
+                    return await self._index(session)
+        raise RuntimeError(f"Session {session_id} kept changing; gave up after {UPDATE_ATTEMPTS} attempts")
+
+    async def delete(self, session_id: str):
+        session = await self.get(session_id)
+        if session is None:
+            return
+        await self.backend.delete(self._key("session", session_id))
+        for room in session.rooms():
+            await self.backend.delete(self._key("room", room))
+        if session.summary_id:
+            await self.backend.delete(self._key("summary", session.summary_id))
+
+    async def close(self):
+        await self.backend.close()
+
+
+_summary_tasks = set()
+
+
+def attach_summary_when_ready(session_id: str, summary_stream):
+    """Copy a streamed summary onto the session once it finishes, without blocking the caller.
+
+    A failed write (store unreachable, or the update lost every compare-and-set) is
+    retried once, then logged; the summary stays readable from /summaries meanwhile.
+    """
+
+    async def attach():
+        summary = await summary_stream.wait()
+        for retry in (False, True):
+            try:
+                await session_store.update(session_id, summary=summary)
+                return
+            except Exception as e:
+                logger.warning("Attaching summary to session failed", extra={
+                    "session_id": session_id, "retry": retry, "error": str(e) or type(e).__name__
+                })
+            if not retry:
+                await asyncio.sleep(ATTACH_RETRY_SECONDS)
+
+    task = asyncio.create_task(attach())
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
+
+
+session_store = TransferSessionStore(
+    create_backend(),
+    prefix=SESSION_STORE_PREFIX,
+    ttl_seconds=TRANSFER_SESSION_TTL_SECONDS,
+)
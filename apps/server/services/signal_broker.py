@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from core.config import CALLER_SIGNAL_TTL_SECONDS, CALLER_SIGNAL_MAX_ROOMS, CALLER_SIGNAL_POLL_SECONDS
+from services.session_store import session_store
+
+
+class SignalBroker:
+    """Per-room, deliver-once signals with asyncio wake-ups for waiting subscribers.
+
+    Pending signals expire after `ttl_seconds`; at most `max_rooms` are kept, oldest
+    evicted first. Wake-up events only exist while someone is waiting on a room.
+
+    With a shared `store` backend, signals live in the store so any worker can deliver
+    them; waiters re-check it every `poll_interval` for signals posted elsewhere.
+    """
+
+    def __init__(self, ttl_seconds: float = 120.0, max_rooms: int = 10000, store=None,
+                 poll_interval: float = 0.5, prefix: str = "wct"):
+        self.ttl_seconds = ttl_seconds
+        self.max_rooms = max_rooms
+        self.store = store
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._signals: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._events: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+        self.published = 0
+        self.delivered = 0
+        self.expired = 0
+
+    async def publish(self, room: str, signal: dict):
+        """Store the latest signal for a room and wake anyone waiting on it"""
+        if self.store is not None:
+            await self.store.set(f"{self.prefix}:signal:{room}", json.dumps(signal), self.ttl_seconds)
+        else:
+            self._store_local(room, signal)
+        self.published += 1
+        event = self._events.get(room)
+        if event is not None:
+            event.set()
+
+    def _store_local(self, room: str, signal: dict):
+        self._sweep()
+        self._signals[room] = (time.monotonic() + self.ttl_seconds, signal)
+        self._signals.move_to_end(room)
+        while len(self._signals) > self.max_rooms:
+            self._signals.popitem(last=False)
+            self.expired += 1
+
+    async def take(self, room: str) -> Optional[dict]:
+        """Remove and return the pending signal for a room, if any"""
+        if self.store is not None:
+            raw = await self.store.take(f"{self.prefix}:signal:{room}")
+            if raw is None:
+                return None
+            self.delivered += 1
+            return json.loads(raw)
+
+        entry = self._signals.pop(room, None)
+        if entry is None:
+            return None
+        expires_at, signal = entry
+        if expires_at <= time.monotonic():
+            self.expired += 1
+            return None
+        self.delivered += 1
+        return signal
+
+    async def wait(self, room: str, timeout: float) -> Optional[dict]:
+        """Return the room's signal as soon as one is published, or None after `timeout`"""
+        if timeout <= 0:
+            return await self.take(room)
+
+        event = self._events.setdefault(room, asyncio.Event())
+        self._waiters[room] = self._waiters.get(room, 0) + 1
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                # Clear before checking so a publish during the check still wakes us
+                event.clear()
+                # Another waiter on the same room may have taken it first
+                signal = await self.take(room)
+                if signal is not None:
+                    return signal
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if self.store is not None:
+                    remaining = min(remaining, self.poll_interval)
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiters[room] -= 1
+            if not self._waiters[room]:
+                del self._waiters[room]
+                del self._events[room]
+
+    async def subscribe(self, room: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[dict]]:
+        """Yield signals for a room as they arrive; yields None every `heartbeat` seconds of quiet"""
+        while True:
+            yield await self.wait(room, heartbeat)
+
+    def _sweep(self):
+        now = time.monotonic()
+        while self._signals:
+            room, (expires_at, _) = next(iter(self._signals.items()))
+            if expires_at > now:
+                break
+            del self._signals[room]
+            self.expired += 1
+
+    def stats(self) -> dict:
+        return {
+            "pending_signals": len(self._signals),
+            "waiting_rooms": len(self._events),
+            "waiters": sum(self._waiters.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "expired": self.expired,
+        }
+
+
+caller_signals = SignalBroker(
+    ttl_seconds=CALLER_SIGNAL_TTL_SECONDS,
+    max_rooms=CALLER_SIGNAL_MAX_ROOMS,
+    store=session_store.backend if session_store.backend.shared else None,
+    poll_interval=CALLER_SIGNAL_POLL_SECONDS,
+    prefix=session_store.prefix,
+)
@@ -0,0 +1,134 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional
+
+
+class SummaryStream:
+    """Tokens of one summary as they are produced, replayable for late subscribers"""
+
+    def __init__(self, key: str):
+        self.summary_id = uuid.uuid4().hex
+        self.key = key
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self.final_text: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        # Requests that started or joined this stream and have not abandoned it
+        self.holders = 0
+        self._updated = asyncio.Event()
+
+    @property
+    def text(self) -> str:
+        if self.final_text is not None:
+            return self.final_text
+        return "".join(self.tokens)
+
+    @property
+    def status(self) -> str:
+        if not self.done:
+            return "streaming"
+        return "failed" if self.error else "complete"
+
+    def _notify(self):
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    def append(self, token: str):
+        self.tokens.append(token)
+        self._notify()
+
+    def finish(self, final_text: Optional[str] = None, error: Optional[str] = None):
+        self.final_text = final_text
+        self.error = error
+        self.done = True
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Yield every token produced so far, then new tokens until the summary finishes"""
+        index = 0
+        while True:
+            updated = self._updated
+            while index < len(self.tokens):
+                yield self.tokens[index]
+                index += 1
+            if self.done:
+                return
+            await updated.wait()
+
+    async def wait(self) -> str:
+        """Wait for the summary to finish and return its full text"""
+        while not self.done:
+            await self._updated.wait()
+        return self.text
+
+    def snapshot(self) -> dict:
+        return {
+            "summary_id": self.summary_id,
+            "status": self.status,
+            "summary": self.text,
+            "error": self.error,
+        }
+
+
+class SummaryStreamRegistry:
+    """Lookup of summary streams by id, with in-flight lookup by cache key"""
+
+    def __init__(self, max_streams: int = 1024, ttl_seconds: float = 900.0):
+        self.max_streams = max_streams
+        self.ttl_seconds = ttl_seconds
+        self._streams: "OrderedDict[str, SummaryStream]" = OrderedDict()
+        self._active: Dict[str, SummaryStream] = {}
+
+    def create(self, key: str) -> SummaryStream:
+        self._evict()
+        stream = SummaryStream(key)
+        self._streams[stream.summary_id] = stream
+        self._active[key] = stream
+        return stream
+
+    def completed(self, key: str, text: str) -> SummaryStream:
+        """Register a stream that is already finished, e.g. from a cache hit"""
+        self._evict()
+        stream = SummaryStream(key)
+        stream.append(text)
+        stream.finish()
+        self._streams[stream.summary_id] = stream
+        return stream
+
+    def release(self, stream: SummaryStream):
+        if self._active.get(stream.key) is stream:
+            del self._active[stream.key]
+
+    def abandon(self, stream: SummaryStream):
+        """A request that started or joined `stream` gave up; the last one to leave cancels it"""
+        if stream.done or stream.task is None:
+            return
+        stream.holders -= 1
+        if stream.holders <= 0:
+            stream.task.cancel()
+
+    def active_streams(self) -> List[SummaryStream]:
+        return list(self._active.values())
+
+    def in_flight(self) -> int:
+        return len(self._active)
+
+    def find_active(self, key: str) -> Optional[SummaryStream]:
+        return self._active.get(key)
+
+    def get(self, summary_id: str) -> Optional[SummaryStream]:
+        return self._streams.get(summary_id)
+
+    def _evict(self):
+        now = time.monotonic()
+        for summary_id, stream in list(self._streams.items()):
+            expired = stream.done and now - stream.finished_at > self.ttl_seconds
+            if expired or (len(self._streams) >= self.max_streams and stream.done):
+                del self._streams[summary_id]
+            elif len(self._streams) < self.max_streams:
+                break
@@ -0,0 +1,146 @@
+import datetime
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Optional, Tuple
+
+from core.config import (
+    LIVEKIT_API_KEY,
+    LIVEKIT_API_SECRET,
+    LIVEKIT_TOKEN_TTL_SECONDS,
+    TWILIO_ACCOUNT_SID,
+    TWILIO_API_KEY,
+    TWILIO_API_SECRET,
+    TWILIO_APP_SID,
+    TWILIO_TOKEN_TTL_SECONDS,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_REUSE_FRACTION,
+)
+
+# Permissions per role; anything not listed gets the "participant" set
+ROLE_PERMISSIONS = {
+    "participant": {
+        "room_join": True,
+        "room_create": False,
+        "can_publish": True,
+        "can_subscribe": True,
+        "can_publish_data": True,
+        "can_update_own_metadata": False,
+    },
+    "agent": {
+        "room_join": True,
+        "room_create": False,
+        "can_publish": True,
+        "can_subscribe": True,
+        "can_publish_data": True,
+        "can_update_own_metadata": True,
+    },
+}
+
+
+def role_permissions(role: str) -> dict:
+    return ROLE_PERMISSIONS.get(role, ROLE_PERMISSIONS["participant"])
+
+
+# SDKs are imported on first mint, so each role only loads the token types it serves
+
+@lru_cache(maxsize=4096)
+def video_grants(room: str, role: str):
+    """Grant object for a room and role, built once and shared by every token that uses it"""
+    from livekit import api
+
+    return api.VideoGrants(room=room, **role_permissions(role))
+
+
+@lru_cache(maxsize=1)
+def voice_grant():
+    """Every Twilio voice token carries the same grant"""
+    from twilio.jwt.access_token.grants import VoiceGrant
+
+    return VoiceGrant(outgoing_application_sid=TWILIO_APP_SID, incoming_allow=True)
+
+
+class TokenCache:
+    """Signed tokens reused until `reuse_fraction` of their TTL has elapsed, LRU-bounded"""
+
+    def __init__(self, max_entries: int = 10000, reuse_fraction: float = 0.5):
+        self.max_entries = max_entries
+        self.reuse_fraction = reuse_fraction
+        self._entries: "OrderedDict[Hashable, Tuple[float, float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[str, float]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        _, expires_at, token = entry
+        return token, expires_at
+
+    def put(self, key: Hashable, token: str, ttl: float) -> float:
+        now = time.time()
+        expires_at = now + ttl
+        self._entries[key] = (now + ttl * self.reuse_fraction, expires_at, token)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return expires_at
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class TokenMinter:
+    """Signs LiveKit and Twilio access tokens, reusing recent ones when a cache is given"""
+
+    def __init__(self, cache: Optional[TokenCache] = None):
+        self.cache = cache
+
+    def livekit_token(self, room: str, identity: str, role: str = "participant") -> Tuple[str, float]:
+        """Return (jwt, expires_at epoch seconds) for joining `room`"""
+        key = ("livekit", identity, room, role)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        from livekit import api
+
+        token = api.AccessToken(LIVEKIT_API_KEY, LIVEKIT_API_SECRET) \
+            .with_identity(identity) \
+            .with_name(f"{role.title()} {identity}") \
+            .with_ttl(datetime.timedelta(seconds=LIVEKIT_TOKEN_TTL_SECONDS)) \
+            .with_grants(video_grants(room, role)) \
+            .to_jwt()
+        return self._remember(key, token, LIVEKIT_TOKEN_TTL_SECONDS)
+
+    def twilio_voice_token(self, identity: str) -> Tuple[str, float]:
+        """Return (jwt, expires_at epoch seconds) for the Twilio Voice SDK"""
+        key = ("twilio-voice", identity, TWILIO_APP_SID)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        from twilio.jwt.access_token import AccessToken as TwilioAccessToken
+
+        token = TwilioAccessToken(
+            TWILIO_ACCOUNT_SID,
+            TWILIO_API_KEY,
+            TWILIO_API_SECRET,
+            identity=identity,
+            ttl=int(TWILIO_TOKEN_TTL_SECONDS)
+        )
+        token.add_grant(voice_grant())
+        return self._remember(key, token.to_jwt(), TWILIO_TOKEN_TTL_SECONDS)
+
+    def _remember(self, key: Hashable, token: str, ttl: float) -> Tuple[str, float]:
+        if self.cache is None:
+            return token, time.time() + ttl
+        return token, self.cache.put(key, token, ttl)
+
+
+token_minter = TokenMinter(TokenCache(max_entries=TOKEN_CACHE_SIZE, reuse_fraction=TOKEN_CACHE_REUSE_FRACTION))
@@ -0,0 +1,284 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional
+
+from core.config import (
+    TRANSCRIPT_REFRESH_TOKENS,
+    TRANSCRIPT_REFRESH_SECONDS,
+    TRANSCRIPT_HISTORY_SIZE,
+    TRANSCRIPT_MAX_PENDING_TOKENS,
+    TRANSCRIPT_MAX_ROOMS,
+    TRANSCRIPT_TTL_SECONDS,
+)
+from services.ai_service import (
+    estimate_tokens,
+    start_rolling_summary_stream,
+    start_summary_stream,
+    summary_streams,
+    update_rolling_summary,
+)
+from services.summary_stream import SummaryStream
+
+logger = logging.getLogger(__name__)
+
+
+class RoomTranscript:
+    """Utterances of one live call and the rolling summary of everything before `pending`.
+
+    `pending` is capped at `max_pending_tokens`: while refreshes fail or fall behind, the
+    oldest lines are dropped from it (they stay in `history` until it rotates) rather
+    than growing without bound.
+    """
+
+    def __init__(self, room: str, history_size: int, max_pending_tokens: int = 24000):
+        self.room = room
+        self.history = deque(maxlen=history_size)
+        self.max_pending_tokens = max_pending_tokens
+        # Lines not yet folded into `summary`, oldest first
+        self.pending: List[str] = []
+        self.pending_tokens = 0
+        # Lines removed from the front of `pending` so far, so a fold still lands on
+        # the right lines after older ones were trimmed
+        self.consumed = 0
+        self.trimmed = 0
+        self.summary: Optional[str] = None
+        self.utterances = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.refreshed_at = time.monotonic()
+        self.failed_at = float("-inf")
+        self.updated_at = time.monotonic()
+        self.refreshing: Optional[asyncio.Task] = None
+
+    def append(self, speaker: str, text: str):
+        line = f"{speaker}: {text}"
+        self.history.append({"speaker": speaker, "text": text, "at": time.time()})
+        self.pending.append(line)
+        self.pending_tokens += estimate_tokens(line)
+        self.utterances += 1
+        self.updated_at = time.monotonic()
+        excess = 0
+        while self.pending_tokens > self.max_pending_tokens and excess < len(self.pending) - 1:
+            self.pending_tokens -= estimate_tokens(self.pending[excess])
+            excess += 1
+        if excess:
+            del self.pending[:excess]
+            self.consumed += excess
+            self.trimmed += excess
+
+    def delta(self) -> str:
+        return "\n".join(self.pending)
+
+    @property
+    def end(self) -> int:
+        """Position just past the last pending line, counted from the first line of the call"""
+        return self.consumed + len(self.pending)
+
+    def fold(self, summary: str, end: int):
+        """Adopt a summary that covers every line before position `end`"""
+        self.summary = summary
+        lines = max(0, end - self.consumed)
+        del self.pending[:lines]
+        self.consumed += lines
+        self.pending_tokens = sum(estimate_tokens(line) for line in self.pending)
+
+    def snapshot(self) -> dict:
+        return {
+            "room": self.room,
+            "summary": self.summary,
+            "utterances": self.utterances,
+            "pending_lines": len(self.pending),
+            "pending_tokens": self.pending_tokens,
+            "trimmed_lines": self.trimmed,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": self.refreshing is not None,
+            "recent": list(self.history),
+        }
+
+
+class TranscriptTracker:
+    """Per-room transcripts with rolling summaries kept current in the background.
+
+    A room's summary is refreshed once `refresh_tokens` new tokens have arrived, or
+    `refresh_seconds` after the last refresh if anything is pending. Each refresh sends
+    only the current summary plus the pending lines, so a transfer only has to
+    summarize what was said since the last refresh. State is per worker; route a
+    room's transcript and its transfer to the same worker.
+    """
+
+    def __init__(self, refresh_tokens: int = 200, refresh_seconds: float = 15.0, history_size: int = 200,
+                 max_pending_tokens: int = 24000, max_rooms: int = 5000, ttl_seconds: float = 7200.0):
+        self.refresh_tokens = refresh_tokens
+        self.refresh_seconds = refresh_seconds
+        self.history_size = history_size
+        self.max_pending_tokens = max_pending_tokens
+        self.max_rooms = max_rooms
+        self.ttl_seconds = ttl_seconds
+        self._rooms: "OrderedDict[str, RoomTranscript]" = OrderedDict()
+        self._ticker: Optional[asyncio.Task] = None
+        self.served_precomputed = 0
+        self.served_delta = 0
+
+    async def startup(self):
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._tick())
+
+    async def shutdown(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+        refreshing = [t.refreshing for t in self._rooms.values() if t.refreshing is not None]
+        for task in refreshing:
+            task.cancel()
+        await asyncio.gather(*refreshing, return_exceptions=True)
+
+    def append(self, room: str, speaker: str, text: str) -> RoomTranscript:
+        transcript = self._rooms.get(room)
+        if transcript is None:
+            transcript = self._rooms[room] = RoomTranscript(room, self.history_size, self.max_pending_tokens)
+            self._evict()
+        self._rooms.move_to_end(room)
+        transcript.append(speaker, text)
+        recently_failed = time.monotonic() - transcript.failed_at < self.refresh_seconds
+        if transcript.pending_tokens >= self.refresh_tokens and not recently_failed:
+            self._schedule(transcript)
+        return transcript
+
+    def get(self, room: str) -> Optional[RoomTranscript]:
+        return self._rooms.get(room)
+
+    def discard(self, room: str) -> bool:
+        transcript = self._rooms.pop(room, None)
+        if transcript is None:
+            return False
+        if transcript.refreshing is not None:
+            transcript.refreshing.cancel()
+        return True
+
+    async def summary_stream(self, room: str, context: str = "") -> Optional[SummaryStream]:
+        """The room's summary for a transfer, or None if nothing was transcribed.
+
+        Serves the precomputed summary as-is when nothing is pending; otherwise streams
+        the summary updated with just the pending lines (and `context`, if given).
+        """
+        transcript = self._rooms.get(room)
+        if transcript is None or (transcript.summary is None and not transcript.pending):
+            return None
+
+        delta = transcript.delta()
+        if context:
+            delta = f"{delta}\nAgent note: {context}" if delta else f"Agent note: {context}"
+        if not delta:
+            self.served_precomputed += 1
+            return summary_streams.completed(f"transcript:{room}", transcript.summary)
+
+        self.served_delta += 1
+        stream = await start_rolling_summary_stream(transcript.summary, delta)
+        if not context:
+            # The same update a background refresh would make; adopt it instead of asking again
+            self._adopt_when_ready(transcript, stream, transcript.end, transcript.summary)
+        return stream
+
+    def _adopt_when_ready(self, transcript: RoomTranscript, stream: SummaryStream, end: int,
+                          previous: Optional[str]):
+        async def adopt() -> bool:
+            text = await stream.wait()
+            # Skip if a refresh already moved the summary on
+            if stream.error or transcript.summary != previous:
+                return False
+            transcript.fold(text, end)
+            transcript.refreshed_at = time.monotonic()
+            return True
+
+        if transcript.refreshing is None:
+            transcript.refreshing = asyncio.create_task(adopt())
+            transcript.refreshing.add_done_callback(lambda task: self._refreshed(transcript, task))
+
+    def _schedule(self, transcript: RoomTranscript):
+        if transcript.refreshing is None and transcript.pending:
+            transcript.refreshing = asyncio.create_task(self._refresh(transcript))
+            transcript.refreshing.add_done_callback(lambda task: self._refreshed(transcript, task))
+
+    def _refreshed(self, transcript: RoomTranscript, task: asyncio.Task):
+        transcript.refreshing = None
+        if task.cancelled() or not task.result():
+            return
+        # Lines that arrived during the refresh may already be over the threshold
+        if transcript.pending_tokens >= self.refresh_tokens and self._rooms.get(transcript.room) is transcript:
+            self._schedule(transcript)
+
+    async def _refresh(self, transcript: RoomTranscript) -> bool:
+        """Fold the pending lines into the summary; False if the LLM call failed.
+
+        Deltas over SUMMARY_TOKEN_BUDGET (after refreshes failed for a while) are map-reduced.
+        """
+        lines, end = len(transcript.pending), transcript.end
+        started = time.perf_counter()
+        try:
+            summary = await update_rolling_summary(transcript.summary, transcript.delta())
+        except Exception as e:
+            # Failures also wait a full interval, so a down LLM is not retried in a tight loop
+            transcript.refreshed_at = transcript.failed_at = time.monotonic()
+            transcript.refresh_errors += 1
+            logger.warning("Rolling summary refresh failed", extra={
+                "room": transcript.room, "error": str(e) or type(e).__name__
+            })
+            return False
+
+        transcript.fold(summary, end)
+        transcript.refreshed_at = time.monotonic()
+        transcript.refreshes += 1
+        logger.debug("Rolling summary refreshed", extra={
+            "room": transcript.room, "lines": lines,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+        return True
+
+    async def _tick(self):
+        interval = max(0.1, min(1.0, self.refresh_seconds / 2))
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for room, transcript in list(self._rooms.items()):
+                if now - transcript.updated_at > self.ttl_seconds:
+                    self.discard(room)
+                elif transcript.pending and now - transcript.refreshed_at >= self.refresh_seconds:
+                    self._schedule(transcript)
+
+    def _evict(self):
+        while len(self._rooms) > self.max_rooms:
+            room, _ = next(iter(self._rooms.items()))
+            self.discard(room)
+
+    def stats(self) -> dict:
+        return {
+            "rooms": len(self._rooms),
+            "refreshing": sum(1 for t in self._rooms.values() if t.refreshing is not None),
+            "pending_tokens": sum(t.pending_tokens for t in self._rooms.values()),
+            "trimmed_lines": sum(t.trimmed for t in self._rooms.values()),
+            "refreshes": sum(t.refreshes for t in self._rooms.values()),
+            "refresh_errors": sum(t.refresh_errors for t in self._rooms.values()),
+            "served_precomputed": self.served_precomputed,
+            "served_delta": self.served_delta,
+        }
+
+
+async def summary_for_room(room: str, context: Optional[str] = None) -> SummaryStream:
+    """Transfer summary: the room's rolling transcript summary if it has one, else one from `context`"""
+    stream = await transcripts.summary_stream(room, context or "")
+    if stream is not None:
+        return stream
+    return await start_summary_stream(context or "")
+
+
+transcripts = TranscriptTracker(
+    refresh_tokens=TRANSCRIPT_REFRESH_TOKENS,
+    refresh_seconds=TRANSCRIPT_REFRESH_SECONDS,
+    history_size=TRANSCRIPT_HISTORY_SIZE,
+    max_pending_tokens=TRANSCRIPT_MAX_PENDING_TOKENS,
+    max_rooms=TRANSCRIPT_MAX_ROOMS,
+    ttl_seconds=TRANSCRIPT_TTL_SECONDS,
+)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from models.transfer_session import TransferSession
+from schemas.requests import HoldCallerRequest, WarmTransferRequest
+from services.transcript_service import summary_for_room
+from services.livekit_service import create_consultation_room, hold_caller_service
+from services.session_store import session_store
+from services.summary_stream import SummaryStream
+from services.twilio_service import twilio_service
+from utils import deadlines
+
+logger = logging.getLogger(__name__)
+
+# Per-step states: running -> done | failed. Steps start together, so there is no pending state.
+
+
+class WarmTransferOrchestrator:
+    """Runs the independent steps of a warm transfer concurrently.
+
+    Dialing Agent B (phone) or creating the consultation room (LiveKit), the summary
+    and the caller hold do not depend on each other, so none waits for another. Step
+    status and timings are written to the TransferSession as each step finishes, so
+    any worker can report progress; `wait()` additionally blocks on runs owned by
+    this worker.
+    """
+
+    def __init__(self):
+        self._runs: Dict[str, asyncio.Task] = {}
+
+    async def start(self, request: WarmTransferRequest) -> Tuple[TransferSession, SummaryStream]:
+        """Create the session and launch every step; returns without waiting for any of them"""
+        summary_stream = await summary_for_room(request.caller_room, request.context)
+
+        if request.phone_number:
+            primary = "dial"
+            session = TransferSession(
+                kind="phone",
+                status="orchestrating",
+                phone_number=request.phone_number,
+                conference_name=f"transfer-{uuid.uuid4().hex[:8]}",
+                **_caller_fields(request),
+            )
+        else:
+            primary = "room"
+            session = TransferSession(
+                kind="livekit",
+                status="orchestrating",
+                consultation_room=f"consult-{uuid.uuid4().hex[:8]}",
+                **_caller_fields(request),
+            )
+        session.summary_id = summary_stream.summary_id
+
+        names = [primary, "summary"] + (["hold"] if request.hold_caller else [])
+        started_at = time.time()
+        session.steps = {name: {"status": "running", "started_at": started_at} for name in names}
+        await session_store.save(session)
+
+        # Primary step first, so its request is the first one sent
+        steps = {primary: self._dial(session) if primary == "dial" else self._room(session),
+                 "summary": self._summary(summary_stream)}
+        if request.hold_caller:
+            steps["hold"] = self._hold(session)
+
+        # The steps outlive this request, so its deadline does not apply to them
+        task = asyncio.create_task(self._run(session.session_id, primary, steps, started_at),
+                                   context=deadlines.detached())
+        self._runs[session.session_id] = task
+        task.add_done_callback(lambda _: self._runs.pop(session.session_id, None))
+        return session, summary_stream
+
+    async def wait(self, session_id: str, timeout: float) -> Optional[TransferSession]:
+        """Current session, after waiting up to `timeout` for a run owned by this worker to finish"""
+        task = self._runs.get(session_id)
+        if task is not None and timeout > 0:
+            await asyncio.wait({task}, timeout=timeout)
+        return await session_store.get(session_id)
+
+    async def _run(self, session_id: str, primary: str, steps: Dict[str, Awaitable[dict]], started_at: float):
+        outcomes = await asyncio.gather(*(
+            self._step(session_id, name, step, started_at) for name, step in steps.items()
+        ))
+        results = dict(zip(steps, outcomes))
+
+        if not results[primary]:
+            status = "failed"
+        else:
+            status = "phone_transfer_initiated" if primary == "dial" else "consultation_created"
+        session = await session_store.update(session_id, status=status)
+        if session is not None:
+            logger.info("Warm transfer steps finished", extra={
+                "session_id": session_id,
+                "status": status,
+                "step_ms": {name: step.get("duration_ms") for name, step in session.steps.items()},
+            })
+
+    async def _step(self, session_id: str, name: str, step: Awaitable[dict], started_at: float) -> bool:
+        """Await one step and record its outcome; the dict it returns is applied to the session"""
+        started = time.perf_counter()
+        fields = {}
+        state = {"status": "done", "started_at": started_at}
+        try:
+            fields = await step
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            state = {"status": "failed", "started_at": started_at, "error": error}
+            logger.warning("Warm transfer step failed", extra={"session_id": session_id, "step": name,
+                                                              "error": error})
+        state.update(finished_at=time.time(), duration_ms=round((time.perf_counter() - started) * 1000, 2))
+        await session_store.update(session_id, set_steps={name: state}, **fields)
+        return state["status"] == "done"
+
+    async def _dial(self, session: TransferSession) -> dict:
+        call = await twilio_service.create_conference_call(
+            to_number=session.phone_number,
+            conference_name=session.conference_name
+        )
+        return {"call_sids": [call["call_sid"]]}
+
+    async def _room(self, session: TransferSession) -> dict:
+        await create_consultation_room(session.consultation_room)
+        return {}
+
+    async def _summary(self, summary_stream: SummaryStream) -> dict:
+        return {"summary": await summary_stream.wait()}
+
+    async def _hold(self, session: TransferSession) -> dict:
+        await hold_caller_service(HoldCallerRequest(
+            caller_identity=session.caller_identity,
+            room=session.caller_room,
+            hold=True
+        ))
+        return {"caller_on_hold": True}
+
+
+def _caller_fields(request: WarmTransferRequest) -> dict:
+    return {
+        "caller_room": request.caller_room,
+        "caller_identity": request.caller_identity,
+        "agent_a_identity": request.agent_a_identity,
+        "participants": [request.caller_identity, request.agent_a_identity],
+    }
+
+
+warm_transfers = WarmTransferOrchestrator()
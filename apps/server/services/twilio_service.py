@@ -1,31 +1,106 @@
-from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse
-from core.config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER
+from core.config import (
+    TWILIO_ACCOUNT_SID,
+    TWILIO_AUTH_TOKEN,
+    TWILIO_PHONE_NUMBER,
+    TWILIO_API_BASE_URL,
+    TWILIO_STATUS_CALLBACK_URL,
+    TWILIO_CALLS_PER_SECOND,
+    TWILIO_MAX_CONCURRENCY,
+    TWILIO_TIMEOUT_SECONDS,
+    TWILIO_MAX_RETRIES,
+    TWILIO_RETRY_BASE_DELAY,
+    TWILIO_RETRY_MAX_DELAY,
+)
 from fastapi import HTTPException
+from utils.deadlines import DeadlineExceeded, deadline_step, remaining
+from utils.rate_limit import TokenBucket
+from utils.metrics import track_upstream
+from utils import twiml as twiml_templates
+import asyncio
 import logging
+import random
 
 logger = logging.getLogger(__name__)
 
+
+def _is_retryable(error) -> bool:
+    return error.status == 429 or error.status >= 500
+
+
 class TwilioService:
     def __init__(self):
-        self.client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
         self.from_number = TWILIO_PHONE_NUMBER
+        # Non-blocking REST path, created on the event loop by startup()
+        self.async_client = None
+        self._http_client = None
+        self._call_slots = None
+        self.rate_limiter = None
+        self.retries = 0
+
+    async def startup(self):
+        """Create the aiohttp-backed Twilio client, CPS limiter and concurrency cap"""
+        if self.async_client is not None:
+            return
+        # Imported here so roles that never place calls do not load the Twilio REST SDK
+        from twilio.rest import Client
+        from twilio.http.async_http_client import AsyncTwilioHttpClient
+
+        self._http_client = AsyncTwilioHttpClient(timeout=TWILIO_TIMEOUT_SECONDS)
+        self.async_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=self._http_client)
+        if TWILIO_API_BASE_URL:
+            self.async_client.api.base_url = TWILIO_API_BASE_URL
+        self._call_slots = asyncio.Semaphore(TWILIO_MAX_CONCURRENCY)
+        self.rate_limiter = TokenBucket(rate=TWILIO_CALLS_PER_SECOND, capacity=1)
+
+    async def shutdown(self):
+        """Close the async HTTP session"""
+        if self._http_client is not None:
+            await self._http_client.close()
+        self.async_client = None
+        self._http_client = None
+
+    async def create_call(self, pre_acquired: bool = False, **params):
+        """calls.create without blocking the event loop, paced to the account CPS.
+
+        Retries 429 and 5xx responses with full-jitter exponential backoff. Pass
+        `pre_acquired=True` when the caller already took a token from `rate_limiter`.
+        Waiting, retries and the request itself all count against the request deadline.
+        """
+        if self.async_client is None:
+            await self.startup()
+        from twilio.base.exceptions import TwilioRestException
+
+        attempt = 0
+        async with deadline_step("twilio_calls_create"):
+            while True:
+                if not pre_acquired or attempt > 0:
+                    await self.rate_limiter.acquire()
+                try:
+                    async with self._call_slots, track_upstream("twilio_calls_create"):
+                        return await self.async_client.calls.create_async(from_=self.from_number, **params)
+                except TwilioRestException as e:
+                    if not _is_retryable(e) or attempt >= TWILIO_MAX_RETRIES:
+                        raise
+                    delay = random.uniform(0, min(TWILIO_RETRY_MAX_DELAY, TWILIO_RETRY_BASE_DELAY * 2 ** attempt))
+                    left = remaining()
+                    if left is not None and delay >= left:
+                        # The retry could not finish in time; give up now instead of at the deadline
+                        raise DeadlineExceeded("twilio_calls_create") from e
+                    attempt += 1
+                    self.retries += 1
+                    logger.warning(f"Twilio {e.status} on calls.create, retry {attempt} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
     
-    async def make_call(self, to_number: str, message: str = "Hello! You are being connected to a customer support agent."):
+    async def make_call(self, to_number: str, message: str = "Hello! You are being connected to a customer support agent.",
+                        pre_acquired: bool = False):
         """Make an outbound call to a phone number"""
         try:
-            # Create TwiML to say the message
-            twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
-            <Response>
-                <Say voice="alice">{message}</Say>
-                <Pause length="1"/>
-                <Say voice="alice">Please hold while we connect you to the call.</Say>
-            </Response>"""
-            
-            call = self.client.calls.create(
+            twiml = twiml_templates.SAY_THEN_HOLD.render(message=message).decode()
+
+            call = await self.create_call(
+                pre_acquired=pre_acquired,
                 twiml=twiml,
-                to=to_number,
-                from_=self.from_number
+                to=to_number
             )
             
             logger.info(f"Call initiated: {call.sid} to {to_number}")
@@ -36,32 +111,23 @@ class TwilioService:
                 "status": "initiated"
             }
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Failed to make call to {to_number}: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Call failed: {str(e)}")
     
     async def create_conference_call(self, to_number: str, conference_name: str):
         try:
-            # Enhanced TwiML with status callbacks
-            twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
-            <Response>
-                <Say voice="alice">You are being connected to a support conference.</Say>
-                <Dial>
-                    <Conference 
-                        startConferenceOnEnter="true" 
-                        endConferenceOnExit="false"
-                        statusCallback="http://your-ngrok-url.ngrok.io/twilio/conference-status"
-                        statusCallbackEvent="start join leave end"
-                    >
-                        {conference_name}
-                    </Conference>
-                </Dial>
-            </Response>"""
-            
-            call = self.client.calls.create(
+            # Conference name is escaped, so user-supplied names cannot break the document
+            twiml = twiml_templates.PHONE_JOIN_CONFERENCE.render(
+                conference_name=conference_name,
+                status_callback=TWILIO_STATUS_CALLBACK_URL,
+            ).decode()
+
+            call = await self.create_call(
                 twiml=twiml,
-                to=to_number,
-                from_=self.from_number
+                to=to_number
             )
             
             return {
@@ -71,32 +137,27 @@ class TwilioService:
                 "status": "conference_call_initiated"
             }
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Failed to create conference call: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Conference call failed: {str(e)}")
     
     def generate_conference_twiml(self, conference_name: str):
         """Generate TwiML for joining a conference"""
-        response = VoiceResponse()
-        response.say("Welcome to the support conference.", voice="alice")
-        dial = response.dial()
-        dial.conference(conference_name, 
-                       start_conference_on_enter=True,
-                       end_conference_on_exit=False)
-        return str(response)
+        return twiml_templates.CONFERENCE_JOIN.render(
+            greeting="Welcome to the support conference.",
+            beep="true",
+            conference_name=conference_name,
+        ).decode()
     
     def generate_web_conference_twiml(self, conference_name: str):
         """Generate TwiML for web client to join conference"""
-        response = VoiceResponse()
-        response.say("Connecting you to the conference.", voice="alice")
-        
-        dial = response.dial()
-        dial.conference(conference_name, 
-                    start_conference_on_enter=True,
-                    end_conference_on_exit=False,
-                    beep=False)
-        
-        return str(response)
+        return twiml_templates.CONFERENCE_JOIN.render(
+            greeting="Connecting you to the conference.",
+            beep="false",
+            conference_name=conference_name,
+        ).decode()
 
 
 # Create global instance
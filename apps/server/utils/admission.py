@@ -0,0 +1,161 @@
+"""Admission control: per-class concurrency pools with bounded FIFO queues.
+
+Each route class has its own concurrency limit and wait queue. Non-priority classes
+also share one in-flight ceiling; priority classes (webhooks) are only bounded by
+their own pool and are dispatched first whenever a slot frees up, so a spike of
+expensive requests cannot delay them. A full queue, a wait longer than the queue
+timeout, or an identity over its token bucket is rejected at once with a retry hint.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+from utils.rate_limit import TokenBucket
+
+
+class Rejected(Exception):
+    """Not admitted; `retry_after` is a suggested wait in whole seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionClass:
+    """One route class: its concurrency limit, queue bound and counters"""
+
+    def __init__(self, name: str, limit: int, queue_size: int, priority: bool = False, rate_limited: bool = True):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.priority = priority
+        self.rate_limited = rate_limited
+        self.active = 0
+        self.waiters: deque = deque()
+        # Moving average of time in the pool, for Retry-After estimates
+        self.service_seconds = 0.1
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "priority": self.priority,
+            "active": self.active,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "service_ms": round(self.service_seconds * 1000, 2),
+        }
+
+
+class AdmissionController:
+    def __init__(self, classes: List[AdmissionClass], max_in_flight: int = 64, queue_timeout: float = 5.0,
+                 identity_rate: float = 0.0, identity_burst: float = 10.0, max_identities: int = 10000):
+        # Priority classes first, so they are dispatched first
+        self.classes = sorted(classes, key=lambda cls: not cls.priority)
+        self.by_name = {cls.name: cls for cls in self.classes}
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.identity_rate = identity_rate
+        self.identity_burst = identity_burst
+        self.max_identities = max_identities
+        # In flight across non-priority classes
+        self.active = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _can_run(self, cls: AdmissionClass) -> bool:
+        return cls.active < cls.limit and (cls.priority or self.active < self.max_in_flight)
+
+    def _start(self, cls: AdmissionClass):
+        cls.active += 1
+        cls.admitted += 1
+        if not cls.priority:
+            self.active += 1
+
+    def _reject(self, cls: AdmissionClass, reason: str, retry_after: float) -> Rejected:
+        cls.rejected[reason] = cls.rejected.get(reason, 0) + 1
+        return Rejected(reason, retry_after)
+
+    def _bucket(self, identity: str) -> TokenBucket:
+        bucket = self._buckets.get(identity)
+        if bucket is None:
+            bucket = self._buckets[identity] = TokenBucket(rate=self.identity_rate, capacity=self.identity_burst)
+            if len(self._buckets) > self.max_identities:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(identity)
+        return bucket
+
+    def _retry_after(self, cls: AdmissionClass) -> float:
+        return (len(cls.waiters) + 1) * cls.service_seconds / max(1, cls.limit)
+
+    async def acquire(self, cls: AdmissionClass, identity: Optional[str] = None, timeout: Optional[float] = None):
+        """Take a slot in `cls`, queueing for up to `timeout` (default: the queue timeout); raises Rejected"""
+        if cls.rate_limited and identity and self.identity_rate > 0:
+            bucket = self._bucket(identity)
+            if not bucket.try_acquire():
+                raise self._reject(cls, "rate_limited", bucket.wait_time())
+
+        if not cls.waiters and self._can_run(cls):
+            self._start(cls)
+            return
+        if len(cls.waiters) >= cls.queue_size:
+            raise self._reject(cls, "queue_full", self._retry_after(cls))
+
+        granted = asyncio.get_running_loop().create_future()
+        cls.waiters.append(granted)
+        try:
+            async with asyncio.timeout(self.queue_timeout if timeout is None else timeout):
+                await granted
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if granted.done() and not granted.cancelled():
+                # Granted just as the wait ended; hand the slot on
+                self.release(cls)
+            else:
+                granted.cancel()
+                try:
+                    cls.waiters.remove(granted)
+                except ValueError:
+                    pass
+            if isinstance(e, TimeoutError):
+                raise self._reject(cls, "queue_timeout", self._retry_after(cls)) from None
+            raise
+
+    def release(self, cls: AdmissionClass, elapsed: Optional[float] = None):
+        cls.active -= 1
+        if not cls.priority:
+            self.active -= 1
+        if elapsed is not None:
+            cls.service_seconds += 0.1 * (elapsed - cls.service_seconds)
+        self._dispatch()
+
+    def _dispatch(self):
+        for cls in self.classes:
+            while cls.waiters and self._can_run(cls):
+                granted = cls.waiters.popleft()
+                if granted.done():
+                    continue
+                self._start(cls)
+                granted.set_result(None)
+
+    async def run(self, cls: AdmissionClass, identity: Optional[str], call, timeout: Optional[float] = None):
+        """`await call()` holding a slot in `cls`"""
+        await self.acquire(cls, identity, timeout)
+        started = time.perf_counter()
+        try:
+            return await call()
+        finally:
+            self.release(cls, time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.active,
+            "identities": len(self._buckets),
+            "classes": {cls.name: cls.snapshot() for cls in self.classes},
+        }
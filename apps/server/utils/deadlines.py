@@ -0,0 +1,101 @@
+"""Per-request deadlines carried in a context variable.
+
+A request gets one absolute deadline, from its `X-Request-Timeout` header (set by
+DeadlineMiddleware) and/or its route's default (`route_deadline`), whichever is
+sooner. Upstream calls run inside `deadline_step(name)`, which gives them only the
+time that is left and raises DeadlineExceeded(name) when it runs out; the app maps
+that to 504 naming the step. Code without a deadline is unaffected.
+"""
+import asyncio
+import contextvars
+import time
+from typing import Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed while `step` was running"""
+
+    def __init__(self, step: str):
+        super().__init__(f"Deadline exceeded during {step}")
+        self.step = step
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None if there is none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def cap(timeout: float) -> float:
+    """`timeout`, shortened to the time left before the current deadline"""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(0.0, min(timeout, left))
+
+
+def start(timeout: Optional[float]) -> contextvars.Token:
+    """Set a deadline `timeout` seconds from now; an earlier existing deadline is kept"""
+    deadline = _deadline.get()
+    if timeout is not None:
+        candidate = time.monotonic() + timeout
+        deadline = candidate if deadline is None else min(deadline, candidate)
+    return _deadline.set(deadline)
+
+
+def reset(token: contextvars.Token):
+    _deadline.reset(token)
+
+
+def detached() -> contextvars.Context:
+    """A copy of the current context without the deadline.
+
+    For `asyncio.create_task(..., context=detached())`: work that outlives the request,
+    like a warm transfer's steps or a bulk dial job, must not be cut off by it.
+    """
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def route_deadline(seconds: float):
+    """FastAPI dependency giving a route a default deadline; a sooner header deadline still wins"""
+
+    async def dependency():
+        # Async, so it runs in the request's task and the deadline is visible to the endpoint
+        start(seconds)
+
+    return dependency
+
+
+class deadline_step:
+    """`async with deadline_step("twilio_calls_create"):` bounds one step by the request deadline"""
+
+    __slots__ = ("name", "_timeout")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._timeout = None
+
+    async def __aenter__(self):
+        left = remaining()
+        if left is None:
+            return self
+        if left <= 0:
+            raise DeadlineExceeded(self.name)
+        self._timeout = asyncio.timeout(left)
+        await self._timeout.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._timeout is None:
+            return False
+        try:
+            await self._timeout.__aexit__(exc_type, exc, tb)
+        except TimeoutError:
+            raise DeadlineExceeded(self.name) from None
+        return False
@@ -0,0 +1,164 @@
+"""Minimal Prometheus metrics: counters, gauges and fixed-bucket histograms.
+
+Recording is a dict lookup plus a few integer updates, with no locks. Every metric
+is updated from the event loop thread only, so no synchronization is needed. Each
+worker process exposes its own values; scrape every worker.
+"""
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+# Seconds; spans webhook-fast responses up to slow LLM completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: List["_Metric"] = []
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; per-bucket counts are only summed at render time"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Text exposition format (version 0.0.4) for every registered metric"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "wct_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("wct_http_requests_in_flight", "HTTP requests currently being handled")
+HTTP_REQUEST_ERRORS = Counter(
+    "wct_http_request_errors_total", "HTTP requests that raised or returned 5xx", ("method", "route")
+)
+HTTP_CLIENT_DISCONNECTS = Counter(
+    "wct_http_client_disconnects_total", "HTTP requests cancelled because the client went away", ("method", "route")
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "wct_admission_wait_seconds", "Time admitted requests waited for a slot, by route class", ("class",)
+)
+ADMISSION_REJECTIONS = Counter(
+    "wct_admission_rejections_total", "Requests shed by admission control", ("class", "reason")
+)
+
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "wct_upstream_request_duration_seconds", "Latency of calls to upstream APIs", ("upstream",)
+)
+UPSTREAM_IN_FLIGHT = Gauge("wct_upstream_requests_in_flight", "Upstream calls currently awaiting a response",
+                           ("upstream",))
+UPSTREAM_ERRORS = Counter("wct_upstream_errors_total", "Upstream calls that raised", ("upstream",))
+
+
+class track_upstream:
+    """`async with track_upstream("groq_completion"):` times one upstream call"""
+
+    __slots__ = ("upstream", "started")
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream
+
+    async def __aenter__(self):
+        UPSTREAM_IN_FLIGHT.inc(self.upstream)
+        self.started = time.perf_counter()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - self.started, self.upstream)
+        UPSTREAM_IN_FLIGHT.dec(self.upstream)
+        if exc_type is not None:
+            UPSTREAM_ERRORS.inc(self.upstream)
+        return False
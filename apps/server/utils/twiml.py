@@ -0,0 +1,78 @@
+"""Precompiled TwiML responses for the webhook and outbound-call hot paths.
+
+Each shape is split into static byte chunks once at import; rendering only escapes
+and encodes the variable parts and joins them, with no element tree per request.
+"""
+import re
+from typing import List
+from xml.sax.saxutils import escape
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+
+
+class TwimlTemplate:
+    """A TwiML document with `{name}` placeholders, pre-encoded into byte chunks.
+
+    Placeholders inside attribute values are escaped for quotes as well as `&<>`.
+    """
+
+    def __init__(self, source: str):
+        self._chunks: List[bytes] = []
+        self._names: List[str] = []
+        self._in_attribute: List[bool] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            self._chunks.append(source[position:match.start()].encode())
+            self._names.append(match.group(1))
+            self._in_attribute.append(source[:match.start()].endswith('="'))
+            position = match.end()
+        self._chunks.append(source[position:].encode())
+
+    def render(self, **values) -> bytes:
+        parts = [self._chunks[0]]
+        for name, in_attribute, chunk in zip(self._names, self._in_attribute, self._chunks[1:]):
+            value = str(values[name])
+            value = escape(value, _ATTRIBUTE_ENTITIES) if in_attribute else escape(value)
+            parts.append(value.encode())
+            parts.append(chunk)
+        return b"".join(parts)
+
+
+_XML = '<?xml version="1.0" encoding="UTF-8"?>'
+
+# Web client joining a transfer conference from /twilio/voice-webhook
+WEB_JOIN_CONFERENCE = TwimlTemplate(
+    _XML + '<Response><Say voice="alice">Connecting you to the conference.</Say>'
+    '<Dial><Conference beep="false" endConferenceOnExit="false" maxParticipants="10" '
+    'startConferenceOnEnter="true" waitUrl="">{conference_name}</Conference></Dial></Response>'
+)
+
+# Phone participant dialed into a conference, with conference events reported back
+PHONE_JOIN_CONFERENCE = TwimlTemplate(
+    _XML + '<Response><Say voice="alice">You are being connected to a support conference.</Say>'
+    '<Dial><Conference endConferenceOnExit="false" startConferenceOnEnter="true" '
+    'statusCallback="{status_callback}" statusCallbackEvent="start join leave end">'
+    '{conference_name}</Conference></Dial></Response>'
+)
+
+CONFERENCE_JOIN = TwimlTemplate(
+    _XML + '<Response><Say voice="alice">{greeting}</Say>'
+    '<Dial><Conference beep="{beep}" endConferenceOnExit="false" startConferenceOnEnter="true">'
+    '{conference_name}</Conference></Dial></Response>'
+)
+
+SAY_THEN_HOLD = TwimlTemplate(
+    _XML + '<Response><Say voice="alice">{message}</Say><Pause length="1"/>'
+    '<Say voice="alice">Please hold while we connect you to the call.</Say></Response>'
+)
+
+# Responses without variable parts are encoded once
+DEFAULT_GREETING = TwimlTemplate(
+    _XML + '<Response><Say voice="alice">Welcome to the voice application.</Say></Response>'
+).render()
+
+WEBHOOK_ERROR = TwimlTemplate(
+    _XML + '<Response><Say voice="alice">There was an error connecting to the conference. '
+    'Please try again.</Say></Response>'
+).render()
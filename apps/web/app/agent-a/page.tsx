@@ -15,7 +15,7 @@ import { AutoCloseOverlay } from '@/components/AutoCloseOverlay';
 import { ContextModal } from '@/components/ui/context-modal';
 import { CopyLink } from '@/components/ui/copy-link';
 import { useAgentAutoClose } from '@/hooks/useAgentAutoClose';
-import { getToken, initiateTransfer, holdCaller, transferToPhone } from '@/lib/livekit';
+import { getToken, initiateTransfer, holdCaller, transferToPhone, subscribeToSummary } from '@/lib/livekit';
 import { initializeTwilioDevice, joinConferenceFromWeb, disconnectFromConference, refreshTwilioToken } from '@/lib/twilio-client';
 import { UserCheck, ArrowRightLeft, ExternalLink, Phone, Users } from 'lucide-react';
 
@@ -226,6 +226,7 @@ function AgentAInterface({
   const connectionState = useConnectionState();
   const participants = useParticipants();
   const [tokenRefreshInterval, setTokenRefreshInterval] = useState<NodeJS.Timeout | null>(null);
+  const [summaryId, setSummaryId] = useState<string>('');
 
 
   // Handle transfer initiation
@@ -261,6 +262,8 @@ function AgentAInterface({
         // Existing Agent B transfer logic
         const transferData = await initiateTransfer(roomName, caller.identity, agentIdentity, context);
         setSummary(transferData.summary);
+        setSummaryId(transferData.summary_id);
+        subscribeToSummary(transferData.summary_id, (text) => setSummary(text));
         setConsultationRoom(transferData.consultation_room);
         setTransferStep('initiated');
         
@@ -280,9 +283,11 @@ function AgentAInterface({
         
         setTransferStep('phone-conference');
         setSummary(transferData.summary);
+        setSummaryId(transferData.summary_id);
+        subscribeToSummary(transferData.summary_id, (text) => setSummary(text));
         setConsultationRoom(transferData.conference_name);
         
-        alert(`Phone transfer initiated!\n\nCalling: ${phoneNumber}\nConference: ${transferData.conference_name}\n\nAI Summary: "${transferData.summary}"\n\nThe phone agent will join the conference automatically.`);
+        alert(`Phone transfer initiated!\n\nCalling: ${phoneNumber}\nConference: ${transferData.conference_name}\n\nThe AI summary will appear below as it is generated.\n\nThe phone agent will join the conference automatically.`);
       }
       
     } catch (error) {
@@ -298,7 +303,7 @@ function AgentAInterface({
     if (!consultationRoom) return;
     
     try {
-      const consultUrl = `/agent-consultation?room=${consultationRoom}&summary=${encodeURIComponent(summary)}&identity=${agentIdentity}`;
+      const consultUrl = `/agent-consultation?room=${consultationRoom}&summary=${encodeURIComponent(summary)}&summary_id=${summaryId}&identity=${agentIdentity}`;
       window.open(consultUrl, '_blank');
       setTransferStep('consulting');
     } catch (error) {
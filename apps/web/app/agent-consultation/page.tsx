@@ -12,7 +12,7 @@ import { ActionCard } from '@/components/ui/action-card';
 import { AutoCloseOverlay } from '@/components/AutoCloseOverlay';
 import { useAgentAutoClose } from '@/hooks/useAgentAutoClose';
 import { TTSManager } from '@/lib/tts';
-import { getToken } from '@/lib/livekit';
+import { getToken, subscribeToSummary } from '@/lib/livekit';
 import { MessageSquare, Users, Volume2, VolumeX, Bot } from 'lucide-react';
 
 export default function AgentConsultationPage() {
@@ -37,6 +37,7 @@ export default function AgentConsultationPage() {
     const params = new URLSearchParams(window.location.search);
     const roomParam = params.get('room');
     const summaryParam = params.get('summary');
+    const summaryIdParam = params.get('summary_id');
     const identityParam = params.get('identity');
     const tokenParam = params.get('token');
 
@@ -44,6 +45,11 @@ export default function AgentConsultationPage() {
     if (summaryParam) setSummary(decodeURIComponent(summaryParam));
     if (identityParam) setIdentity(identityParam);
     if (tokenParam) setToken(tokenParam);
+
+    // Render the AI summary as it streams in
+    if (summaryIdParam) {
+      return subscribeToSummary(summaryIdParam, (text) => setSummary(text));
+    }
   }, []);
 
   const handleConnect = async () => {
@@ -99,41 +99,62 @@ export default function CallerPage() {
 };
 
  
-  // Polling for conference join signals from Agent A
+  // Conference join signals from Agent A, pushed over SSE with long-poll fallback
   useEffect(() => {
     if (!roomName || inTwilioConference) return;
     
-    console.log('🔍 Starting polling for conference signals...');
-    
-    const pollInterval = setInterval(async () => {
-      try {
-        const response = await fetch(`${SERVER_URL}/twilio/check-caller-signal/${roomName}`);
-        const signal = await response.json();
+    let stopped = false;
+    let source: EventSource | null = null;
+
+    const handleSignal = async (signal: any) => {
+      if (signal.message === 'join_twilio_conference' && !inTwilioConference) {
+        console.log('🎯 Received join conference signal!');
         
-        console.log('📡 Polling result:', signal);
+        // Agent A wants caller to join Twilio conference
+        const shouldJoin = confirm(
+          '🔄 Agent is transferring you to a phone specialist.\n\nWould you like to join the phone conference?'
+        );
         
-        if (signal.message === 'join_twilio_conference' && !inTwilioConference) {
-          console.log('🎯 Received join conference signal!');
-          
-          // Agent A wants caller to join Twilio conference
-          const shouldJoin = confirm(
-            '🔄 Agent is transferring you to a phone specialist.\n\nWould you like to join the phone conference?'
-          );
-          
-          if (shouldJoin) {
-            await joinTwilioConference(signal.conference_name);
-          }
+        if (shouldJoin) {
+          await joinTwilioConference(signal.conference_name);
+        }
+      }
+    };
+
+    const longPoll = async () => {
+      while (!stopped) {
+        try {
+          const response = await fetch(`${SERVER_URL}/twilio/check-caller-signal/${roomName}?wait=25`);
+          const signal = await response.json();
+          if (!stopped) await handleSignal(signal);
+        } catch (error) {
+          // Back off briefly; signaling errors shouldn't interrupt user experience
+          console.log('Signal long-poll error (normal):', error);
+          await new Promise((resolve) => setTimeout(resolve, 2000));
         }
-        
-      } catch (error) {
-        // Silent fail - polling errors shouldn't interrupt user experience
-        console.log('Polling error (normal):', error);
       }
-    }, 2000); // Poll every 2 seconds
+    };
+
+    if (typeof EventSource !== 'undefined') {
+      console.log('🔍 Subscribing to conference signals...');
+      source = new EventSource(`${SERVER_URL}/twilio/caller-signal/${roomName}/events`);
+      source.addEventListener('signal', (event) => {
+        handleSignal(JSON.parse((event as MessageEvent).data));
+      });
+      source.onerror = () => {
+        if (source && source.readyState === EventSource.CLOSED) {
+          source = null;
+          longPoll();
+        }
+      };
+    } else {
+      longPoll();
+    }
     
     return () => {
-      console.log('🛑 Stopping conference signal polling');
-      clearInterval(pollInterval);
+      console.log('🛑 Stopping conference signal subscription');
+      stopped = true;
+      source?.close();
     };
   }, [roomName, inTwilioConference]);
 
@@ -8,6 +8,9 @@ export interface TokenResponse {
 export interface TransferResponse {
   consultation_room: string;
   summary: string;
+  summary_id: string;
+  summary_status: string;
+  summary_stream_url: string;
   original_room: string;
   caller_identity: string;
   agent_a_identity: string;
@@ -48,6 +51,25 @@ export async function initiateTransfer(callerRoom: string, callerIdentity: strin
   return response.json();
 }
 
+// Follow a streamed AI summary; onUpdate receives the full text so far. Returns an unsubscribe function.
+export function subscribeToSummary(summaryId: string, onUpdate: (summary: string, done: boolean) => void): () => void {
+  const source = new EventSource(`${SERVER_URL}/summaries/${summaryId}/stream`);
+  let text = '';
+
+  source.addEventListener('token', (event) => {
+    text += JSON.parse((event as MessageEvent).data).text;
+    onUpdate(text, false);
+  });
+  source.addEventListener('done', (event) => {
+    const result = JSON.parse((event as MessageEvent).data);
+    onUpdate(result.summary, true);
+    source.close();
+  });
+  source.onerror = () => source.close();
+
+  return () => source.close();
+}
+
 export async function completeTransfer(consultationRoom: string, agentBIdentity: string, destinationRoom: string) {
   const response = await fetch(`${SERVER_URL}/complete-transfer`, {
     method: 'POST',